@@ -4,24 +4,108 @@ pragma solidity 0.8.18;
 import {BaseTokenizedStrategy} from "@tokenized-strategy/BaseTokenizedStrategy.sol";
 
 import {Math} from "@openzeppelin/contracts/utils/math/Math.sol";
+import {SafeCast} from "@openzeppelin/contracts/utils/math/SafeCast.sol";
 import {ERC20} from "@openzeppelin/contracts/token/ERC20/ERC20.sol";
 import {SafeERC20} from "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
 
-import {Comet, CometRewards} from "./interfaces/Compound/V3/CompoundV3.sol";
+import {
+    Comet,
+    CometRewards,
+    CometStructs
+} from "./interfaces/Compound/V3/CompoundV3.sol";
+import {ISwapRouter} from "./interfaces/Uniswap/V3/ISwapRouter.sol";
 
-// Uniswap V3 Swapper
-import {UniswapV3Swapper} from "@periphery/swappers/UniswapV3Swapper.sol";
-
-contract CompoundV3Lender is BaseTokenizedStrategy, UniswapV3Swapper {
+contract CompoundV3Lender is BaseTokenizedStrategy {
     using SafeERC20 for ERC20;
+    using SafeCast for uint256;
+
+    /**
+     * @notice Emitted on every harvest during a report.
+     * @param claimed Amount of `comp` claimed from the rewards contract.
+     * @param sold Amount of `comp` swapped to `asset`.
+     * @param received Amount of `asset` received from the swap.
+     * @param resupplied Amount of loose `asset` supplied to comet.
+     */
+    event Harvested(
+        uint256 claimed,
+        uint256 sold,
+        uint256 received,
+        uint256 resupplied
+    );
+
+    /**
+     * @notice Emitted when management pulls funds out of comet.
+     * @param requested Amount of `asset` requested to withdraw.
+     * @param withdrawn Amount of `asset` actually withdrawn.
+     */
+    event EmergencyWithdrawn(uint256 requested, uint256 withdrawn);
+
+    // Clones are minimal proxies delegating to this contract's code, so
+    // constants are shared by every clone without any storage.
 
+    // Base for the reward swaps will be weth.
+    address public constant base = 0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2;
+    // UniV3 mainnet router.
+    address public constant router = 0xE592427A0AEce92De3Edee1F18E0157C05861564;
+
+    // Packed into one slot so the report reads the comet and both swap
+    // fees with a single SLOAD, and counts its checkpoint for cheap.
     Comet public comet;
+    uint24 internal compToEthFee;
+    uint24 internal ethToAssetFee;
+    // Total checkpoints ever written.
+    uint48 internal checkpointCount;
+
+    // Min amount of `comp` to sell in a report.
+    uint256 public minAmountToSell;
+
+    // If true reports only claim rewards, selling and reinvesting them is
+    // left to tends so report gas doesn't depend on the swap.
+    bool public stagedHarvest;
+    // Value of `comp` in `asset` worth tending for at `maxTendBaseFee`.
+    uint96 public minCompValueToTend;
+    // Base fee at which the tend thresholds apply as set, they scale
+    // linearly with the base fee below and above it. 0 doesn't scale them.
+    uint64 public maxTendBaseFee;
+    // Reports only claim once more than this much `comp` is owed.
+    uint88 public minRewardsToClaim;
+
+    // Loose `asset` at or below this is left idle rather than supplied.
+    uint256 public minAmountToSupply;
+
+    // Most `comp` sold in one report or tend, the rest waits for the next.
+    uint128 public maxAmountToSell;
+    // Least `asset` accepted from a swap, in bps below the price feeds'
+    // value of the `comp` sold. MAX_BPS accepts any amount out.
+    uint16 public maxSlippage;
+    // Loose `asset` worth tending for at `maxTendBaseFee`.
+    uint96 public minIdleToTend;
+    // Set by an emergency withdraw so tends don't supply back what
+    // management pulled out, cleared by the next report.
+    bool public tendsPaused;
 
     // Rewards Stuff
     CometRewards public constant rewardsContract =
         CometRewards(0x1B0e765F6224C21223AeA2af16c1C46E38885a40);
     address internal constant comp = 0xc00e94Cb662C3520282E6f5717214004A7f26888;
 
+    // Comet's fixed scales used for reward tracking.
+    uint256 internal constant TRACKING_INDEX_SCALE = 1e15;
+    uint256 internal constant BASE_ACCRUAL_SCALE = 1e6;
+
+    uint256 internal constant MAX_BPS = 10_000;
+
+    // Amount of price per share checkpoints kept, oldest are overwritten.
+    uint256 public constant MAX_CHECKPOINTS = 256;
+
+    // Price per share at each report packed as `timestamp << 96 | pps`,
+    // two to a slot. Used as a ring buffer.
+    uint128[MAX_CHECKPOINTS] internal checkpoints;
+
+    // price feeds to value rewards in `asset`, can be updated manually if needed
+    address public baseTokenPriceFeed;
+    address public rewardTokenPriceFeed;
+
     constructor(
         address _asset,
         string memory _name,
@@ -38,14 +122,21 @@ contract CompoundV3Lender is BaseTokenizedStrategy, UniswapV3Swapper {
 
         ERC20(_asset).safeApprove(_comet, type(uint256).max);
 
-        // Set the needed variables for the Uni Swapper
-
-        // Base will be weth.
-        base = 0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2;
-        // UniV3 mainnet router.
-        router = 0xE592427A0AEce92De3Edee1F18E0157C05861564;
         // Set the min amount for the swapper to sell
         minAmountToSell = 1e12;
+        // Sell everything at any price until set otherwise.
+        maxAmountToSell = type(uint128).max;
+        maxSlippage = uint16(MAX_BPS);
+        // Tend for a whole token of idle `asset`, not for dust.
+        minIdleToTend = uint96(10 ** ERC20(_asset).decimals());
+
+        // set default price feeds, both in USD. The weth comet prices
+        // its base in ETH so use ETH/USD instead.
+        baseTokenPriceFeed = _asset == base
+            ? 0x5f4eC3Df9cbd43714FE2740f5E3616155c5b8419
+            : Comet(_comet).baseTokenPriceFeed();
+        // default to COMP/USD
+        rewardTokenPriceFeed = 0xdbd020CAeF83eFd542f4De03e3cF0C28A4428bd5;
     }
 
     /*//////////////////////////////////////////////////////////////
@@ -87,14 +178,20 @@ contract CompoundV3Lender is BaseTokenizedStrategy, UniswapV3Swapper {
      * @param _amount, The amount of 'asset' to be freed.
      */
     function _freeFunds(uint256 _amount) internal override {
-        // Need the balance updated
-        comet.accrueAccount(address(this));
+        Comet _comet = comet;
+        // Comet's balanceOf already includes interest accrued since the
+        // last checkpoint and withdraw accrues itself, so no need to
+        // accrue the account first.
+        uint256 balance = _comet.balanceOf(address(this));
+
         // We dont check available liquidity because we need the tx to
         // revert if there is not enough liquidity so we dont improperly
-        // pass a loss on to the user withdrawing.
-        comet.withdraw(
+        // pass a loss on to the user withdrawing. Anything at or above
+        // our balance is a full exit, which Comet resolves to the exact
+        // balance at withdrawal so no dust is left behind.
+        _comet.withdraw(
             asset,
-            Math.min(comet.balanceOf(address(this)), _amount)
+            _amount >= balance ? type(uint256).max : _amount
         );
     }
 
@@ -116,26 +213,386 @@ contract CompoundV3Lender is BaseTokenizedStrategy, UniswapV3Swapper {
      * amount of 'asset' the strategy currently holds.
      */
     function _totalInvested() internal override returns (uint256 _invested) {
+        Comet _comet = comet;
+        uint256 looseAsset;
         // Only sell and reinvest if we arent shutdown
         if (!TokenizedStrategy.isShutdown()) {
-            // Claim and sell any rewards to `asset`. Claims will accure account
-            rewardsContract.claim(address(comet), address(this), true);
+            (uint256 claimed, uint256 compBalance) = _claimRewards(_comet);
+
+            if (stagedHarvest) {
+                emit Harvested(claimed, 0, 0, 0);
+                looseAsset = ERC20(asset).balanceOf(address(this));
+            } else {
+                looseAsset = _sellAndReinvest(_comet, claimed, compBalance);
+            }
+        } else {
+            looseAsset = ERC20(asset).balanceOf(address(this));
+        }
+
+        _invested = _comet.balanceOf(address(this)) + looseAsset;
+
+        if (tendsPaused) tendsPaused = false;
+
+        _checkpoint();
+    }
+
+    /**
+     * @dev Claim rewards unless the comet pays none or no more than
+     * `minRewardsToClaim` is owed. Only a non zero min needs the full
+     * `getPendingRewards` computation. Comet's `balanceOf` accrues
+     * interest in the view so skipping the claim doesn't change the
+     * reported assets.
+     *
+     * Rewards still owed when a comet stops paying them can be claimed
+     * for the strategy by anyone through the rewards contract, the next
+     * report sells them.
+     * @return _claimed The amount of `comp` claimed.
+     * @return _comp The strategy's `comp` balance after the claim.
+     */
+    function _claimRewards(
+        Comet _comet
+    ) internal returns (uint256 _claimed, uint256 _comp) {
+        _comp = ERC20(comp).balanceOf(address(this));
+        if (_comet.baseTrackingSupplySpeed() == 0) return (0, _comp);
+
+        uint256 _minRewardsToClaim = minRewardsToClaim;
+        if (
+            _minRewardsToClaim != 0 &&
+            getPendingRewards() <= _minRewardsToClaim
+        ) return (0, _comp);
+
+        // Claims will accure account
+        rewardsContract.claim(address(_comet), address(this), true);
+        uint256 balance = ERC20(comp).balanceOf(address(this));
+        return (balance - _comp, balance);
+    }
+
+    /**
+     * @dev Sell up to `maxAmountToSell` of the rewards sitting in the
+     * strategy if above the min and supply any loose `asset` above the
+     * dust threshold.
+     * @param _comet The strategy's comet.
+     * @param _claimed Amount of `comp` just claimed, for the event.
+     * @param _comp The strategy's `comp` balance.
+     * @return . The loose `asset` left in the strategy.
+     */
+    function _sellAndReinvest(
+        Comet _comet,
+        uint256 _claimed,
+        uint256 _comp
+    ) internal returns (uint256) {
+        uint256 sold;
+        uint256 received;
+        if (_comp > minAmountToSell) {
+            sold = Math.min(_comp, maxAmountToSell);
+            received = _swapCompToAsset(_comet, sold);
+        }
+
+        // deposit any loose funds that are worth the gas
+        uint256 looseAsset = ERC20(asset).balanceOf(address(this));
+        if (looseAsset == 0 || looseAsset <= minAmountToSupply) {
+            emit Harvested(_claimed, sold, received, 0);
+            return looseAsset;
+        }
+
+        _comet.supply(asset, looseAsset);
+
+        emit Harvested(_claimed, sold, received, looseAsset);
+        return 0;
+    }
+
+    /**
+     * @dev Record the price per share as of this report, before the
+     * report locks any new profit so only realized gains are counted.
+     *
+     * Costs every report an external `pricePerShare` self call through
+     * the fallback, on top of the checkpoint's SSTOREs. The strategy
+     * doesn't hold the totals itself so there is no cheaper read.
+     */
+    function _checkpoint() internal {
+        uint48 count = checkpointCount;
+        checkpoints[count % MAX_CHECKPOINTS] = _packCheckpoint(
+            block.timestamp,
+            TokenizedStrategy.pricePerShare()
+        );
+        checkpointCount = count + 1;
+    }
+
+    /**
+     * @dev Sell `_amount` of `comp` for `asset` through weth, reverting
+     * if it would receive more than `maxSlippage` below the price feeds.
+     * @param _comet The strategy's comet, for the price feeds.
+     * @param _amount The amount of `comp` to sell.
+     * @return . The amount of `asset` received.
+     */
+    function _swapCompToAsset(
+        Comet _comet,
+        uint256 _amount
+    ) internal returns (uint256) {
+        uint256 _maxSlippage = maxSlippage;
+        uint256 minOut = _maxSlippage >= MAX_BPS
+            ? 0
+            : (_compToAsset(_comet, _amount) * (MAX_BPS - _maxSlippage)) /
+                MAX_BPS;
+
+        if (ERC20(comp).allowance(address(this), router) < _amount) {
+            ERC20(comp).safeApprove(router, 0);
+            ERC20(comp).safeApprove(router, type(uint256).max);
+        }
+
+        address _asset = asset;
+        if (_asset == base) {
+            return
+                ISwapRouter(router).exactInputSingle(
+                    ISwapRouter.ExactInputSingleParams(
+                        comp,
+                        base,
+                        compToEthFee,
+                        address(this),
+                        block.timestamp,
+                        _amount,
+                        minOut,
+                        0
+                    )
+                );
+        }
 
-            uint256 _comp = ERC20(comp).balanceOf(address(this));
+        return
+            ISwapRouter(router).exactInput(
+                ISwapRouter.ExactInputParams(
+                    abi.encodePacked(
+                        comp,
+                        compToEthFee,
+                        base,
+                        ethToAssetFee,
+                        _asset
+                    ),
+                    address(this),
+                    block.timestamp,
+                    _amount,
+                    minOut
+                )
+            );
+    }
+
+    /*//////////////////////////////////////////////////////////////
+                    OPTIONAL TO OVERRIDE BY STRATEGIST
+    //////////////////////////////////////////////////////////////*/
+
+    /**
+     * @dev Sells the next chunk of any rewards left in the strategy and
+     * supplies the proceeds along with any idle `asset`, so neither waits
+     * for the next report.
+     */
+    function _tend(uint256 /*_totalIdle*/) internal override {
+        if (TokenizedStrategy.isShutdown() || tendsPaused) return;
 
-            // The uni swapper will do min checks on _comp.
-            _swapFrom(comp, asset, _comp, 0);
+        _sellAndReinvest(comet, 0, ERC20(comp).balanceOf(address(this)));
+    }
+
+    /**
+     * @notice If a keeper should call `tend`.
+     * @dev Once the idle `asset` worth supplying reaches `minIdleToTend`,
+     * or the next chunk of sellable `comp` is worth `minCompValueToTend`,
+     * both scaled by the base fee over `maxTendBaseFee`. Never while
+     * shutdown or between an emergency withdraw and the next report.
+     * @return . Should return true if tend() should be called by keeper.
+     */
+    function tendTrigger() external view override returns (bool) {
+        if (TokenizedStrategy.isShutdown() || tendsPaused) return false;
+
+        uint256 idle = ERC20(asset).balanceOf(address(this));
+        if (idle > minAmountToSupply && idle >= _tendThreshold(minIdleToTend))
+            return true;
+
+        uint256 _comp = ERC20(comp).balanceOf(address(this));
+        if (_comp == 0 || _comp <= minAmountToSell) return false;
+
+        uint256 threshold = _tendThreshold(minCompValueToTend);
+        return
+            threshold == 0 ||
+            _compToAsset(comet, Math.min(_comp, maxAmountToSell)) >=
+            threshold;
+    }
+
+    /**
+     * @dev `_min` scaled by the current base fee over `maxTendBaseFee`,
+     * so the cheaper the gas the less it takes to be worth a tend.
+     */
+    function _tendThreshold(uint256 _min) internal view returns (uint256) {
+        uint256 _maxTendBaseFee = maxTendBaseFee;
+        if (_maxTendBaseFee == 0) return _min;
+        return (_min * block.basefee) / _maxTendBaseFee;
+    }
 
-            // deposit any loose funds
-            uint256 looseAsset = ERC20(asset).balanceOf(address(this));
-            if (looseAsset > 0) {
-                comet.supply(asset, looseAsset);
+    /**
+     * @notice Get the amount of `comp` accrued but not yet claimed.
+     * @dev Mirrors `CometRewards.getRewardOwed` but accrues the tracking
+     * index in memory so it can be read without sending a transaction.
+     * @return . The amount of `comp` owed to the strategy.
+     */
+    function getPendingRewards() public view returns (uint256) {
+        Comet _comet = comet;
+        CometStructs.RewardConfig memory config = rewardsContract.rewardConfig(
+            address(_comet)
+        );
+        // Comet is not set up for rewards.
+        if (config.token == address(0)) return 0;
+
+        CometStructs.UserBasic memory userBasic = _comet.userBasic(
+            address(this)
+        );
+        uint256 accrued = userBasic.baseTrackingAccrued;
+
+        if (userBasic.principal > 0) {
+            CometStructs.TotalsBasic memory totals = _comet.totalsBasic();
+            uint256 baseScale = _comet.baseScale();
+            uint256 trackingSupplyIndex = totals.trackingSupplyIndex;
+
+            // Accrue the supply tracking index the same way comet would.
+            uint256 timeElapsed = block.timestamp - totals.lastAccrualTime;
+            if (
+                timeElapsed > 0 &&
+                totals.totalSupplyBase >= _comet.baseMinForRewards()
+            ) {
+                trackingSupplyIndex +=
+                    (_comet.baseTrackingSupplySpeed() *
+                        timeElapsed *
+                        baseScale) /
+                    totals.totalSupplyBase;
             }
+
+            accrued +=
+                (uint256(uint104(userBasic.principal)) *
+                    (trackingSupplyIndex - userBasic.baseTrackingIndex)) /
+                TRACKING_INDEX_SCALE /
+                (baseScale / BASE_ACCRUAL_SCALE);
         }
 
-        _invested =
-            comet.balanceOf(address(this)) +
-            ERC20(asset).balanceOf(address(this));
+        accrued = config.shouldUpscale
+            ? accrued * config.rescaleFactor
+            : accrued / config.rescaleFactor;
+
+        uint256 claimed = rewardsContract.rewardsClaimed(
+            address(_comet),
+            address(this)
+        );
+
+        return accrued > claimed ? accrued - claimed : 0;
+    }
+
+    /**
+     * @notice Estimate of the total `asset` the strategy holds including
+     * pending and unsold rewards.
+     * @dev Rewards are valued at the price feeds with no swap fees or
+     * slippage so this will be more than a report would realize. Meant
+     * for monitoring, not accounting.
+     * @return . The estimated total assets in `asset`.
+     */
+    function estimatedTotalAssets() external view returns (uint256) {
+        Comet _comet = comet;
+        uint256 rewards = getPendingRewards() +
+            ERC20(comp).balanceOf(address(this));
+
+        return
+            _comet.balanceOf(address(this)) +
+            ERC20(asset).balanceOf(address(this)) +
+            _compToAsset(_comet, rewards);
+    }
+
+    /**
+     * @dev Value `_amount` of `comp` in `asset` at the price feeds.
+     */
+    function _compToAsset(
+        Comet _comet,
+        uint256 _amount
+    ) internal view returns (uint256) {
+        if (_amount == 0) return 0;
+        return
+            (_amount *
+                _comet.getPrice(rewardTokenPriceFeed) *
+                _comet.baseScale()) /
+            (uint256(_comet.getPrice(baseTokenPriceFeed)) * 1e18);
+    }
+
+    /**
+     * @notice Amount of price per share checkpoints available.
+     */
+    function numCheckpoints() public view returns (uint256) {
+        return Math.min(checkpointCount, MAX_CHECKPOINTS);
+    }
+
+    /**
+     * @notice Get a stored checkpoint, 0 is the oldest.
+     * @return timestamp When it was recorded.
+     * @return pricePerShare The price per share at that time.
+     */
+    function getCheckpoint(
+        uint256 _index
+    ) public view returns (uint256 timestamp, uint256 pricePerShare) {
+        require(_index < numCheckpoints(), "!index");
+        return
+            _unpackCheckpoint(
+                checkpoints[
+                    (checkpointCount - numCheckpoints() + _index) %
+                        MAX_CHECKPOINTS
+                ]
+            );
+    }
+
+    /**
+     * @notice Annualized return of the price per share over about the
+     * last `_window` seconds.
+     * @dev Measured from the latest checkpoint at or before the start of
+     * the window, or the oldest one if none are that old, to the current
+     * price per share. Not compounded.
+     * @param _window Length of the trailing window in seconds.
+     * @return . The trailing APR, 1e18 == 100%. 0 if not yet reported.
+     */
+    function getTrailingApr(uint256 _window) external view returns (uint256) {
+        uint256 count = numCheckpoints();
+        if (count == 0) return 0;
+
+        uint256 target = block.timestamp - Math.min(_window, block.timestamp);
+        uint256 first = checkpointCount - count;
+
+        // Binary search for the last checkpoint at or before `target`.
+        uint256 low = first;
+        uint256 high = checkpointCount - 1;
+        while (low < high) {
+            uint256 mid = (low + high + 1) / 2;
+            (uint256 timestamp, ) = _unpackCheckpoint(
+                checkpoints[mid % MAX_CHECKPOINTS]
+            );
+            if (timestamp <= target) {
+                low = mid;
+            } else {
+                high = mid - 1;
+            }
+        }
+
+        (uint256 start, uint256 startPps) = _unpackCheckpoint(
+            checkpoints[low % MAX_CHECKPOINTS]
+        );
+        uint256 pps = TokenizedStrategy.pricePerShare();
+        if (start == block.timestamp || pps <= startPps) return 0;
+
+        return
+            ((pps - startPps) * 1e18 * 365 days) /
+            (startPps * (block.timestamp - start));
+    }
+
+    function _packCheckpoint(
+        uint256 _timestamp,
+        uint256 _pricePerShare
+    ) internal pure returns (uint128) {
+        return uint128((_timestamp << 96) | _pricePerShare.toUint96());
+    }
+
+    function _unpackCheckpoint(
+        uint128 _checkpoint
+    ) internal pure returns (uint256, uint256) {
+        return (_checkpoint >> 96, uint96(_checkpoint));
     }
 
     function cloneCompoundV3Lender(
@@ -161,14 +618,37 @@ contract CompoundV3Lender is BaseTokenizedStrategy, UniswapV3Swapper {
         );
     }
 
+    /**
+     * @notice The Uniswap V3 fee used to swap between two tokens.
+     * @dev Only the `comp` <-> weth and weth <-> `asset` pools are used,
+     * everything else is 0.
+     */
+    function uniFees(
+        address _token0,
+        address _token1
+    ) external view returns (uint24) {
+        if (
+            (_token0 == comp && _token1 == base) ||
+            (_token0 == base && _token1 == comp)
+        ) return compToEthFee;
+
+        address _asset = asset;
+        if (
+            (_token0 == base && _token1 == _asset) ||
+            (_token0 == _asset && _token1 == base)
+        ) return ethToAssetFee;
+
+        return 0;
+    }
+
     //These will default to 0.
     //Will need to be manually set if asset is incentized before any harvests
     function setUniFees(
         uint24 _compToEth,
         uint24 _ethToAsset
     ) external onlyManagement {
-        _setUniFees(comp, base, _compToEth);
-        _setUniFees(base, asset, _ethToAsset);
+        compToEthFee = _compToEth;
+        ethToAssetFee = _ethToAsset;
     }
 
     function setMinAmountToSell(
@@ -177,12 +657,84 @@ contract CompoundV3Lender is BaseTokenizedStrategy, UniswapV3Swapper {
         minAmountToSell = _minAmountToSell;
     }
 
+    function setMinRewardsToClaim(
+        uint88 _minRewardsToClaim
+    ) external onlyManagement {
+        minRewardsToClaim = _minRewardsToClaim;
+    }
+
+    function setMinAmountToSupply(
+        uint256 _minAmountToSupply
+    ) external onlyManagement {
+        minAmountToSupply = _minAmountToSupply;
+    }
+
+    /**
+     * @notice Leave selling and reinvesting rewards to tends.
+     * @param _stagedHarvest If reports should only claim.
+     */
+    function setStagedHarvest(bool _stagedHarvest) external onlyManagement {
+        stagedHarvest = _stagedHarvest;
+    }
+
+    /**
+     * @notice Set when `tendTrigger` asks for a tend.
+     * @param _minIdleToTend Idle `asset` to tend at.
+     * @param _minCompValueToTend Value of `comp` in `asset` to tend at.
+     * @param _maxTendBaseFee Base fee both thresholds are set for, 0 to
+     * not scale them with the base fee.
+     */
+    function setTendParams(
+        uint96 _minIdleToTend,
+        uint96 _minCompValueToTend,
+        uint64 _maxTendBaseFee
+    ) external onlyManagement {
+        minIdleToTend = _minIdleToTend;
+        minCompValueToTend = _minCompValueToTend;
+        maxTendBaseFee = _maxTendBaseFee;
+    }
+
+    /**
+     * @notice Sell large reward balances in chunks at a bounded price.
+     * @param _maxAmountToSell Most `comp` to sell per report or tend.
+     * @param _maxSlippage Max bps below the price feeds' value accepted
+     * from each swap, MAX_BPS to accept any price.
+     */
+    function setLiquidationParams(
+        uint128 _maxAmountToSell,
+        uint16 _maxSlippage
+    ) external onlyManagement {
+        require(_maxAmountToSell > 0, "!max");
+        require(_maxSlippage <= MAX_BPS, "!slippage");
+        maxAmountToSell = _maxAmountToSell;
+        maxSlippage = _maxSlippage;
+    }
+
+    function setPriceFeeds(
+        address _baseTokenPriceFeed,
+        address _rewardTokenPriceFeed
+    ) external onlyManagement {
+        // just check the call doesnt revert. We dont care about the amount returned
+        comet.getPrice(_baseTokenPriceFeed);
+        comet.getPrice(_rewardTokenPriceFeed);
+        baseTokenPriceFeed = _baseTokenPriceFeed;
+        rewardTokenPriceFeed = _rewardTokenPriceFeed;
+    }
+
     // This should can be used in conjunction with shutting down the
     // strategy in an emgency to liquidate the strategy.
     // A report will need to be called post an emergency withdraw to record
-    // the updates in totalDebt and totalIdle
+    // the updates in totalDebt and totalIdle. Pass type(uint256).max to
+    // withdraw the full balance.
     function emergencyWithdraw(uint256 _amount) external onlyManagement {
-        comet.accrueAccount(address(this));
+        tendsPaused = true;
+
+        uint256 balanceBefore = ERC20(asset).balanceOf(address(this));
         comet.withdraw(asset, _amount);
+
+        emit EmergencyWithdrawn(
+            _amount,
+            ERC20(asset).balanceOf(address(this)) - balanceBefore
+        );
     }
 }
@@ -5,6 +5,15 @@ import "@tokenized-strategy/interfaces/IStrategy.sol";
 import "@periphery/swappers/interfaces/IUniswapV3Swapper.sol";
 
 interface IStrategyInterface is IStrategy, IUniswapV3Swapper {
+    event Harvested(
+        uint256 claimed,
+        uint256 sold,
+        uint256 received,
+        uint256 resupplied
+    );
+
+    event EmergencyWithdrawn(uint256 requested, uint256 withdrawn);
+
     function cloneCompoundV3Lender(
         address _asset,
         string memory _name,
@@ -14,6 +23,66 @@ interface IStrategyInterface is IStrategy, IUniswapV3Swapper {
         address _comet
     ) external returns (address newLender);
 
+    function comet() external view returns (address);
+
+    function baseTokenPriceFeed() external view returns (address);
+
+    function rewardTokenPriceFeed() external view returns (address);
+
+    function getPendingRewards() external view returns (uint256);
+
+    function estimatedTotalAssets() external view returns (uint256);
+
+    function MAX_CHECKPOINTS() external view returns (uint256);
+
+    function numCheckpoints() external view returns (uint256);
+
+    function getCheckpoint(
+        uint256 _index
+    ) external view returns (uint256 timestamp, uint256 pricePerShare);
+
+    function getTrailingApr(uint256 _window) external view returns (uint256);
+
+    function minRewardsToClaim() external view returns (uint88);
+
+    function minAmountToSupply() external view returns (uint256);
+
+    function setMinRewardsToClaim(uint88 _minRewardsToClaim) external;
+
+    function setMinAmountToSupply(uint256 _minAmountToSupply) external;
+
+    function stagedHarvest() external view returns (bool);
+
+    function minCompValueToTend() external view returns (uint96);
+
+    function maxTendBaseFee() external view returns (uint64);
+
+    function setStagedHarvest(bool _stagedHarvest) external;
+
+    function minIdleToTend() external view returns (uint96);
+
+    function tendsPaused() external view returns (bool);
+
+    function setTendParams(
+        uint96 _minIdleToTend,
+        uint96 _minCompValueToTend,
+        uint64 _maxTendBaseFee
+    ) external;
+
+    function maxAmountToSell() external view returns (uint128);
+
+    function maxSlippage() external view returns (uint16);
+
+    function setLiquidationParams(
+        uint128 _maxAmountToSell,
+        uint16 _maxSlippage
+    ) external;
+
+    function setPriceFeeds(
+        address _baseTokenPriceFeed,
+        address _rewardTokenPriceFeed
+    ) external;
+
     function setUniFees(uint24 _compToEth, uint24 _ethToAsset) external;
 
     function setMinAmountToSell(uint256 _minAmountToSell) external;
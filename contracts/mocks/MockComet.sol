@@ -0,0 +1,349 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.8.18;
+
+import {ERC20} from "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import {SafeERC20} from "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
+
+import {CometStructs} from "../interfaces/Compound/V3/CompoundV3.sol";
+
+interface IPriceFeed {
+    function latestRoundData()
+        external
+        view
+        returns (uint80, int256, uint256, uint256, uint80);
+}
+
+/**
+ * @notice Comet base market for testing against synthetic markets.
+ *
+ * Follows Comet's base accounting with the same scales and rounding:
+ * principals and supply/borrow indexes, kinked interest rate curves and
+ * supply reward tracking. There is no collateral, `borrow` simply lends
+ * out base to set the utilization.
+ */
+contract MockComet {
+    using SafeERC20 for ERC20;
+
+    struct Configuration {
+        address baseToken;
+        address baseTokenPriceFeed;
+        uint64 supplyKink;
+        uint64 supplyPerSecondInterestRateSlopeLow;
+        uint64 supplyPerSecondInterestRateSlopeHigh;
+        uint64 supplyPerSecondInterestRateBase;
+        uint64 borrowKink;
+        uint64 borrowPerSecondInterestRateSlopeLow;
+        uint64 borrowPerSecondInterestRateSlopeHigh;
+        uint64 borrowPerSecondInterestRateBase;
+        uint64 baseTrackingSupplySpeed;
+        uint104 baseMinForRewards;
+    }
+
+    uint64 internal constant FACTOR_SCALE = 1e18;
+    uint64 internal constant BASE_INDEX_SCALE = 1e15;
+    uint64 internal constant BASE_ACCRUAL_SCALE = 1e6;
+    uint64 public constant trackingIndexScale = 1e15;
+
+    address public immutable baseToken;
+    address public immutable baseTokenPriceFeed;
+    uint256 public immutable baseScale;
+    uint256 internal immutable accrualDescaleFactor;
+
+    uint64 public immutable supplyKink;
+    uint64 public immutable supplyPerSecondInterestRateSlopeLow;
+    uint64 public immutable supplyPerSecondInterestRateSlopeHigh;
+    uint64 public immutable supplyPerSecondInterestRateBase;
+    uint64 public immutable borrowKink;
+    uint64 public immutable borrowPerSecondInterestRateSlopeLow;
+    uint64 public immutable borrowPerSecondInterestRateSlopeHigh;
+    uint64 public immutable borrowPerSecondInterestRateBase;
+    uint64 public immutable baseTrackingSupplySpeed;
+    uint256 public immutable baseMinForRewards;
+
+    CometStructs.TotalsBasic internal totals;
+    mapping(address => CometStructs.UserBasic) internal users;
+
+    constructor(Configuration memory _config) {
+        uint8 decimals = ERC20(_config.baseToken).decimals();
+        require(decimals >= 6, "decimals");
+        require(_config.baseMinForRewards > 0, "min for rewards");
+
+        baseToken = _config.baseToken;
+        baseTokenPriceFeed = _config.baseTokenPriceFeed;
+        baseScale = 10 ** decimals;
+        accrualDescaleFactor = 10 ** decimals / BASE_ACCRUAL_SCALE;
+
+        supplyKink = _config.supplyKink;
+        supplyPerSecondInterestRateSlopeLow = _config
+            .supplyPerSecondInterestRateSlopeLow;
+        supplyPerSecondInterestRateSlopeHigh = _config
+            .supplyPerSecondInterestRateSlopeHigh;
+        supplyPerSecondInterestRateBase = _config
+            .supplyPerSecondInterestRateBase;
+        borrowKink = _config.borrowKink;
+        borrowPerSecondInterestRateSlopeLow = _config
+            .borrowPerSecondInterestRateSlopeLow;
+        borrowPerSecondInterestRateSlopeHigh = _config
+            .borrowPerSecondInterestRateSlopeHigh;
+        borrowPerSecondInterestRateBase = _config
+            .borrowPerSecondInterestRateBase;
+        baseTrackingSupplySpeed = _config.baseTrackingSupplySpeed;
+        baseMinForRewards = _config.baseMinForRewards;
+
+        totals.baseSupplyIndex = BASE_INDEX_SCALE;
+        totals.baseBorrowIndex = BASE_INDEX_SCALE;
+        totals.lastAccrualTime = uint40(block.timestamp);
+    }
+
+    /*//////////////////////////////////////////////////////////////
+                            MARKET ACTIONS
+    //////////////////////////////////////////////////////////////*/
+
+    function supply(address _asset, uint256 _amount) external {
+        require(_asset == baseToken, "asset");
+        _accrue();
+
+        ERC20(baseToken).safeTransferFrom(msg.sender, address(this), _amount);
+
+        CometStructs.UserBasic memory basic = users[msg.sender];
+        uint104 principal = uint104(basic.principal);
+        uint104 newPrincipal = _principalValueSupply(
+            _presentValueSupply(principal) + _amount
+        );
+        totals.totalSupplyBase += newPrincipal - principal;
+
+        _updateBasePrincipal(msg.sender, basic, newPrincipal);
+    }
+
+    /**
+     * @dev `type(uint256).max` withdraws the full balance. Reverts past
+     * the balance since there is no collateral to borrow against.
+     */
+    function withdraw(address _asset, uint256 _amount) external {
+        require(_asset == baseToken, "asset");
+        _accrue();
+
+        CometStructs.UserBasic memory basic = users[msg.sender];
+        uint104 principal = uint104(basic.principal);
+        uint256 balance = _presentValueSupply(principal);
+        if (_amount == type(uint256).max) _amount = balance;
+        require(_amount <= balance, "NotCollateralized");
+
+        uint104 newPrincipal = _principalValueSupply(balance - _amount);
+        totals.totalSupplyBase -= principal - newPrincipal;
+
+        _updateBasePrincipal(msg.sender, basic, newPrincipal);
+
+        ERC20(baseToken).safeTransfer(msg.sender, _amount);
+    }
+
+    /**
+     * @notice Lend out `_amount` of base to move the utilization.
+     */
+    function borrow(uint256 _amount) external {
+        _accrue();
+
+        uint256 index = totals.baseBorrowIndex;
+        totals.totalBorrowBase += uint104(
+            (_amount * BASE_INDEX_SCALE + index - 1) / index
+        );
+
+        ERC20(baseToken).safeTransfer(msg.sender, _amount);
+    }
+
+    function accrueAccount(address _account) external {
+        _accrue();
+
+        CometStructs.UserBasic memory basic = users[_account];
+        _updateBasePrincipal(_account, basic, uint104(basic.principal));
+    }
+
+    /*//////////////////////////////////////////////////////////////
+                                VIEWS
+    //////////////////////////////////////////////////////////////*/
+
+    function balanceOf(address _account) external view returns (uint256) {
+        (uint64 supplyIndex, ) = _accruedInterestIndices(
+            block.timestamp - totals.lastAccrualTime
+        );
+        return
+            (uint256(uint104(users[_account].principal)) * supplyIndex) /
+            BASE_INDEX_SCALE;
+    }
+
+    function totalSupply() external view returns (uint256) {
+        (uint64 supplyIndex, ) = _accruedInterestIndices(
+            block.timestamp - totals.lastAccrualTime
+        );
+        return (uint256(totals.totalSupplyBase) * supplyIndex) / BASE_INDEX_SCALE;
+    }
+
+    function totalBorrow() external view returns (uint256) {
+        (, uint64 borrowIndex) = _accruedInterestIndices(
+            block.timestamp - totals.lastAccrualTime
+        );
+        return (uint256(totals.totalBorrowBase) * borrowIndex) / BASE_INDEX_SCALE;
+    }
+
+    /**
+     * @dev Like Comet, from the indexes as of the last accrual.
+     */
+    function getUtilization() public view returns (uint256) {
+        uint256 supplied = _presentValueSupply(totals.totalSupplyBase);
+        if (supplied == 0) return 0;
+        uint256 borrowed = (uint256(totals.totalBorrowBase) *
+            totals.baseBorrowIndex) / BASE_INDEX_SCALE;
+        return (borrowed * FACTOR_SCALE) / supplied;
+    }
+
+    function getSupplyRate(uint256 _utilization) public view returns (uint64) {
+        return
+            _rate(
+                _utilization,
+                supplyKink,
+                supplyPerSecondInterestRateBase,
+                supplyPerSecondInterestRateSlopeLow,
+                supplyPerSecondInterestRateSlopeHigh
+            );
+    }
+
+    function getBorrowRate(uint256 _utilization) public view returns (uint64) {
+        return
+            _rate(
+                _utilization,
+                borrowKink,
+                borrowPerSecondInterestRateBase,
+                borrowPerSecondInterestRateSlopeLow,
+                borrowPerSecondInterestRateSlopeHigh
+            );
+    }
+
+    function getPrice(address _priceFeed) external view returns (uint128) {
+        (, int256 price, , , ) = IPriceFeed(_priceFeed).latestRoundData();
+        require(price > 0, "BadPrice");
+        return uint128(uint256(price));
+    }
+
+    function userBasic(
+        address _account
+    ) external view returns (CometStructs.UserBasic memory) {
+        return users[_account];
+    }
+
+    function totalsBasic()
+        external
+        view
+        returns (CometStructs.TotalsBasic memory)
+    {
+        return totals;
+    }
+
+    function baseTrackingAccrued(
+        address _account
+    ) external view returns (uint64) {
+        return users[_account].baseTrackingAccrued;
+    }
+
+    function baseIndexScale() external pure returns (uint64) {
+        return BASE_INDEX_SCALE;
+    }
+
+    function baseAccrualScale() external pure returns (uint64) {
+        return BASE_ACCRUAL_SCALE;
+    }
+
+    /*//////////////////////////////////////////////////////////////
+                                INTERNAL
+    //////////////////////////////////////////////////////////////*/
+
+    function _accrue() internal {
+        uint256 timeElapsed = block.timestamp - totals.lastAccrualTime;
+        if (timeElapsed == 0) return;
+
+        (totals.baseSupplyIndex, totals.baseBorrowIndex) = _accruedInterestIndices(
+            timeElapsed
+        );
+        uint256 totalSupplyBase = totals.totalSupplyBase;
+        if (totalSupplyBase >= baseMinForRewards) {
+            totals.trackingSupplyIndex += uint64(
+                (baseTrackingSupplySpeed * timeElapsed * baseScale) /
+                    totalSupplyBase
+            );
+        }
+        totals.lastAccrualTime = uint40(block.timestamp);
+    }
+
+    function _accruedInterestIndices(
+        uint256 _timeElapsed
+    ) internal view returns (uint64 supplyIndex, uint64 borrowIndex) {
+        supplyIndex = totals.baseSupplyIndex;
+        borrowIndex = totals.baseBorrowIndex;
+        if (_timeElapsed == 0) return (supplyIndex, borrowIndex);
+
+        uint256 utilization = getUtilization();
+        supplyIndex += uint64(
+            (uint256(supplyIndex) *
+                getSupplyRate(utilization) *
+                _timeElapsed) / FACTOR_SCALE
+        );
+        borrowIndex += uint64(
+            (uint256(borrowIndex) *
+                getBorrowRate(utilization) *
+                _timeElapsed) / FACTOR_SCALE
+        );
+    }
+
+    function _rate(
+        uint256 _utilization,
+        uint256 _kink,
+        uint256 _base,
+        uint256 _slopeLow,
+        uint256 _slopeHigh
+    ) internal pure returns (uint64) {
+        if (_utilization <= _kink) {
+            return uint64(_base + (_slopeLow * _utilization) / FACTOR_SCALE);
+        }
+        return
+            uint64(
+                _base +
+                    (_slopeLow * _kink) /
+                    FACTOR_SCALE +
+                    (_slopeHigh * (_utilization - _kink)) /
+                    FACTOR_SCALE
+            );
+    }
+
+    function _presentValueSupply(
+        uint256 _principal
+    ) internal view returns (uint256) {
+        return (_principal * totals.baseSupplyIndex) / BASE_INDEX_SCALE;
+    }
+
+    function _principalValueSupply(
+        uint256 _present
+    ) internal view returns (uint104) {
+        return uint104((_present * BASE_INDEX_SCALE) / totals.baseSupplyIndex);
+    }
+
+    /**
+     * @dev Accrue `_account`'s rewards on its old principal before
+     * changing it, the same as Comet.
+     */
+    function _updateBasePrincipal(
+        address _account,
+        CometStructs.UserBasic memory _basic,
+        uint104 _principal
+    ) internal {
+        uint64 trackingSupplyIndex = totals.trackingSupplyIndex;
+        uint256 indexDelta = trackingSupplyIndex - _basic.baseTrackingIndex;
+        _basic.baseTrackingAccrued += uint64(
+            (uint256(uint104(_basic.principal)) * indexDelta) /
+                trackingIndexScale /
+                accrualDescaleFactor
+        );
+        _basic.baseTrackingIndex = trackingSupplyIndex;
+        _basic.principal = int104(_principal);
+
+        users[_account] = _basic;
+    }
+}
@@ -0,0 +1,28 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.8.18;
+
+/**
+ * @notice Chainlink style feed returning a settable price with 8
+ * decimals, the same as every feed Comet uses.
+ */
+contract MockPriceFeed {
+    uint8 public constant decimals = 8;
+
+    int256 public answer;
+
+    constructor(int256 _answer) {
+        answer = _answer;
+    }
+
+    function setAnswer(int256 _answer) external {
+        answer = _answer;
+    }
+
+    function latestRoundData()
+        external
+        view
+        returns (uint80, int256, uint256, uint256, uint80)
+    {
+        return (0, answer, block.timestamp, block.timestamp, 0);
+    }
+}
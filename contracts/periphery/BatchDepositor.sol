@@ -0,0 +1,201 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.8.18;
+
+import {Ownable} from "@openzeppelin/contracts/access/Ownable.sol";
+import {ERC20} from "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import {SafeERC20} from "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
+import {SafeCast} from "@openzeppelin/contracts/utils/math/SafeCast.sol";
+
+import {IStrategyInterface} from "../interfaces/IStrategyInterface.sol";
+
+/**
+ * @notice Pool many small deposits into one strategy deposit.
+ *
+ * Deposits made while a batch is open are held here until the batch is
+ * executed, which makes a single `deposit` into the strategy and so a
+ * single comet supply. Each depositor can then claim their pro rata
+ * share of the shares minted for the batch. Every depositor only ever
+ * has one pending receipt, so claiming is constant cost regardless of
+ * how many batches or depositors there have been.
+ */
+contract BatchDepositor is Ownable {
+    using SafeERC20 for ERC20;
+    using SafeCast for uint256;
+
+    event Deposited(
+        address indexed user,
+        uint256 indexed batch,
+        uint256 assets
+    );
+
+    event Cancelled(
+        address indexed user,
+        uint256 indexed batch,
+        uint256 assets
+    );
+
+    event Executed(uint256 indexed batch, uint256 assets, uint256 shares);
+
+    event Claimed(
+        address indexed user,
+        uint256 indexed batch,
+        uint256 shares
+    );
+
+    struct Batch {
+        uint128 assets;
+        uint128 shares;
+    }
+
+    struct Receipt {
+        uint64 batch;
+        uint128 assets;
+    }
+
+    IStrategyInterface public immutable strategy;
+    address public immutable asset;
+
+    // The batch currently accepting deposits.
+    uint64 public currentBatch;
+    // When the current batch opened.
+    uint64 public batchStart;
+    // Min time a batch stays open before anyone can execute it.
+    uint64 public window;
+
+    mapping(uint256 => Batch) public batches;
+
+    mapping(address => Receipt) public receipts;
+
+    constructor(address _strategy, uint64 _window) {
+        strategy = IStrategyInterface(_strategy);
+        asset = IStrategyInterface(_strategy).asset();
+        window = _window;
+        batchStart = uint64(block.timestamp);
+
+        ERC20(asset).safeApprove(_strategy, type(uint256).max);
+    }
+
+    function setWindow(uint64 _window) external onlyOwner {
+        window = _window;
+    }
+
+    /**
+     * @notice Add `_assets` to the current batch.
+     * @dev Any shares from an earlier executed batch are sent first.
+     * @param _assets Amount of `asset` to deposit.
+     */
+    function deposit(uint256 _assets) external {
+        require(_assets > 0, "ZERO_ASSETS");
+        uint64 batch = currentBatch;
+        Receipt memory receipt = receipts[msg.sender];
+
+        if (receipt.assets > 0 && receipt.batch != batch) {
+            _claim(msg.sender, receipt);
+            receipt.assets = 0;
+        }
+
+        ERC20(asset).safeTransferFrom(msg.sender, address(this), _assets);
+
+        receipts[msg.sender] = Receipt(
+            batch,
+            receipt.assets + _assets.toUint128()
+        );
+        batches[batch].assets += _assets.toUint128();
+
+        emit Deposited(msg.sender, batch, _assets);
+    }
+
+    /**
+     * @notice Take back everything deposited into the current batch.
+     */
+    function cancel() external {
+        Receipt memory receipt = receipts[msg.sender];
+        require(
+            receipt.assets > 0 && receipt.batch == currentBatch,
+            "nothing pending"
+        );
+
+        delete receipts[msg.sender];
+        batches[receipt.batch].assets -= receipt.assets;
+
+        ERC20(asset).safeTransfer(msg.sender, receipt.assets);
+
+        emit Cancelled(msg.sender, receipt.batch, receipt.assets);
+    }
+
+    /**
+     * @notice Deposit the current batch into the strategy and open the
+     * next one.
+     * @dev Anyone can execute once the batch has been open for `window`,
+     * the owner can at any time.
+     * @return shares The strategy shares minted for the batch.
+     */
+    function execute() external returns (uint256 shares) {
+        require(
+            block.timestamp >= batchStart + window || msg.sender == owner(),
+            "window"
+        );
+        uint64 batch = currentBatch;
+        uint256 assets = batches[batch].assets;
+        require(assets > 0, "empty batch");
+
+        shares = strategy.deposit(assets, address(this));
+        batches[batch].shares = shares.toUint128();
+
+        currentBatch = batch + 1;
+        batchStart = uint64(block.timestamp);
+
+        emit Executed(batch, assets, shares);
+    }
+
+    /**
+     * @notice Send the caller their shares of an executed batch.
+     * @return shares The amount of strategy shares sent.
+     */
+    function claim() external returns (uint256 shares) {
+        Receipt memory receipt = receipts[msg.sender];
+        require(
+            receipt.assets > 0 && receipt.batch != currentBatch,
+            "nothing to claim"
+        );
+
+        delete receipts[msg.sender];
+        shares = _claim(msg.sender, receipt);
+    }
+
+    /**
+     * @notice Strategy shares `_user` can claim.
+     */
+    function claimable(address _user) external view returns (uint256) {
+        Receipt memory receipt = receipts[_user];
+        if (receipt.assets == 0 || receipt.batch == currentBatch) return 0;
+        return _sharesFor(receipt);
+    }
+
+    /**
+     * @notice Assets `_user` has waiting in the current batch.
+     */
+    function pending(address _user) external view returns (uint256) {
+        Receipt memory receipt = receipts[_user];
+        return receipt.batch == currentBatch ? receipt.assets : 0;
+    }
+
+    function _sharesFor(
+        Receipt memory _receipt
+    ) internal view returns (uint256) {
+        Batch memory batch = batches[_receipt.batch];
+        // Rounds down so the claims can never add up to more than the
+        // batch was minted.
+        return (uint256(_receipt.assets) * batch.shares) / batch.assets;
+    }
+
+    function _claim(
+        address _user,
+        Receipt memory _receipt
+    ) internal returns (uint256 shares) {
+        shares = _sharesFor(_receipt);
+        ERC20(address(strategy)).safeTransfer(_user, shares);
+
+        emit Claimed(_user, _receipt.batch, shares);
+    }
+}
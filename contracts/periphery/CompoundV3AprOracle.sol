@@ -3,9 +3,19 @@ pragma solidity 0.8.18;
 
 import {AprOracleBase} from "@periphery/AprOracle/AprOracleBase.sol";
 
-import {Comet, CometRewards} from "../interfaces/Compound/V3/CompoundV3.sol";
+import {
+    Comet,
+    CometRewards,
+    CometStructs
+} from "../interfaces/Compound/V3/CompoundV3.sol";
 
 contract CompoundV3AprOracle is AprOracleBase {
+    // Comet's base supply index at a point in time.
+    struct Observation {
+        uint40 timestamp;
+        uint64 supplyIndex;
+    }
+
     Comet public comet;
     address public baseToken;
     // price feeds for the reward apr calculation, can be updated manually if needed
@@ -16,8 +26,22 @@ contract CompoundV3AprOracle is AprOracleBase {
     uint64 internal constant SECONDS_PER_DAY = 60 * 60 * 24;
     uint64 internal constant SECONDS_PER_YEAR = 365 days;
 
+    address internal constant WETH = 0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2;
+
     uint256 internal SCALER;
 
+    // Ring buffer of supply index observations. Only the first
+    // `observationCardinality` slots are used, which can be grown the
+    // same way as a Uniswap V3 pool's oracle.
+    Observation[65535] public observations;
+    // Slot of the latest observation.
+    uint16 public observationIndex;
+    uint16 public observationCardinality;
+    // Takes effect once the buffer wraps to the end of its current size.
+    uint16 public observationCardinalityNext;
+    // Min seconds between two observations.
+    uint32 public observationInterval;
+
     constructor(string memory _name, address _comet) AprOracleBase(_name) {
         comet = Comet(_comet);
 
@@ -31,10 +55,21 @@ contract CompoundV3AprOracle is AprOracleBase {
         // decimals and diff between comp decimals and the index scale
         SCALER = (BASE_MANTISSA * 1e18) / BASE_INDEX_SCALE;
 
-        // set default price feeds
-        baseTokenPriceFeed = Comet(_comet).baseTokenPriceFeed();
+        // set default price feeds, both in USD. The weth comet prices
+        // its base in ETH so use ETH/USD instead.
+        baseTokenPriceFeed = baseToken == WETH
+            ? 0x5f4eC3Df9cbd43714FE2740f5E3616155c5b8419
+            : Comet(_comet).baseTokenPriceFeed();
         // default to COMP/USD
         rewardTokenPriceFeed = 0xdbd020CAeF83eFd542f4De03e3cF0C28A4428bd5;
+
+        observationCardinality = 1;
+        observationCardinalityNext = 1;
+        observationInterval = 1 hours;
+        observations[0] = Observation(
+            uint40(block.timestamp),
+            uint64(currentSupplyIndex())
+        );
     }
 
     function setPriceFeeds(
@@ -48,6 +83,159 @@ contract CompoundV3AprOracle is AprOracleBase {
         rewardTokenPriceFeed = _rewardTokenPriceFeed;
     }
 
+    function setObservationInterval(
+        uint32 _observationInterval
+    ) external onlyOwner {
+        observationInterval = _observationInterval;
+    }
+
+    /**
+     * @notice Grow the ring buffer to hold `_cardinality` observations.
+     * @dev Anyone can pay to grow it, it can never shrink. The new slots
+     * are written with a placeholder timestamp of 1 like Uniswap V3's
+     * `grow`, so the caller pays for the new storage instead of whoever
+     * records into it later.
+     */
+    function increaseObservationCardinality(uint16 _cardinality) external {
+        uint16 cardinalityNext = observationCardinalityNext;
+        require(_cardinality > cardinalityNext, "!increase");
+
+        for (uint256 i = cardinalityNext; i < _cardinality; ++i) {
+            observations[i].timestamp = 1;
+        }
+        observationCardinalityNext = _cardinality;
+    }
+
+    /**
+     * @notice Record the current supply index if at least
+     * `observationInterval` has passed since the last observation.
+     * @return . If an observation was recorded.
+     */
+    function recordObservation() external returns (bool) {
+        uint16 index = observationIndex;
+        uint16 cardinality = observationCardinality;
+        if (
+            block.timestamp <
+            observations[index].timestamp + observationInterval
+        ) return false;
+
+        // Grow once the end of the current buffer is reached so the
+        // observations stay in order.
+        if (index == cardinality - 1) {
+            uint16 cardinalityNext = observationCardinalityNext;
+            if (cardinalityNext > cardinality) {
+                observationCardinality = cardinalityNext;
+                cardinality = cardinalityNext;
+            }
+        }
+
+        index = (index + 1) % cardinality;
+        observations[index] = Observation(
+            uint40(block.timestamp),
+            uint64(currentSupplyIndex())
+        );
+        observationIndex = index;
+
+        return true;
+    }
+
+    /**
+     * @notice Comet's base supply index accrued to the current block.
+     */
+    function currentSupplyIndex() public view returns (uint256) {
+        Comet _comet = comet;
+        CometStructs.TotalsBasic memory totals = _comet.totalsBasic();
+        uint256 timeElapsed = block.timestamp - totals.lastAccrualTime;
+        uint256 index = totals.baseSupplyIndex;
+        if (timeElapsed == 0) return index;
+
+        return
+            index +
+            (index *
+                _comet.getSupplyRate(_comet.getUtilization()) *
+                timeElapsed) /
+            1e18;
+    }
+
+    /**
+     * @notice The supply index `_secondsAgo` seconds ago, interpolated
+     * between the surrounding observations.
+     * @dev Reverts if older than the oldest observation.
+     */
+    function supplyIndexAt(uint32 _secondsAgo) public view returns (uint256) {
+        uint256 target = block.timestamp - _secondsAgo;
+        uint256 index = observationIndex;
+        Observation memory latest = observations[index];
+
+        if (target >= latest.timestamp) {
+            if (_secondsAgo == 0) return currentSupplyIndex();
+            return
+                _interpolate(
+                    latest.timestamp,
+                    latest.supplyIndex,
+                    block.timestamp,
+                    currentSupplyIndex(),
+                    target
+                );
+        }
+
+        uint256 cardinality = observationCardinality;
+        uint256 oldest = (index + 1) % cardinality;
+        // The buffer has not wrapped yet, the slot is empty or only a
+        // placeholder.
+        if (observations[oldest].timestamp <= 1) oldest = 0;
+        require(target >= observations[oldest].timestamp, "OLD");
+
+        // Binary search for the last observation at or before `target`,
+        // over positions unrolled past the end of the buffer.
+        uint256 low = oldest;
+        uint256 high = index < oldest ? index + cardinality : index;
+        while (low < high) {
+            uint256 mid = (low + high + 1) / 2;
+            if (observations[mid % cardinality].timestamp <= target) {
+                low = mid;
+            } else {
+                high = mid - 1;
+            }
+        }
+
+        Observation memory before = observations[low % cardinality];
+        if (before.timestamp == target) return before.supplyIndex;
+
+        Observation memory next = observations[(low + 1) % cardinality];
+        return
+            _interpolate(
+                before.timestamp,
+                before.supplyIndex,
+                next.timestamp,
+                next.supplyIndex,
+                target
+            );
+    }
+
+    /**
+     * @notice The supply APR realized over the last `_window` seconds.
+     * @param _window Length of the trailing window in seconds.
+     * @return . The annualized realized supply rate, 1e18 == 100%.
+     */
+    function getRealizedApr(uint32 _window) external view returns (uint256) {
+        require(_window > 0, "!window");
+        uint256 start = supplyIndexAt(_window);
+        uint256 end = currentSupplyIndex();
+
+        return ((end - start) * 1e18 * SECONDS_PER_YEAR) / (start * _window);
+    }
+
+    function _interpolate(
+        uint256 _t0,
+        uint256 _index0,
+        uint256 _t1,
+        uint256 _index1,
+        uint256 _target
+    ) internal pure returns (uint256) {
+        return _index0 + ((_index1 - _index0) * (_target - _t0)) / (_t1 - _t0);
+    }
+
     function aprAfterDebtChange(
         address _asset,
         int256 _delta
@@ -0,0 +1,148 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.8.18;
+
+import {Ownable} from "@openzeppelin/contracts/access/Ownable.sol";
+import {ERC20} from "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import {SafeCast} from "@openzeppelin/contracts/utils/math/SafeCast.sol";
+
+import {AprOracleBase} from "@periphery/AprOracle/AprOracleBase.sol";
+
+import {Comet} from "../interfaces/Compound/V3/CompoundV3.sol";
+import {IStrategyInterface} from "../interfaces/IStrategyInterface.sol";
+
+/**
+ * @notice Read the monitoring state of many CompoundV3Lenders in one call.
+ *
+ * Each strategy is packed into `STATE_SIZE` bytes, back to back:
+ *
+ *   strategy        address   20
+ *   comet           address   20
+ *   cometBalance    uint128   16
+ *   idle            uint128   16
+ *   pendingRewards  uint96    12
+ *   lastReport      uint40     5
+ *   isShutdown      bool       1
+ *   apr             uint64     8
+ *
+ * `apr` is the current `aprAfterDebtChange(asset, 0)` of the oracle set
+ * for the strategy's comet, or 0 if none is set.
+ */
+contract CompoundV3LenderLens is Ownable {
+    using SafeCast for uint256;
+
+    uint256 public constant STATE_SIZE = 98;
+
+    // Strategies that can be read with `getStates(offset, limit)`
+    address[] public strategies;
+
+    // comet => apr oracle
+    mapping(address => address) public oracles;
+
+    function numStrategies() external view returns (uint256) {
+        return strategies.length;
+    }
+
+    function getStrategies() external view returns (address[] memory) {
+        return strategies;
+    }
+
+    function addStrategies(address[] calldata _strategies) external onlyOwner {
+        for (uint256 i; i < _strategies.length; ++i) {
+            strategies.push(_strategies[i]);
+        }
+    }
+
+    function removeStrategy(uint256 _index) external onlyOwner {
+        strategies[_index] = strategies[strategies.length - 1];
+        strategies.pop();
+    }
+
+    function setOracle(address _comet, address _oracle) external onlyOwner {
+        oracles[_comet] = _oracle;
+    }
+
+    /**
+     * @notice Get the packed state of a page of the stored strategies.
+     * @param _offset Index of the first strategy to read.
+     * @param _limit Max amount of strategies to read.
+     * @return . The packed states, `STATE_SIZE` bytes per strategy.
+     */
+    function getStates(
+        uint256 _offset,
+        uint256 _limit
+    ) external view returns (bytes memory) {
+        uint256 length = strategies.length;
+        if (_offset >= length) return new bytes(0);
+        if (_limit > length - _offset) _limit = length - _offset;
+
+        address[] memory page = new address[](_limit);
+        for (uint256 i; i < page.length; ++i) {
+            page[i] = strategies[_offset + i];
+        }
+
+        return _getStates(page);
+    }
+
+    /**
+     * @notice Get the packed state of each of `_strategies`.
+     * @param _strategies The strategies to read.
+     * @return . The packed states, `STATE_SIZE` bytes per strategy.
+     */
+    function getStates(
+        address[] calldata _strategies
+    ) external view returns (bytes memory) {
+        return _getStates(_strategies);
+    }
+
+    function _getStates(
+        address[] memory _strategies
+    ) internal view returns (bytes memory data) {
+        uint256 length = _strategies.length * STATE_SIZE;
+        // Leave a word of slack for the last record's final write.
+        data = new bytes(length + 32);
+
+        for (uint256 i; i < _strategies.length; ++i) {
+            address strategy = _strategies[i];
+            address comet = IStrategyInterface(strategy).comet();
+            address asset = IStrategyInterface(strategy).asset();
+
+            uint256 cometBalance = Comet(comet).balanceOf(strategy).toUint128();
+            uint256 idle = ERC20(asset).balanceOf(strategy).toUint128();
+            uint256 pendingRewards = IStrategyInterface(strategy)
+                .getPendingRewards()
+                .toUint96();
+            uint256 lastReport = IStrategyInterface(strategy)
+                .lastReport()
+                .toUint40();
+            uint256 isShutdown = IStrategyInterface(strategy).isShutdown()
+                ? 1
+                : 0;
+
+            uint256 apr;
+            address oracle = oracles[comet];
+            if (oracle != address(0)) {
+                apr = AprOracleBase(oracle)
+                    .aprAfterDebtChange(asset, 0)
+                    .toUint64();
+            }
+
+            // Each word is written left aligned at the start of its field,
+            // with the next write covering whatever spilled past it.
+            assembly {
+                let ptr := add(add(data, 0x20), mul(i, STATE_SIZE))
+                mstore(ptr, shl(96, strategy))
+                mstore(add(ptr, 20), shl(96, comet))
+                mstore(add(ptr, 40), shl(128, cometBalance))
+                mstore(add(ptr, 56), shl(128, idle))
+                mstore(add(ptr, 72), shl(160, pendingRewards))
+                mstore(add(ptr, 84), shl(216, lastReport))
+                mstore(add(ptr, 89), shl(248, isShutdown))
+                mstore(add(ptr, 90), shl(192, apr))
+            }
+        }
+
+        assembly {
+            mstore(data, length)
+        }
+    }
+}
@@ -0,0 +1,196 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.8.18;
+
+import {AprOracleBase} from "@periphery/AprOracle/AprOracleBase.sol";
+
+import {Comet} from "../interfaces/Compound/V3/CompoundV3.sol";
+
+/**
+ * @notice APR oracle for every registered comet, keyed by base asset.
+ *
+ * Gives the same answers as a `CompoundV3AprOracle` per comet, so
+ * allocators only need one oracle for any asset, and `getAprs` returns
+ * the current APR of every market in a single call.
+ */
+contract CompoundV3MultiAprOracle is AprOracleBase {
+    // Packed so the comet and its scaler are read with one SLOAD.
+    struct Market {
+        Comet comet;
+        // Scales rewards per second to the base token's decimals.
+        uint96 scaler;
+        // price feeds for the reward apr calculation, can be updated manually if needed
+        address baseTokenPriceFeed;
+        address rewardTokenPriceFeed;
+    }
+
+    uint64 internal constant DAYS_PER_YEAR = 365;
+    uint64 internal constant SECONDS_PER_DAY = 60 * 60 * 24;
+    uint64 internal constant SECONDS_PER_YEAR = 365 days;
+
+    address internal constant WETH = 0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2;
+
+    // base asset => market
+    mapping(address => Market) public markets;
+
+    // Base assets of every registered market.
+    address[] public assets;
+
+    constructor(string memory _name) AprOracleBase(_name) {}
+
+    function numMarkets() external view returns (uint256) {
+        return assets.length;
+    }
+
+    function getAssets() external view returns (address[] memory) {
+        return assets;
+    }
+
+    /**
+     * @notice Register `_comet` under its base token.
+     */
+    function addMarket(address _comet) external onlyOwner {
+        address baseToken = Comet(_comet).baseToken();
+        require(
+            address(markets[baseToken].comet) == address(0),
+            "already added"
+        );
+
+        markets[baseToken] = Market(
+            Comet(_comet),
+            // this is needed for reward apr calculations based on decimals
+            // of baseToken we scale rewards per second to the base token
+            // decimals and diff between comp decimals and the index scale
+            uint96(
+                (Comet(_comet).baseScale() * 1e18) /
+                    Comet(_comet).baseIndexScale()
+            ),
+            // set default price feeds, both in USD. The weth comet prices
+            // its base in ETH so use ETH/USD instead.
+            baseToken == WETH
+                ? 0x5f4eC3Df9cbd43714FE2740f5E3616155c5b8419
+                : Comet(_comet).baseTokenPriceFeed(),
+            // default to COMP/USD
+            0xdbd020CAeF83eFd542f4De03e3cF0C28A4428bd5
+        );
+        assets.push(baseToken);
+    }
+
+    function removeMarket(address _asset) external onlyOwner {
+        require(address(markets[_asset].comet) != address(0), "wrong asset");
+        delete markets[_asset];
+
+        uint256 last = assets.length - 1;
+        for (uint256 i; i < last; ++i) {
+            if (assets[i] == _asset) {
+                assets[i] = assets[last];
+                break;
+            }
+        }
+        assets.pop();
+    }
+
+    function setPriceFeeds(
+        address _asset,
+        address _baseTokenPriceFeed,
+        address _rewardTokenPriceFeed
+    ) external onlyOwner {
+        Comet _comet = markets[_asset].comet;
+        require(address(_comet) != address(0), "wrong asset");
+        // just check the call doesnt revert. We dont care about the amount returned
+        _comet.getPrice(_baseTokenPriceFeed);
+        _comet.getPrice(_rewardTokenPriceFeed);
+        markets[_asset].baseTokenPriceFeed = _baseTokenPriceFeed;
+        markets[_asset].rewardTokenPriceFeed = _rewardTokenPriceFeed;
+    }
+
+    function aprAfterDebtChange(
+        address _asset,
+        int256 _delta
+    ) external view override returns (uint256) {
+        return _aprAfterDebtChange(_getMarket(_asset), _delta);
+    }
+
+    /**
+     * @notice The current APR of every registered market.
+     * @return _assets The base asset of each market.
+     * @return aprs Each market's `aprAfterDebtChange(asset, 0)`.
+     */
+    function getAprs()
+        external
+        view
+        returns (address[] memory _assets, uint256[] memory aprs)
+    {
+        _assets = assets;
+        aprs = new uint256[](_assets.length);
+        for (uint256 i; i < _assets.length; ++i) {
+            aprs[i] = _aprAfterDebtChange(markets[_assets[i]], 0);
+        }
+    }
+
+    function getRewardAprForSupplyBase(
+        address _asset,
+        uint256 _newAmount
+    ) external view returns (uint256) {
+        return _getRewardAprForSupplyBase(_getMarket(_asset), _newAmount);
+    }
+
+    function getSupplyApr(
+        address _asset,
+        uint256 _newUtilization
+    ) external view returns (uint256) {
+        return _getSupplyApr(_getMarket(_asset).comet, _newUtilization);
+    }
+
+    function _getMarket(
+        address _asset
+    ) internal view returns (Market memory) {
+        Market memory market = markets[_asset];
+        require(address(market.comet) != address(0), "wrong asset");
+        return market;
+    }
+
+    function _aprAfterDebtChange(
+        Market memory _market,
+        int256 _delta
+    ) internal view returns (uint256) {
+        uint256 borrows = _market.comet.totalBorrow();
+        uint256 supply = _market.comet.totalSupply();
+
+        uint256 newAmount = uint256(int256(supply) + _delta);
+
+        uint256 newUtilization = (borrows * 1e18) / newAmount;
+
+        unchecked {
+            return
+                _getSupplyApr(_market.comet, newUtilization) +
+                _getRewardAprForSupplyBase(_market, newAmount);
+        }
+    }
+
+    function _getRewardAprForSupplyBase(
+        Market memory _market,
+        uint256 _newAmount
+    ) internal view returns (uint256) {
+        Comet _comet = _market.comet;
+        unchecked {
+            uint256 rewardToSuppliersPerDay = _comet.baseTrackingSupplySpeed() *
+                SECONDS_PER_DAY *
+                _market.scaler;
+            if (rewardToSuppliersPerDay == 0) return 0;
+            return
+                ((_comet.getPrice(_market.rewardTokenPriceFeed) *
+                    rewardToSuppliersPerDay) /
+                    (_newAmount * _comet.getPrice(_market.baseTokenPriceFeed))) *
+                DAYS_PER_YEAR;
+        }
+    }
+
+    function _getSupplyApr(
+        Comet _comet,
+        uint256 _newUtilization
+    ) internal view returns (uint256) {
+        unchecked {
+            return _comet.getSupplyRate(_newUtilization) * SECONDS_PER_YEAR;
+        }
+    }
+}
@@ -0,0 +1,130 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.8.18;
+
+import {ERC20} from "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import {SafeERC20} from "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
+import {IERC20Permit} from "@openzeppelin/contracts/token/ERC20/extensions/draft-IERC20Permit.sol";
+
+import {IStrategyInterface} from "../interfaces/IStrategyInterface.sol";
+import {IWETH} from "../interfaces/IWETH.sol";
+
+/**
+ * @notice Deposit into any strategy in a single transaction.
+ *
+ * Assets that support EIP-2612 can be deposited with a signed permit
+ * instead of a separate approve. Weth, which has no permit, can be
+ * deposited straight from ETH. Any other asset only needs to be
+ * approved to the router once to deposit into every strategy.
+ */
+contract DepositRouter {
+    using SafeERC20 for ERC20;
+
+    IWETH public constant weth =
+        IWETH(0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2);
+
+    /**
+     * @notice Permit the router to pull `_assets` and deposit them.
+     * @param _strategy The strategy to deposit into.
+     * @param _assets Amount of the strategy's asset to deposit.
+     * @param _receiver Who receives the shares.
+     * @param _deadline Deadline of the permit.
+     * @return . The shares minted to `_receiver`.
+     */
+    function depositWithPermit(
+        address _strategy,
+        uint256 _assets,
+        address _receiver,
+        uint256 _deadline,
+        uint8 _v,
+        bytes32 _r,
+        bytes32 _s
+    ) external returns (uint256) {
+        address asset = IStrategyInterface(_strategy).asset();
+
+        try
+            IERC20Permit(asset).permit(
+                msg.sender,
+                address(this),
+                _assets,
+                _deadline,
+                _v,
+                _r,
+                _s
+            )
+        {} catch {
+            // The permit may have been front run, which is fine as long
+            // as the allowance is there.
+            require(
+                ERC20(asset).allowance(msg.sender, address(this)) >= _assets,
+                "permit"
+            );
+        }
+
+        return _deposit(_strategy, asset, _assets, _receiver);
+    }
+
+    /**
+     * @notice Deposit assets already approved to the router.
+     * @param _strategy The strategy to deposit into.
+     * @param _assets Amount of the strategy's asset to deposit.
+     * @param _receiver Who receives the shares.
+     * @return . The shares minted to `_receiver`.
+     */
+    function deposit(
+        address _strategy,
+        uint256 _assets,
+        address _receiver
+    ) external returns (uint256) {
+        return
+            _deposit(
+                _strategy,
+                IStrategyInterface(_strategy).asset(),
+                _assets,
+                _receiver
+            );
+    }
+
+    /**
+     * @notice Wrap the ETH sent and deposit it into a weth strategy.
+     * @param _strategy The weth strategy to deposit into.
+     * @param _receiver Who receives the shares.
+     * @return . The shares minted to `_receiver`.
+     */
+    function depositEth(
+        address _strategy,
+        address _receiver
+    ) external payable returns (uint256) {
+        require(
+            IStrategyInterface(_strategy).asset() == address(weth),
+            "not weth"
+        );
+
+        weth.deposit{value: msg.value}();
+        _checkAllowance(_strategy, address(weth), msg.value);
+
+        return IStrategyInterface(_strategy).deposit(msg.value, _receiver);
+    }
+
+    function _deposit(
+        address _strategy,
+        address _asset,
+        uint256 _assets,
+        address _receiver
+    ) internal returns (uint256) {
+        ERC20(_asset).safeTransferFrom(msg.sender, address(this), _assets);
+        _checkAllowance(_strategy, _asset, _assets);
+
+        return IStrategyInterface(_strategy).deposit(_assets, _receiver);
+    }
+
+    function _checkAllowance(
+        address _strategy,
+        address _asset,
+        uint256 _amount
+    ) internal {
+        if (ERC20(_asset).allowance(address(this), _strategy) < _amount) {
+            ERC20(_asset).safeApprove(_strategy, 0);
+            ERC20(_asset).safeApprove(_strategy, type(uint256).max);
+        }
+    }
+}
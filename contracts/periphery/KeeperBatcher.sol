@@ -0,0 +1,99 @@
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.8.18;
+
+import {Ownable} from "@openzeppelin/contracts/access/Ownable.sol";
+
+import {IStrategyInterface} from "../interfaces/IStrategyInterface.sol";
+
+/**
+ * @notice Report or tend many strategies in one transaction.
+ *
+ * Set as the keeper of each strategy. Batching saves the base cost of a
+ * transaction per strategy and, when they share a comet, pays for the
+ * cold access to comet, the rewards contract, COMP and the router once.
+ * A strategy that reverts, or returns anything but what a strategy
+ * would, is skipped with a `Failed` event rather than reverting the
+ * whole batch.
+ */
+contract KeeperBatcher is Ownable {
+    event Failed(address indexed strategy, bytes reason);
+
+    struct Report {
+        bool success;
+        uint256 profit;
+        uint256 loss;
+    }
+
+    // Accounts other than the owner allowed to run batches.
+    mapping(address => bool) public keepers;
+
+    modifier onlyKeepers() {
+        require(msg.sender == owner() || keepers[msg.sender], "!keeper");
+        _;
+    }
+
+    function setKeeper(address _keeper, bool _allowed) external onlyOwner {
+        keepers[_keeper] = _allowed;
+    }
+
+    /**
+     * @notice Report each of `_strategies`.
+     * @param _strategies The strategies to report, in order.
+     * @return reports The outcome of each report, zero for failed ones.
+     */
+    function reportAll(
+        address[] calldata _strategies
+    ) external onlyKeepers returns (Report[] memory reports) {
+        reports = new Report[](_strategies.length);
+
+        for (uint256 i; i < _strategies.length; ++i) {
+            address strategy = _strategies[i];
+            // A low level call so bad return data can't revert the batch
+            // the way decoding it in a try/catch would.
+            (bool success, bytes memory data) = strategy.call(
+                abi.encodeCall(IStrategyInterface.report, ())
+            );
+            // Reverted, or returned less than a profit and a loss.
+            if (!success || data.length < 64) {
+                emit Failed(strategy, data);
+                continue;
+            }
+
+            (uint256 profit, uint256 loss) = abi.decode(
+                data,
+                (uint256, uint256)
+            );
+            reports[i] = Report(true, profit, loss);
+        }
+    }
+
+    /**
+     * @notice Tend each of `_strategies`.
+     * @param _strategies The strategies to tend, in order.
+     * @return tended If each tend succeeded.
+     */
+    function tendAll(
+        address[] calldata _strategies
+    ) external onlyKeepers returns (bool[] memory tended) {
+        tended = new bool[](_strategies.length);
+
+        for (uint256 i; i < _strategies.length; ++i) {
+            address strategy = _strategies[i];
+            // Calls to addresses without code succeed, so check for it.
+            if (strategy.code.length == 0) {
+                emit Failed(strategy, "");
+                continue;
+            }
+
+            (bool success, bytes memory data) = strategy.call(
+                abi.encodeCall(IStrategyInterface.tend, ())
+            );
+            if (!success) {
+                emit Failed(strategy, data);
+                continue;
+            }
+
+            tended[i] = true;
+        }
+    }
+}
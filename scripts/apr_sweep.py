@@ -0,0 +1,288 @@
+"""
+Sweep `CompoundV3AprOracle.aprAfterDebtChange` across markets and delta
+grids.
+
+Calls run concurrently on a thread pool with a bounded number in flight
+and every result is stored in a persistent LRU cache keyed by
+(oracle, comet, delta, block), so rerunning a sweep at the same block
+makes no calls at all. The comet and total supply behind each oracle are
+cached per block as well.
+
+    ape run apr_sweep --network ethereum:mainnet-fork:hardhat \
+        --oracle 0x... --oracle 0x... --bps -1000 --bps 0 --bps 1000 \
+        --output curves.csv
+"""
+import asyncio
+import csv
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import click
+from ape import chain
+from ape.cli import NetworkBoundCommand, network_option
+from eth_utils import keccak, to_checksum_address
+
+DEFAULT_CACHE = Path(".cache") / "apr_sweep.sqlite"
+MAX_BPS = 10_000
+
+APR_AFTER_DEBT_CHANGE = keccak(text="aprAfterDebtChange(address,int256)")[:4]
+COMET = keccak(text="comet()")[:4]
+BASE_TOKEN = keccak(text="baseToken()")[:4]
+TOTAL_SUPPLY = keccak(text="totalSupply()")[:4]
+
+# (to, calldata, block) -> return data
+CallFn = Callable[[str, bytes, int], bytes]
+CacheKey = Tuple[str, str, int, int]
+
+
+class AprCache:
+    """
+    SQLite backed LRU cache of APRs. Entries past `max_entries` are
+    evicted least recently used first.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE, max_entries: int = 1_000_000):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.db = sqlite3.connect(str(path))
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS apr ("
+            "oracle TEXT, comet TEXT, delta TEXT, block INTEGER, "
+            "apr TEXT, used INTEGER, "
+            "PRIMARY KEY (oracle, comet, delta, block))"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS apr_used ON apr (used)")
+        # Small enough to never need evicting.
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS market ("
+            "oracle TEXT, block INTEGER, comet TEXT, asset TEXT, supply TEXT, "
+            "PRIMARY KEY (oracle, block))"
+        )
+        # Logical clock rather than wall time so ties can't reorder evictions
+        self._clock = self.db.execute("SELECT MAX(used) FROM apr").fetchone()[0] or 0
+        self.hits = 0
+        self.misses = 0
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    @staticmethod
+    def _key(key: CacheKey):
+        oracle, comet, delta, block = key
+        # Deltas don't fit in a sqlite integer.
+        return oracle.lower(), comet.lower(), str(delta), block
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM apr").fetchone()[0]
+
+    def get(self, key: CacheKey) -> Optional[int]:
+        key = self._key(key)
+        row = self.db.execute(
+            "SELECT apr FROM apr "
+            "WHERE oracle = ? AND comet = ? AND delta = ? AND block = ?",
+            key,
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.db.execute(
+            "UPDATE apr SET used = ? "
+            "WHERE oracle = ? AND comet = ? AND delta = ? AND block = ?",
+            (self._tick(), *key),
+        )
+        return int(row[0])
+
+    def put(self, key: CacheKey, apr: int):
+        self.db.execute(
+            "INSERT OR REPLACE INTO apr VALUES (?, ?, ?, ?, ?, ?)",
+            (*self._key(key), str(apr), self._tick()),
+        )
+
+    def get_market(self, oracle: str, block: int) -> Optional[Tuple[str, str, int]]:
+        row = self.db.execute(
+            "SELECT comet, asset, supply FROM market WHERE oracle = ? AND block = ?",
+            (oracle.lower(), block),
+        ).fetchone()
+        return None if row is None else (row[0], row[1], int(row[2]))
+
+    def put_market(self, oracle: str, block: int, comet: str, asset: str, supply: int):
+        self.db.execute(
+            "INSERT OR REPLACE INTO market VALUES (?, ?, ?, ?, ?)",
+            (oracle.lower(), block, comet, asset, str(supply)),
+        )
+
+    def commit(self):
+        """Evict down to `max_entries` and persist."""
+        self.db.execute(
+            "DELETE FROM apr WHERE rowid IN ("
+            "SELECT rowid FROM apr ORDER BY used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self.db.commit()
+
+    def close(self):
+        self.commit()
+        self.db.close()
+
+
+def _word(value: int) -> bytes:
+    return (value % 2**256).to_bytes(32, "big")
+
+
+def _address(word: bytes) -> str:
+    return to_checksum_address(word[-20:])
+
+
+def web3_call(web3) -> CallFn:
+    def call(to: str, data: bytes, block: int) -> bytes:
+        return bytes(web3.eth.call({"to": to, "data": data}, block))
+
+    return call
+
+
+def share(supply: int, bps: int) -> int:
+    """`bps` of `supply` in integer math, rounded toward zero."""
+    amount = supply * abs(bps) // MAX_BPS
+    return amount if bps >= 0 else -amount
+
+
+async def sweep(
+    call: CallFn,
+    oracles: Iterable[str],
+    block: int,
+    deltas: Sequence[int] = (),
+    bps: Sequence[int] = (),
+    cache: Optional[AprCache] = None,
+    concurrency: int = 16,
+) -> List[Dict]:
+    """
+    Get the APR of every oracle after each change in `deltas`, in wei of
+    the base token, and each change in `bps` of the comet's total supply,
+    all at `block`.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    async def bounded(to: str, data: bytes) -> bytes:
+        async with semaphore:
+            return await loop.run_in_executor(executor, call, to, data, block)
+
+    async def market(oracle: str):
+        cached = cache.get_market(oracle, block) if cache is not None else None
+        if cached is None:
+            comet, asset = await asyncio.gather(
+                bounded(oracle, COMET), bounded(oracle, BASE_TOKEN)
+            )
+            comet, asset = _address(comet), _address(asset)
+            supply = int.from_bytes(await bounded(comet, TOTAL_SUPPLY), "big")
+            if cache is not None:
+                cache.put_market(oracle, block, comet, asset, supply)
+        else:
+            comet, asset, supply = cached
+
+        market_deltas = list(deltas) + [share(supply, b) for b in bps]
+        return oracle, comet, asset, market_deltas
+
+    async def apr(key: CacheKey, asset: str) -> int:
+        oracle, _, delta, _ = key
+        data = APR_AFTER_DEBT_CHANGE + _word(int(asset, 16)) + _word(delta)
+        return int.from_bytes(await bounded(oracle, data), "big")
+
+    try:
+        markets = await asyncio.gather(*(market(o) for o in oracles))
+
+        rows, pending = [], []
+        for oracle, comet, asset, market_deltas in markets:
+            for delta in market_deltas:
+                key = (oracle, comet, delta, block)
+                row = {
+                    "oracle": oracle,
+                    "comet": comet,
+                    "asset": asset,
+                    "block": block,
+                    "delta": delta,
+                    "apr": cache.get(key) if cache is not None else None,
+                }
+                rows.append(row)
+                if row["apr"] is None:
+                    pending.append((row, key, asset))
+
+        results = await asyncio.gather(*(apr(k, a) for _, k, a in pending))
+        for (row, key, _), result in zip(pending, results):
+            row["apr"] = result
+            if cache is not None:
+                cache.put(key, result)
+    finally:
+        executor.shutdown(wait=False)
+        if cache is not None:
+            cache.commit()
+
+    return rows
+
+
+def write_rows(rows: List[Dict], output: Optional[str]):
+    if output is None:
+        click.echo(json.dumps(rows, indent=2))
+    elif Path(output).suffix == ".csv":
+        with open(output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        Path(output).write_text(json.dumps(rows, indent=2))
+
+
+@click.command(cls=NetworkBoundCommand, short_help="Sweep APR oracles")
+@network_option()
+@click.option("--oracle", "oracles", multiple=True, required=True)
+@click.option("--delta", "deltas", multiple=True, type=int)
+@click.option("--bps", multiple=True, type=int, help="Share of total supply")
+@click.option("--block", default=None, type=int, help="Defaults to latest")
+@click.option("--concurrency", default=16, show_default=True)
+@click.option("--cache", "cache_path", default=str(DEFAULT_CACHE))
+@click.option("--max-entries", default=1_000_000, show_default=True)
+@click.option("--output", default=None, help="CSV or JSON file")
+def cli(
+    network,
+    oracles,
+    deltas,
+    bps,
+    block,
+    concurrency,
+    cache_path,
+    max_entries,
+    output,
+):
+    if block is None:
+        block = chain.blocks.head.number
+
+    cache = AprCache(cache_path, max_entries)
+    start = time.perf_counter()
+    rows = asyncio.run(
+        sweep(
+            web3_call(chain.provider.web3),
+            oracles,
+            block,
+            deltas,
+            bps,
+            cache,
+            concurrency,
+        )
+    )
+    elapsed = time.perf_counter() - start
+    cache.close()
+
+    write_rows(rows, output)
+    click.echo(
+        f"{len(rows)} aprs at block {block} in {elapsed:.2f}s, {cache.hits} cached",
+        err=True,
+    )
@@ -0,0 +1,341 @@
+"""
+Offline backtester for the CompoundV3Lender.
+
+Replays a time series of Comet market state through a model of
+`_totalInvested` and the TokenizedStrategy report accounting to answer
+"what would depositors have earned at report frequency X".
+
+The time series is walked once and every parameter set is simulated in
+parallel as one lane of a numpy array, so sweeping thousands of
+combinations costs about the same as running one.
+
+    ape run backtest --data data/comet_weth_sample.csv \
+        --report-interval 86400 --report-interval 604800
+"""
+import itertools
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Dict, Iterable, Union
+
+import click
+import numpy as np
+
+# Comet tracking indexes and speeds are scaled by 1e15.
+TRACKING_INDEX_SCALE = 1e15
+# Uniswap V3 fees are in hundredths of a bip.
+UNI_FEE_SCALE = 1e6
+COMP_DECIMALS = 18
+MAX_BPS = 10_000
+SECONDS_PER_YEAR = 365 * 24 * 60 * 60
+
+MARKET_COLUMNS = (
+    "timestamp",
+    "supply_index",
+    "tracking_supply_speed",
+    "total_supply",
+    "comp_price",
+    "base_price",
+)
+
+
+@dataclass(frozen=True)
+class MarketSeries:
+    """
+    Comet market state sampled at increasing timestamps.
+
+    `supply_index` is Comet's `baseSupplyIndex`, `tracking_supply_speed`
+    is `baseTrackingSupplySpeed` and `total_supply` is the total base
+    supplied in whole tokens. Prices only need to share a denomination.
+
+    Interest is read off the supply index, which already reflects the
+    rate at each utilization, so utilization isn't needed. Columns not
+    in `MARKET_COLUMNS` are ignored.
+    """
+
+    timestamp: np.ndarray
+    supply_index: np.ndarray
+    tracking_supply_speed: np.ndarray
+    total_supply: np.ndarray
+    comp_price: np.ndarray
+    base_price: np.ndarray
+
+    def __post_init__(self):
+        if len({len(getattr(self, f.name)) for f in fields(self)}) != 1:
+            raise ValueError("columns differ in length")
+        if len(self) < 2:
+            raise ValueError("need at least two observations")
+        if np.any(np.diff(self.timestamp) <= 0):
+            raise ValueError("timestamps must be increasing")
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Iterable[float]]) -> "MarketSeries":
+        missing = [c for c in MARKET_COLUMNS if c not in columns]
+        if missing:
+            raise ValueError(f"missing columns: {missing}")
+        return cls(
+            **{c: np.asarray(columns[c], dtype=np.float64) for c in MARKET_COLUMNS}
+        )
+
+
+def load_market_series(path: Union[str, Path]) -> MarketSeries:
+    """Load a `MarketSeries` from a CSV or Parquet file."""
+    path = Path(path)
+
+    if path.suffix in (".parquet", ".pq"):
+        # Only needed for parquet so it is not a hard requirement.
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("pyarrow is required to load parquet files") from e
+
+        table = pq.read_table(path, columns=list(MARKET_COLUMNS))
+        return MarketSeries.from_columns(
+            {c: table.column(c).to_numpy() for c in MARKET_COLUMNS}
+        )
+
+    data = np.genfromtxt(path, delimiter=",", names=True, dtype=np.float64)
+    return MarketSeries.from_columns({c: data[c] for c in data.dtype.names})
+
+
+@dataclass(frozen=True)
+class StrategyParams:
+    """
+    One lane per parameter set. Units match the strategy's setters:
+    `min_amount_to_sell` is in COMP wei, fees are Uniswap fee tiers,
+    `performance_fee` is in basis points and times are in seconds.
+
+    `eth_to_asset_fee` should be 0 when the asset is WETH, since the
+    swapper only does the single COMP -> WETH hop in that case.
+    """
+
+    report_interval: np.ndarray
+    comp_to_eth_fee: np.ndarray
+    eth_to_asset_fee: np.ndarray
+    min_amount_to_sell: np.ndarray
+    profit_max_unlock_time: np.ndarray
+    performance_fee: np.ndarray
+
+    def __post_init__(self):
+        if len({len(getattr(self, f.name)) for f in fields(self)}) != 1:
+            raise ValueError("parameters differ in length")
+
+    def __len__(self) -> int:
+        return len(self.report_interval)
+
+    @classmethod
+    def grid(
+        cls,
+        report_interval=(7 * 86400,),
+        comp_to_eth_fee=(3000,),
+        eth_to_asset_fee=(500,),
+        min_amount_to_sell=(1e12,),
+        profit_max_unlock_time=(10 * 86400,),
+        performance_fee=(0,),
+    ) -> "StrategyParams":
+        """Cartesian product of every value given for each parameter."""
+        axes = (
+            report_interval,
+            comp_to_eth_fee,
+            eth_to_asset_fee,
+            min_amount_to_sell,
+            profit_max_unlock_time,
+            performance_fee,
+        )
+        combos = np.array(list(itertools.product(*axes)), dtype=np.float64)
+        return cls(*combos.T)
+
+
+@dataclass(frozen=True)
+class BacktestResult:
+    params: StrategyParams
+    timestamp: np.ndarray
+    # (params, time) price per share as seen by depositors.
+    price_per_share: np.ndarray
+    apy: np.ndarray
+    reports: np.ndarray
+    comp_claimed: np.ndarray
+    comp_sold: np.ndarray
+    asset_from_rewards: np.ndarray
+    unsold_comp: np.ndarray
+    performance_fees: np.ndarray
+
+
+class _Lanes:
+    """Strategy and TokenizedStrategy state for every lane."""
+
+    def __init__(self, n: int, deposit: float, start: float):
+        # asset supplied to comet
+        self.balance = np.full(n, deposit)
+        # rewards accrued in comet but not yet claimed
+        self.pending_comp = np.zeros(n)
+        self.comp = np.zeros(n)
+        # TokenizedStrategy accounting
+        self.total_assets = np.full(n, deposit)
+        self.total_supply = np.full(n, deposit)
+        self.locked_shares = np.zeros(n)
+        self.unlock_rate = np.zeros(n)
+        self.full_unlock = np.full(n, start)
+        self.last_report = np.full(n, start)
+        # stats
+        self.reports = np.zeros(n, dtype=np.int64)
+        self.comp_claimed = np.zeros(n)
+        self.comp_sold = np.zeros(n)
+        self.asset_from_rewards = np.zeros(n)
+        self.performance_fees = np.zeros(n)
+
+    def unlocked_shares(self, now: float) -> np.ndarray:
+        unlocked = np.where(
+            self.full_unlock > now,
+            self.unlock_rate * (now - self.last_report),
+            self.locked_shares,
+        )
+        return np.minimum(unlocked, self.locked_shares)
+
+    def price_per_share(self, now: float) -> np.ndarray:
+        return self.total_assets / (self.total_supply - self.unlocked_shares(now))
+
+    def report(
+        self,
+        idx: np.ndarray,
+        now: float,
+        params: StrategyParams,
+        comp_price: float,
+        base_price: float,
+    ):
+        # Burn whatever unlocked since the last report.
+        unlocked = self.unlocked_shares(now)[idx]
+        self.locked_shares[idx] -= unlocked
+        self.total_supply[idx] -= unlocked
+
+        # _totalInvested: claim, sell if above the min, resupply.
+        claimed = self.pending_comp[idx]
+        self.pending_comp[idx] = 0
+        comp = self.comp[idx] + claimed
+        sell = comp * 10**COMP_DECIMALS > params.min_amount_to_sell[idx]
+        out = (
+            comp
+            * (comp_price / base_price)
+            * (1 - params.comp_to_eth_fee[idx] / UNI_FEE_SCALE)
+            * (1 - params.eth_to_asset_fee[idx] / UNI_FEE_SCALE)
+        )
+        out = np.where(sell, out, 0)
+        self.balance[idx] += out
+        self.comp[idx] = np.where(sell, 0, comp)
+
+        # TokenizedStrategy.report
+        invested = self.balance[idx]
+        old_assets = self.total_assets[idx]
+        supply = self.total_supply[idx]
+        profit = np.maximum(invested - old_assets, 0)
+        loss = np.maximum(old_assets - invested, 0)
+        fees = profit * params.performance_fee[idx] / MAX_BPS
+
+        unlock_time = params.profit_max_unlock_time[idx]
+        fee_shares = fees * supply / old_assets
+        to_lock = np.where(unlock_time > 0, (profit - fees) * supply / old_assets, 0)
+        locked = self.locked_shares[idx]
+        burn = np.minimum(locked, loss * supply / old_assets)
+        previously_locked = locked - burn
+        total_locked = previously_locked + to_lock
+
+        remaining = np.maximum(self.full_unlock[idx] - now, 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            period = (
+                previously_locked * remaining + to_lock * unlock_time
+            ) / total_locked
+            rate = np.where(period > 0, total_locked / period, 0)
+
+        self.total_supply[idx] = supply + fee_shares + to_lock - burn
+        self.locked_shares[idx] = total_locked
+        self.unlock_rate[idx] = rate
+        self.full_unlock[idx] = np.where(total_locked > 0, now + period, now)
+        self.last_report[idx] = now
+        self.total_assets[idx] = invested
+
+        self.reports[idx] += 1
+        self.comp_claimed[idx] += claimed
+        self.comp_sold[idx] += np.where(sell, comp, 0)
+        self.asset_from_rewards[idx] += out
+        self.performance_fees[idx] += fees
+
+
+def run_backtest(
+    market: MarketSeries, params: StrategyParams, deposit: float = 100.0
+) -> BacktestResult:
+    """
+    Simulate a single `deposit` (in whole `asset`) made at the first
+    observation, reporting every `report_interval` seconds afterwards.
+
+    Interest follows the supply index, rewards accrue pro rata to the
+    strategy's share of `total_supply` and reward swaps are priced at
+    the oracle prices less the Uniswap fee of each hop.
+    """
+    n = len(params)
+    t = market.timestamp
+    lanes = _Lanes(n, deposit, t[0])
+    pps = np.empty((n, len(market)))
+    pps[:, 0] = 1.0
+
+    for i in range(1, len(market)):
+        now = t[i]
+        elapsed = now - t[i - 1]
+
+        lanes.pending_comp += (
+            market.tracking_supply_speed[i - 1]
+            / TRACKING_INDEX_SCALE
+            * elapsed
+            * lanes.balance
+            / market.total_supply[i - 1]
+        )
+        lanes.balance *= market.supply_index[i] / market.supply_index[i - 1]
+
+        (due,) = np.nonzero(now - lanes.last_report >= params.report_interval)
+        if len(due):
+            lanes.report(due, now, params, market.comp_price[i], market.base_price[i])
+
+        pps[:, i] = lanes.price_per_share(now)
+
+    duration = t[-1] - t[0]
+    apy = pps[:, -1] ** (SECONDS_PER_YEAR / duration) - 1
+
+    return BacktestResult(
+        params=params,
+        timestamp=t,
+        price_per_share=pps,
+        apy=apy,
+        reports=lanes.reports,
+        comp_claimed=lanes.comp_claimed,
+        comp_sold=lanes.comp_sold,
+        asset_from_rewards=lanes.asset_from_rewards,
+        unsold_comp=lanes.comp + lanes.pending_comp,
+        performance_fees=lanes.performance_fees,
+    )
+
+
+@click.command(short_help="Backtest CompoundV3Lender yield over market data")
+@click.option("--data", "data_path", required=True, type=click.Path(exists=True))
+@click.option("--deposit", default=100.0, show_default=True)
+@click.option("--report-interval", multiple=True, type=int, default=(7 * 86400,))
+@click.option("--comp-to-eth-fee", multiple=True, type=int, default=(3000,))
+@click.option("--eth-to-asset-fee", multiple=True, type=int, default=(500,))
+@click.option("--min-amount-to-sell", multiple=True, type=float, default=(1e12,))
+@click.option("--profit-max-unlock-time", multiple=True, type=int, default=(864000,))
+@click.option("--performance-fee", multiple=True, type=int, default=(0,))
+def cli(data_path, deposit, **axes):
+    market = load_market_series(data_path)
+    params = StrategyParams.grid(**axes)
+    result = run_backtest(market, params, deposit)
+
+    header = [f.name for f in fields(StrategyParams)] + ["reports", "comp_sold", "apy"]
+    click.echo(",".join(header))
+    for i in np.argsort(-result.apy):
+        row = [getattr(params, f.name)[i] for f in fields(StrategyParams)]
+        row += [result.reports[i], result.comp_sold[i], result.apy[i]]
+        click.echo(",".join(f"{v:g}" for v in row))
+
+
+if __name__ == "__main__":
+    cli()
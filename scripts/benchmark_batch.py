@@ -0,0 +1,63 @@
+"""
+Gas per user of depositing through the `BatchDepositor` against
+depositing into the strategy directly.
+
+    ape run benchmark_batch --network ethereum:mainnet-fork:hardhat \
+        --users 10 --users 100 --users 1000
+"""
+import click
+from ape import Contract, accounts, chain, project
+from ape.cli import NetworkBoundCommand, network_option
+from eth_utils import to_checksum_address
+
+from scripts.benchmark_gas import MARKETS, WHALE, deploy_strategy
+
+
+def make_users(count, asset, amount):
+    """Funded accounts that have approved nothing yet."""
+    whale = accounts.test_accounts[WHALE]
+    users = []
+    for i in range(count):
+        address = to_checksum_address(f"0x{0xBA7C4 + i:040x}")
+        chain.provider.set_balance(address, int(1e18))
+        asset.transfer(address, amount, sender=whale)
+        users.append(accounts.test_accounts[address])
+    return users
+
+
+def benchmark_users(market, count):
+    asset, comet, amount, comp_fee, asset_fee = MARKETS[market]
+    management = accounts.test_accounts[0]
+    asset = Contract(asset)
+    amount = amount // count
+
+    strategy, _ = deploy_strategy(management, asset, comet, comp_fee, asset_fee)
+    batcher = management.deploy(project.BatchDepositor, strategy, 0)
+    users = make_users(count, asset, 2 * amount)
+
+    direct = 0
+    for user in users:
+        asset.approve(strategy, amount, sender=user)
+        direct += strategy.deposit(amount, user, sender=user).gas_used
+
+    batched = 0
+    for user in users:
+        asset.approve(batcher, amount, sender=user)
+        batched += batcher.deposit(amount, sender=user).gas_used
+    batched += batcher.execute(sender=management).gas_used
+    for user in users:
+        batched += batcher.claim(sender=user).gas_used
+
+    return direct // count, batched // count
+
+
+@click.command(cls=NetworkBoundCommand)
+@network_option()
+@click.option("--market", default="usdc", type=click.Choice(list(MARKETS)))
+@click.option("--users", "user_counts", multiple=True, type=int)
+def cli(network, market, user_counts):
+    click.echo(f"{'users':>8}{'direct':>12}{'batched':>12}{'saved':>12}")
+    for count in user_counts or (10, 100, 1000):
+        with chain.isolate():
+            direct, batched = benchmark_users(market, count)
+        click.echo(f"{count:>8}{direct:>12}{batched:>12}{direct - batched:>12}")
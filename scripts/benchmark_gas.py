@@ -0,0 +1,154 @@
+"""
+Gas used by each strategy operation on the USDC and WETH comets, for
+comparing the cost of changes to the hot paths. Save a run on one commit
+with `--output` and pass it as `--baseline` on another to see the diff.
+
+    ape run benchmark_gas --network ethereum:mainnet-fork:hardhat \
+        --output before.json
+"""
+import json
+
+import click
+from ape import Contract, accounts, chain, project
+from ape.cli import NetworkBoundCommand, network_option
+
+DAY = 24 * 60 * 60
+
+WHALE = "0xBA12222222228d8Ba445958a75a0704d566BF2C8"
+COMP = "0xc00e94Cb662C3520282E6f5717214004A7f26888"
+
+MARKETS = {
+    # name: (asset, comet, amount, comp to eth fee, eth to asset fee)
+    "usdc": (
+        "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48",
+        "0xc3d688B66703497DAA19211EEdff47f25384cdc3",
+        int(100_000e6),
+        3000,
+        500,
+    ),
+    "weth": (
+        "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2",
+        "0xA17581A9E3356d9A858b789D68B4d866e593aE94",
+        int(100e18),
+        3000,
+        0,
+    ),
+}
+
+
+def deploy_strategy(management, asset, comet, comp_fee, asset_fee):
+    """Deploy and configure a strategy, returning it and the deploy gas."""
+    deployed = management.deploy(project.CompoundV3Lender, asset, "Benchmark", comet)
+    deploy_gas = chain.provider.get_receipt(deployed.txn_hash).gas_used
+
+    strategy = project.IStrategyInterface.at(deployed.address)
+    strategy.setPerformanceFee(0, sender=management)
+    strategy.setUniFees(comp_fee, asset_fee, sender=management)
+    strategy.setMinAmountToSell(0, sender=management)
+    return strategy, deploy_gas
+
+
+def benchmark_market(name):
+    """Gas used for each operation through a full strategy lifecycle."""
+    asset, comet, amount, comp_fee, asset_fee = MARKETS[name]
+    management, user = accounts.test_accounts[:2]
+    whale = accounts.test_accounts[WHALE]
+    asset = Contract(asset)
+
+    gas = {}
+
+    strategy, gas["deploy"] = deploy_strategy(
+        management, asset, comet, comp_fee, asset_fee
+    )
+
+    gas["clone"] = strategy.cloneCompoundV3Lender(
+        asset,
+        "Benchmark clone",
+        management,
+        management,
+        management,
+        comet,
+        sender=management,
+    ).gas_used
+
+    asset.transfer(user, 2 * amount, sender=whale)
+    asset.approve(strategy, 2 * amount, sender=user)
+
+    gas["first deposit"] = strategy.deposit(amount, user, sender=user).gas_used
+    chain.mine(timestamp=chain.pending_timestamp + DAY)
+    gas["deposit"] = strategy.deposit(amount, user, sender=user).gas_used
+
+    chain.mine(timestamp=chain.pending_timestamp + 5 * DAY)
+    gas["report"] = strategy.report(sender=management).gas_used
+
+    # Report with a comp balance to sell regardless of the comet rewards
+    Contract(COMP).transfer(strategy, int(1e18), sender=whale)
+    chain.mine(timestamp=chain.pending_timestamp + DAY)
+    gas["report with swap"] = strategy.report(sender=management).gas_used
+
+    # Claims and sells a day of rewards on rewarded comets only
+    chain.mine(timestamp=chain.pending_timestamp + DAY)
+    gas["report after a day"] = strategy.report(sender=management).gas_used
+
+    gas["partial withdraw"] = strategy.withdraw(
+        amount // 2, user, user, sender=user
+    ).gas_used
+    gas["full redeem"] = strategy.redeem(
+        strategy.balanceOf(user), user, user, sender=user
+    ).gas_used
+
+    # Fresh deposit to exit through the emergency path
+    asset.transfer(user, amount, sender=whale)
+    asset.approve(strategy, amount, sender=user)
+    strategy.deposit(amount, user, sender=user)
+    strategy.shutdownStrategy(sender=management)
+    gas["emergency withdraw"] = strategy.emergencyWithdraw(
+        amount // 2, sender=management
+    ).gas_used
+    gas["emergency withdraw all"] = strategy.emergencyWithdraw(
+        2**256 - 1, sender=management
+    ).gas_used
+
+    return gas
+
+
+@click.command(cls=NetworkBoundCommand)
+@network_option()
+@click.option("--market", "markets", multiple=True, default=tuple(MARKETS))
+@click.option("--output", type=click.Path(), default=None, help="Save as JSON")
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True),
+    default=None,
+    help="JSON from a previous run to diff against",
+)
+def cli(network, markets, output, baseline):
+    results = {}
+    for name in markets:
+        with chain.isolate():
+            results[name] = benchmark_market(name)
+
+    if output is not None:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    before = {}
+    if baseline is not None:
+        with open(baseline) as f:
+            before = json.load(f)
+
+    operations = list(next(iter(results.values())))
+    click.echo(f"{'operation':<22}" + "".join(f"{m:>20}" for m in results))
+    rewarded = (
+        "yes" if Contract(MARKETS[m][1]).baseTrackingSupplySpeed() > 0 else "no"
+        for m in results
+    )
+    click.echo(f"{'comet pays rewards':<22}" + "".join(f"{r:>20}" for r in rewarded))
+    for op in operations:
+        line = f"{op:<22}"
+        for m in results:
+            gas = results[m][op]
+            old = before.get(m, {}).get(op)
+            diff = "" if old is None else f" ({gas - old:+})"
+            line += f"{str(gas) + diff:>20}"
+        click.echo(line)
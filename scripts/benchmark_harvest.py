@@ -0,0 +1,68 @@
+"""
+A week of daily reports harvesting in the report against staged
+harvests, where reports only claim and tends sell and reinvest.
+
+    ape run benchmark_harvest --network ethereum:mainnet-fork:hardhat
+"""
+import click
+import numpy as np
+from ape import Contract, accounts, chain
+from ape.cli import NetworkBoundCommand, network_option
+
+from scripts.benchmark_gas import DAY, MARKETS, WHALE, deploy_strategy
+
+
+def run_week(market, staged, tend_value, days=7):
+    asset, comet, amount, comp_fee, asset_fee = MARKETS[market]
+    management, user = accounts.test_accounts[:2]
+    whale = accounts.test_accounts[WHALE]
+    asset = Contract(asset)
+
+    strategy, _ = deploy_strategy(management, asset, comet, comp_fee, asset_fee)
+    if staged:
+        strategy.setStagedHarvest(True, sender=management)
+        strategy.setTendParams(
+            strategy.minIdleToTend(), tend_value, 0, sender=management
+        )
+
+    asset.transfer(user, amount, sender=whale)
+    asset.approve(strategy, amount, sender=user)
+    strategy.deposit(amount, user, sender=user)
+
+    reports, tends, profit = [], [], 0
+    for _ in range(days):
+        chain.mine(timestamp=chain.pending_timestamp + DAY)
+        tx = strategy.report(sender=management)
+        reports.append(tx.gas_used)
+        profit += tx.return_value[0]
+        if strategy.tendTrigger():
+            tends.append(strategy.tend(sender=management).gas_used)
+
+    return np.array(reports), np.array(tends), profit
+
+
+@click.command(cls=NetworkBoundCommand)
+@network_option()
+@click.option("--market", default="weth", type=click.Choice(list(MARKETS)))
+@click.option("--days", default=7, show_default=True)
+@click.option(
+    "--tend-value",
+    default=0,
+    show_default=True,
+    help="minCompValueToTend for the staged run, in asset wei",
+)
+def cli(network, market, days, tend_value):
+    click.echo(
+        f"{'mode':<10}{'report mean':>14}{'report std':>12}{'report max':>12}"
+        f"{'tends':>8}{'total gas':>12}{'profit':>24}"
+    )
+    for mode in ("combined", "staged"):
+        with chain.isolate():
+            reports, tends, profit = run_week(
+                market, mode == "staged", tend_value, days
+            )
+        total = int(reports.sum() + tends.sum())
+        click.echo(
+            f"{mode:<10}{reports.mean():>14.0f}{reports.std():>12.0f}"
+            f"{reports.max():>12}{len(tends):>8}{total:>12}{profit:>24}"
+        )
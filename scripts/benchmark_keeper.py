@@ -0,0 +1,77 @@
+"""
+Gas per strategy of reporting clones through the `KeeperBatcher` against
+one report transaction each.
+
+    ape run benchmark_keeper --network ethereum:mainnet-fork:hardhat \
+        --strategies 1 --strategies 10 --strategies 50
+"""
+import click
+from ape import Contract, accounts, chain, project
+from ape.cli import NetworkBoundCommand, network_option
+
+from scripts.benchmark_gas import DAY, MARKETS, WHALE, deploy_strategy
+
+
+def deploy_clones(count, market):
+    """`count` funded clones of one strategy, all kept by a batcher."""
+    asset, comet, amount, comp_fee, asset_fee = MARKETS[market]
+    management, user = accounts.test_accounts[:2]
+    whale = accounts.test_accounts[WHALE]
+    asset = Contract(asset)
+    amount = amount // count
+
+    original, _ = deploy_strategy(management, asset, comet, comp_fee, asset_fee)
+    batcher = management.deploy(project.KeeperBatcher)
+
+    strategies = []
+    for i in range(count):
+        clone = original.cloneCompoundV3Lender(
+            asset,
+            f"Benchmark clone {i}",
+            management,
+            management,
+            batcher,
+            comet,
+            sender=management,
+        ).return_value
+        strategy = project.IStrategyInterface.at(clone)
+        strategy.setPerformanceFee(0, sender=management)
+        strategy.setUniFees(comp_fee, asset_fee, sender=management)
+        strategy.setMinAmountToSell(0, sender=management)
+
+        asset.transfer(user, amount, sender=whale)
+        asset.approve(strategy, amount, sender=user)
+        strategy.deposit(amount, user, sender=user)
+        strategies.append(strategy)
+
+    return management, batcher, strategies
+
+
+def benchmark_clones(market, count):
+    management, batcher, strategies = deploy_clones(count, market)
+    chain.mine(timestamp=chain.pending_timestamp + DAY)
+
+    # The batcher is each clone's keeper, management can report directly
+    with chain.isolate():
+        individual = sum(
+            strategy.report(sender=management).gas_used for strategy in strategies
+        )
+
+    tx = batcher.reportAll(strategies, sender=management)
+    assert all(report[0] for report in tx.return_value)
+
+    return individual // count, tx.gas_used // count
+
+
+@click.command(cls=NetworkBoundCommand)
+@network_option()
+@click.option("--market", default="usdc", type=click.Choice(list(MARKETS)))
+@click.option("--strategies", "counts", multiple=True, type=int)
+def cli(network, market, counts):
+    click.echo(f"{'strategies':>12}{'individual':>12}{'batched':>12}{'saved':>12}")
+    for count in counts or (1, 10, 50):
+        with chain.isolate():
+            individual, batched = benchmark_clones(market, count)
+        click.echo(
+            f"{count:>12}{individual:>12}{batched:>12}{individual - batched:>12}"
+        )
@@ -0,0 +1,94 @@
+"""
+Benchmark reading the monitoring state of many clones through
+`CompoundV3LenderLens` against one call per field per strategy.
+
+    ape run benchmark_lens --network ethereum:mainnet-fork:hardhat --count 500
+"""
+import time
+
+import click
+from ape import Contract, accounts, project
+from ape.cli import NetworkBoundCommand, network_option
+
+from scripts.lens import fetch_states
+
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+USDC_COMET = "0xc3d688B66703497DAA19211EEdff47f25384cdc3"
+
+
+def deploy_clones(deployer, count):
+    strategy = deployer.deploy(
+        project.CompoundV3Lender, USDC, "Benchmark Lender", USDC_COMET
+    )
+    strategy = project.IStrategyInterface.at(strategy.address)
+    clones = [strategy]
+    while len(clones) < count:
+        tx = strategy.cloneCompoundV3Lender(
+            USDC,
+            f"Benchmark Lender {len(clones)}",
+            deployer,
+            deployer,
+            deployer,
+            USDC_COMET,
+            sender=deployer,
+        )
+        clones.append(project.IStrategyInterface.at(tx.return_value))
+    return clones
+
+
+def read_directly(strategy, asset, oracle):
+    comet = Contract(strategy.comet())
+    return (
+        comet.address,
+        comet.balanceOf(strategy),
+        asset.balanceOf(strategy),
+        strategy.getPendingRewards(),
+        strategy.lastReport(),
+        strategy.isShutdown(),
+        oracle.aprAfterDebtChange(asset, 0),
+    )
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+@click.command(cls=NetworkBoundCommand)
+@network_option()
+@click.option("--count", default=500, show_default=True)
+@click.option("--page-size", default=100, show_default=True)
+def cli(network, count, page_size):
+    deployer = accounts.test_accounts[0]
+    asset = Contract(USDC)
+
+    click.echo(f"Deploying {count} strategies...")
+    clones = deploy_clones(deployer, count)
+
+    oracle = deployer.deploy(project.CompoundV3AprOracle, "Benchmark", USDC_COMET)
+    lens = deployer.deploy(project.CompoundV3LenderLens)
+    lens.setOracle(USDC_COMET, oracle, sender=deployer)
+    lens.addStrategies(clones, sender=deployer)
+
+    direct, direct_time = timed(
+        lambda: [read_directly(s, asset, oracle) for s in clones]
+    )
+    listed, listed_time = timed(fetch_states, lens, clones, page_size)
+    stored, stored_time = timed(fetch_states, lens, None, page_size)
+
+    assert [s.comet_balance for s in stored] == [d[1] for d in direct]
+
+    pages = -(-count // page_size)
+    page_gas = lens.getStates.estimate_gas_cost(0, page_size)
+
+    click.echo(f"{'method':<20}{'calls':>8}{'seconds':>10}{'per strategy ms':>18}")
+    for name, calls, elapsed in (
+        ("direct", count * 8, direct_time),
+        ("lens list", pages, listed_time),
+        ("lens paginated", pages + 1, stored_time),
+    ):
+        click.echo(
+            f"{name:<20}{calls:>8}{elapsed:>10.2f}{1000 * elapsed / count:>18.3f}"
+        )
+    click.echo(f"gas per {page_size} strategy page: {page_gas}")
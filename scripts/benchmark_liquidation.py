@@ -0,0 +1,75 @@
+"""
+Selling a large COMP balance in one swap against selling it in chunks of
+`maxAmountToSell` over several reports. Reports the gas, the execution
+price and its shortfall from the price feeds for each.
+
+    ape run benchmark_liquidation --network ethereum:mainnet-fork:hardhat \
+        --comp 1000 --chunk 100 --slippage 300
+"""
+import click
+from ape import Contract, accounts, chain
+from ape.cli import NetworkBoundCommand, network_option
+
+from scripts.benchmark_gas import COMP, DAY, MARKETS, WHALE, deploy_strategy
+
+
+def feed_price(strategy, comet):
+    """`asset` per whole COMP at the strategy's price feeds."""
+    comp_price = comet.getPrice(strategy.rewardTokenPriceFeed())
+    base_price = comet.getPrice(strategy.baseTokenPriceFeed())
+    return comp_price / base_price
+
+
+def liquidate(market, comp_amount, chunk, slippage):
+    asset, comet, amount, comp_fee, asset_fee = MARKETS[market]
+    management, user = accounts.test_accounts[:2]
+    whale = accounts.test_accounts[WHALE]
+    asset, comet = Contract(asset), Contract(comet)
+    scale = 10 ** asset.decimals()
+
+    strategy, _ = deploy_strategy(management, asset, comet, comp_fee, asset_fee)
+    # Only sell the balance sent, not whatever is claimed along the way
+    strategy.setMinRewardsToClaim(2**88 - 1, sender=management)
+    if chunk:
+        strategy.setLiquidationParams(chunk, slippage, sender=management)
+
+    asset.transfer(user, amount, sender=whale)
+    asset.approve(strategy, amount, sender=user)
+    strategy.deposit(amount, user, sender=user)
+    Contract(COMP).transfer(strategy, comp_amount, sender=whale)
+
+    price = feed_price(strategy, comet)
+    gas, sold, received = [], 0, 0
+    while Contract(COMP).balanceOf(strategy) > 0:
+        chain.mine(timestamp=chain.pending_timestamp + DAY)
+        tx = strategy.report(sender=management)
+        (event,) = list(tx.decode_logs(strategy.Harvested))
+        gas.append(tx.gas_used)
+        sold += event.sold
+        received += event.received
+
+    execution = (received / scale) / (sold / 1e18)
+    return len(gas), sum(gas), execution, 1 - execution / price
+
+
+@click.command(cls=NetworkBoundCommand)
+@network_option()
+@click.option("--market", default="usdc", type=click.Choice(list(MARKETS)))
+@click.option("--comp", "comp_amount", default=1_000, show_default=True)
+@click.option("--chunk", default=100, show_default=True, help="COMP per report")
+@click.option(
+    "--slippage",
+    default=10_000,
+    show_default=True,
+    help="maxSlippage in bps below the price feeds",
+)
+def cli(network, market, comp_amount, chunk, slippage):
+    click.echo(
+        f"{'mode':<10}{'reports':>9}{'total gas':>12}{'price':>14}{'shortfall':>11}"
+    )
+    for mode, size in (("one swap", 0), ("chunked", chunk)):
+        with chain.isolate():
+            reports, gas, price, shortfall = liquidate(
+                market, int(comp_amount * 1e18), int(size * 1e18), slippage
+            )
+        click.echo(f"{mode:<10}{reports:>9}{gas:>12}{price:>14.4f}{shortfall:>11.2%}")
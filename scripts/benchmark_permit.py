@@ -0,0 +1,86 @@
+"""
+Gas and latency per deposit of approve + deposit against a single
+`DepositRouter` transaction, with a permit for USDC and from ETH for
+weth.
+
+    ape run benchmark_permit --network ethereum:mainnet-fork:hardhat
+"""
+import time
+
+import click
+from ape import Contract, accounts, chain, project
+from ape.cli import NetworkBoundCommand, network_option
+
+from scripts.benchmark_gas import MARKETS, WHALE, deploy_strategy
+from scripts.permit import sign_permit
+
+
+def timed(*txs):
+    """Total gas and seconds of sending `txs` one after the other."""
+    start = time.perf_counter()
+    gas = sum(tx().gas_used for tx in txs)
+    return gas, time.perf_counter() - start
+
+
+def benchmark_market(name, deposits):
+    asset, comet, amount, comp_fee, asset_fee = MARKETS[name]
+    management, user = accounts.test_accounts[:2]
+    asset = Contract(asset)
+    amount = amount // deposits
+
+    strategy, _ = deploy_strategy(management, asset, comet, comp_fee, asset_fee)
+    router = management.deploy(project.DepositRouter)
+    if name == "weth":
+        user.transfer(asset, 2 * amount * deposits)
+    else:
+        asset.transfer(
+            user, 2 * amount * deposits, sender=accounts.test_accounts[WHALE]
+        )
+
+    direct = [
+        timed(
+            lambda: asset.approve(strategy, amount, sender=user),
+            lambda: strategy.deposit(amount, user, sender=user),
+        )
+        for _ in range(deposits)
+    ]
+
+    routed = []
+    for _ in range(deposits):
+        if name == "weth":
+            routed.append(
+                timed(
+                    lambda: router.depositEth(strategy, user, value=amount, sender=user)
+                )
+            )
+        else:
+            deadline = chain.pending_timestamp + 3600
+            v, r, s = sign_permit(asset, user, router, amount, deadline)
+            routed.append(
+                timed(
+                    lambda: router.depositWithPermit(
+                        strategy, amount, user, deadline, v, r, s, sender=user
+                    )
+                )
+            )
+
+    return direct, routed
+
+
+@click.command(cls=NetworkBoundCommand)
+@network_option()
+@click.option("--deposits", default=10, show_default=True)
+def cli(network, deposits):
+    click.echo(f"{'flow':<24}{'txs':>6}{'gas':>12}{'ms':>10}")
+    for name in MARKETS:
+        with chain.isolate():
+            direct, routed = benchmark_market(name, deposits)
+
+        single = "permit + deposit" if name != "weth" else "eth deposit"
+        for flow, txs, results in (
+            (f"{name} approve + deposit", 2, direct),
+            (f"{name} {single}", 1, routed),
+        ):
+            gas = sum(g for g, _ in results) // len(results)
+            ms = 1000 * sum(t for _, t in results) / len(results)
+            click.echo(f"{flow:<24}{txs:>6}{gas:>12}{ms:>10.1f}")
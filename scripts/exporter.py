@@ -0,0 +1,283 @@
+"""
+Prometheus exporter for the health of every strategy in a lens.
+
+Each scrape reads all the strategies' states through
+`CompoundV3LenderLens` and their total assets and comet utilizations in
+one multicall, then serves the latest values in the Prometheus text
+format on `/metrics` along with histograms of how long the scrape and
+each RPC call took.
+
+    ape run exporter --network ethereum:mainnet-fork:hardhat \
+        --lens 0x... --port 9108 --interval 60
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import click
+from ape import chain, project
+from ape.cli import NetworkBoundCommand, network_option
+from ape_ethereum import multicall
+
+from scripts.lens import fetch_states
+
+PREFIX = "compound_lender_"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Seconds, RPC calls against a remote node rarely take under 50ms.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Comet utilization, oracle aprs and the lens' prices are all 1e18.
+WAD = 1e18
+COMP_DECIMALS = 18
+
+GAUGES = {
+    "total_assets": "Total assets as of the last report, in asset",
+    "idle": "Loose asset held by the strategy, in asset",
+    "comet_balance": "Asset supplied to comet including accrued interest",
+    "pending_comp": "COMP accrued but not yet claimed",
+    "is_shutdown": "1 if the strategy has been shutdown",
+    "apr": "The apr oracle's aprAfterDebtChange(asset, 0)",
+    "seconds_since_report": "Seconds since the strategy last reported",
+    "comet_utilization": "Utilization of the strategy's comet",
+    "last_scrape_timestamp_seconds": "Unix time of the last successful scrape",
+}
+HISTOGRAMS = {
+    "scrape_duration_seconds": "Time taken by a full scrape",
+    "rpc_latency_seconds": "Time taken by each RPC call of a scrape",
+}
+COUNTERS = {
+    "scrape_errors_total": "Scrapes that raised before completing",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count of the observed values."""
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name: str, labels: Labels) -> List[str]:
+        lines = [
+            f"{name}_bucket{_labels(labels + (('le', _value(bound)),))} {count}"
+            for bound, count in zip(self.buckets, self.counts)
+        ]
+        lines.append(f"{name}_sum{_labels(labels)} {_value(self.sum)}")
+        lines.append(f"{name}_count{_labels(labels)} {self.count}")
+        return lines
+
+
+class Metrics:
+    """
+    The exporter's metrics. Gauges are replaced as a whole every scrape
+    so removed strategies disappear, histograms and counters accumulate.
+    Safe to render from the HTTP thread while the scrape loop updates.
+    """
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._lock = threading.Lock()
+
+    def set_gauges(self, gauges: Dict[str, Dict[Labels, float]]):
+        unknown = set(gauges) - set(GAUGES)
+        if unknown:
+            raise ValueError(f"unknown gauges: {unknown}")
+        with self._lock:
+            self._gauges = gauges
+
+    def observe(self, name: str, value: float, labels: Labels = ()):
+        with self._lock:
+            histograms = self._histograms.setdefault(name, {})
+            if labels not in histograms:
+                histograms[labels] = Histogram(self.buckets)
+            histograms[labels].observe(value)
+
+    def inc(self, name: str, labels: Labels = ()):
+        with self._lock:
+            counters = self._counters.setdefault(name, {})
+            counters[labels] = counters.get(labels, 0) + 1
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for kind, docs, values in (
+                ("gauge", GAUGES, self._gauges),
+                ("histogram", HISTOGRAMS, self._histograms),
+                ("counter", COUNTERS, self._counters),
+            ):
+                for name, doc in docs.items():
+                    series = values.get(name)
+                    if not series:
+                        continue
+                    full = PREFIX + name
+                    lines.append(f"# HELP {full} {doc}")
+                    lines.append(f"# TYPE {full} {kind}")
+                    for labels, value in sorted(series.items()):
+                        if kind == "histogram":
+                            lines += value.lines(full, labels)
+                        else:
+                            lines.append(f"{full}{_labels(labels)} {_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class Exporter:
+    """Scrapes the strategies in `lens`, or just `strategies` if given."""
+
+    def __init__(
+        self,
+        lens,
+        strategies: Optional[Iterable[str]] = None,
+        page_size: int = 100,
+        metrics: Optional[Metrics] = None,
+    ):
+        self.lens = lens
+        self.strategies = None if strategies is None else list(strategies)
+        self.page_size = page_size
+        self.metrics = metrics or Metrics()
+        # Decimals never change, only read them the first time.
+        self._decimals: Dict[str, int] = {}
+
+    def _timed(self, call: str, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.metrics.observe(
+                "rpc_latency_seconds",
+                time.perf_counter() - start,
+                (("call", call),),
+            )
+
+    def scrape(self):
+        start = time.perf_counter()
+        try:
+            gauges = self._read()
+        except Exception:
+            self.metrics.inc("scrape_errors_total")
+            raise
+        self.metrics.set_gauges(gauges)
+        self.metrics.observe("scrape_duration_seconds", time.perf_counter() - start)
+
+    def _read(self) -> Dict[str, Dict[Labels, float]]:
+        states = self._timed(
+            "lens", fetch_states, self.lens, self.strategies, self.page_size
+        )
+        now = self._timed("block", lambda: chain.blocks.head.timestamp)
+        gauges = {name: {} for name in GAUGES}
+        gauges["last_scrape_timestamp_seconds"][()] = time.time()
+        if not states:
+            return gauges
+
+        strategies = [project.IStrategyInterface.at(s.strategy) for s in states]
+        comets = sorted({s.comet for s in states})
+        new = [s for s in strategies if s.address not in self._decimals]
+
+        call = multicall.Call()
+        for strategy in strategies:
+            call.add(strategy.totalAssets)
+        for comet in comets:
+            call.add(project.Comet.at(comet).getUtilization)
+        for strategy in new:
+            call.add(strategy.decimals)
+        results = list(self._timed("multicall", call))
+
+        total_assets = results[: len(strategies)]
+        utilizations = results[len(strategies) : len(strategies) + len(comets)]
+        for strategy, decimals in zip(new, results[len(strategies) + len(comets) :]):
+            self._decimals[strategy.address] = decimals
+
+        for comet, utilization in zip(comets, utilizations):
+            gauges["comet_utilization"][(("comet", comet),)] = utilization / WAD
+
+        for state, assets in zip(states, total_assets):
+            labels = (("strategy", state.strategy), ("comet", state.comet))
+            scale = 10 ** self._decimals[state.strategy]
+            gauges["total_assets"][labels] = assets / scale
+            gauges["idle"][labels] = state.idle / scale
+            gauges["comet_balance"][labels] = state.comet_balance / scale
+            gauges["pending_comp"][labels] = state.pending_rewards / 10**COMP_DECIMALS
+            gauges["is_shutdown"][labels] = float(state.is_shutdown)
+            gauges["apr"][labels] = state.apr / WAD
+            gauges["seconds_since_report"][labels] = max(now - state.last_report, 0)
+
+        return gauges
+
+
+def make_server(metrics: Metrics, port: int, host: str = "") -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Scrapes every few seconds would flood the output.
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+@click.command(cls=NetworkBoundCommand)
+@network_option()
+@click.option("--lens", "lens_address", required=True)
+@click.option(
+    "--strategy",
+    "strategies",
+    multiple=True,
+    help="Only export these, defaults to every strategy in the lens",
+)
+@click.option("--port", default=9108, show_default=True)
+@click.option("--interval", default=60, show_default=True, help="Seconds")
+@click.option("--page-size", default=100, show_default=True)
+def cli(network, lens_address, strategies, port, interval, page_size):
+    lens = project.CompoundV3LenderLens.at(lens_address)
+    exporter = Exporter(lens, strategies or None, page_size)
+
+    server = make_server(exporter.metrics, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    click.echo(f"Serving metrics on :{port}/metrics")
+
+    while True:
+        start = time.monotonic()
+        try:
+            exporter.scrape()
+        except Exception as e:
+            # Keep serving the last good values, the error count shows it.
+            click.echo(f"Scrape failed: {e!r}", err=True)
+        time.sleep(max(interval - (time.monotonic() - start), 0))
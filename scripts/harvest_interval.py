@@ -0,0 +1,233 @@
+"""
+Report interval optimizer for a fleet of CompoundV3Lender clones.
+
+Every report sells the COMP accrued since the last one and resupplies
+the proceeds, so reporting more often compounds rewards sooner but
+pays the gas of `report` more often. For each clone this finds the
+interval maximizing the depositors' net annualized yield, bounded by
+the time it takes to accrue `minAmountToSell` and by the
+`profitMaxUnlockTime` so the share price never sits flat between the
+end of an unlock and the next report.
+
+    ape run harvest_interval --fleet fleet.csv --output schedule.json
+"""
+import csv
+import json
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple, Union
+
+import click
+import numpy as np
+
+# Comet tracking speeds are scaled by 1e15.
+TRACKING_INDEX_SCALE = 1e15
+COMP_DECIMALS = 18
+SECONDS_PER_YEAR = 365 * 24 * 60 * 60
+# No point reporting more than once an hour.
+MIN_INTERVAL = 60 * 60
+
+# 1 / golden ratio
+_INV_PHI = (np.sqrt(5) - 1) / 2
+
+
+@dataclass(frozen=True)
+class Fleet:
+    """
+    Inputs for every clone, one entry per strategy. Amounts of `asset`
+    are in whole tokens, `comp_price` and `gas_cost` are denominated in
+    `asset`, `supply_apr` is a fraction and `reward_speed` is the raw
+    `baseTrackingSupplySpeed` of the clone's comet.
+    """
+
+    deposit: np.ndarray
+    supply_apr: np.ndarray
+    reward_speed: np.ndarray
+    comet_total_supply: np.ndarray
+    comp_price: np.ndarray
+    gas_cost: np.ndarray
+    profit_max_unlock_time: np.ndarray
+    min_amount_to_sell: np.ndarray
+    # Combined fraction lost to uni fees on the COMP -> asset route.
+    swap_fee: np.ndarray
+
+    def __post_init__(self):
+        if len({len(getattr(self, f.name)) for f in fields(self)}) != 1:
+            raise ValueError("inputs differ in length")
+
+    def __len__(self) -> int:
+        return len(self.deposit)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Dict[str, float]]) -> "Fleet":
+        defaults = {"min_amount_to_sell": 1e12, "swap_fee": 0.0035}
+        columns = {}
+        for f in fields(cls):
+            if f.name not in defaults and any(f.name not in r for r in rows):
+                raise ValueError(f"missing {f.name}")
+            columns[f.name] = np.array(
+                [float(r.get(f.name, defaults.get(f.name))) for r in rows]
+            )
+        return cls(**columns)
+
+    @property
+    def supply_rate(self) -> np.ndarray:
+        """Per second continuously compounded supply rate."""
+        return np.log1p(self.supply_apr) / SECONDS_PER_YEAR
+
+    @property
+    def comp_per_second(self) -> np.ndarray:
+        """COMP the strategy accrues per second at its current share."""
+        return (
+            self.reward_speed
+            / TRACKING_INDEX_SCALE
+            * self.deposit
+            / self.comet_total_supply
+        )
+
+    @property
+    def reward_rate(self) -> np.ndarray:
+        """Net reward value per second as a fraction of the deposit."""
+        return (
+            self.comp_per_second * self.comp_price * (1 - self.swap_fee) / self.deposit
+        )
+
+    def bounds(self) -> Tuple[np.ndarray, np.ndarray]:
+        upper = np.maximum(self.profit_max_unlock_time, MIN_INTERVAL)
+        with np.errstate(divide="ignore"):
+            to_min_sell = (
+                self.min_amount_to_sell / 10**COMP_DECIMALS / self.comp_per_second
+            )
+        lower = np.clip(np.nan_to_num(to_min_sell, posinf=0), MIN_INTERVAL, upper)
+        return lower, upper
+
+
+def net_apy(fleet: Fleet, interval: np.ndarray) -> np.ndarray:
+    """
+    Annualized depositor yield when reporting every `interval` seconds.
+
+    Each cycle the comet balance compounds continuously and accrues
+    rewards in proportion to itself, the rewards are sold and resupplied
+    at the report and the gas of the report is paid, then the whole
+    thing compounds cycle over cycle.
+    """
+    interval = np.asarray(interval, dtype=np.float64)
+    rate = fleet.supply_rate
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # ∫ e^(r·s) ds over the cycle, falling back to T when r is 0.
+        accrual = np.where(rate > 0, np.expm1(rate * interval) / rate, interval)
+    growth = (
+        np.exp(rate * interval)
+        + fleet.reward_rate * accrual
+        - fleet.gas_cost / fleet.deposit
+    )
+    with np.errstate(invalid="ignore"):
+        apy = np.power(growth, SECONDS_PER_YEAR / interval) - 1
+    # Gas eating the whole deposit
+    return np.where(growth > 0, apy, -1.0)
+
+
+def closed_form_interval(fleet: Fleet) -> np.ndarray:
+    """
+    Second order optimum. Selling rewards every T seconds leaves on
+    average half a cycle of rewards out of comet, where they would earn
+    both the supply rate r and the reward rate ρ, costing ρ·(r + ρ)·T/2
+    while gas costs G/(D·T). Setting the derivative of the sum to zero
+    gives T* = sqrt(2G / (D·ρ·(r + ρ))).
+    """
+    lower, upper = fleet.bounds()
+    reward_rate = fleet.reward_rate
+    with np.errstate(divide="ignore"):
+        optimum = np.sqrt(
+            2
+            * fleet.gas_cost
+            / (fleet.deposit * reward_rate * (fleet.supply_rate + reward_rate))
+        )
+    return np.clip(np.nan_to_num(optimum, posinf=upper), lower, upper)
+
+
+def optimal_interval(fleet: Fleet, tol: float = 60.0) -> np.ndarray:
+    """
+    Maximize `net_apy` for every clone at once with a vectorized golden
+    section search over the bounded interval, to within `tol` seconds.
+    """
+    low, high = fleet.bounds()
+    c = high - _INV_PHI * (high - low)
+    d = low + _INV_PHI * (high - low)
+    fc = net_apy(fleet, c)
+    fd = net_apy(fleet, d)
+
+    while np.any(high - low > tol):
+        left = fc >= fd
+        # Maximum is in [low, d]
+        high = np.where(left, d, high)
+        # Maximum is in [c, high]
+        low = np.where(left, low, c)
+
+        new_c = high - _INV_PHI * (high - low)
+        new_d = low + _INV_PHI * (high - low)
+        c, d = np.where(left, new_c, d), np.where(left, c, new_d)
+        fc, fd = (
+            np.where(left, net_apy(fleet, c), fd),
+            np.where(left, fc, net_apy(fleet, d)),
+        )
+
+    # The objective is monotonic when rewards are tiny so check the bounds.
+    lower, upper = fleet.bounds()
+    candidates = np.stack([lower, (low + high) / 2, upper])
+    best = np.argmax(net_apy(fleet, candidates), axis=0)
+    return candidates[best, np.arange(len(fleet))]
+
+
+def keeper_schedule(
+    strategies: Sequence[str],
+    fleet: Fleet,
+    last_report: Sequence[int],
+) -> List[Dict[str, Union[str, int, float]]]:
+    """Next report time for each strategy, soonest first."""
+    interval = optimal_interval(fleet)
+    apy = net_apy(fleet, interval)
+    schedule = [
+        {
+            "strategy": strategy,
+            "interval": int(interval[i]),
+            "next_report": int(last_report[i] + interval[i]),
+            "net_apy": float(apy[i]),
+        }
+        for i, strategy in enumerate(strategies)
+    ]
+    return sorted(schedule, key=lambda s: s["next_report"])
+
+
+@click.command(short_help="Compute report intervals for a fleet of clones")
+@click.option(
+    "--fleet",
+    "fleet_path",
+    required=True,
+    type=click.Path(exists=True),
+    help="CSV with a `strategy` and `last_report` column plus the Fleet fields",
+)
+@click.option("--output", type=click.Path(), default=None)
+def cli(fleet_path, output):
+    with open(fleet_path) as f:
+        rows = list(csv.DictReader(f))
+
+    schedule = keeper_schedule(
+        [r["strategy"] for r in rows],
+        Fleet.from_rows(rows),
+        [int(r["last_report"]) for r in rows],
+    )
+
+    if output is None:
+        click.echo(json.dumps(schedule, indent=2))
+    elif Path(output).suffix == ".csv":
+        with open(output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(schedule[0]))
+            writer.writeheader()
+            writer.writerows(schedule)
+    else:
+        Path(output).write_text(json.dumps(schedule, indent=2))
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,91 @@
+"""
+Decoder for the packed states returned by `CompoundV3LenderLens`.
+"""
+from typing import Iterable, List, NamedTuple, Optional
+
+# (name, size in bytes) in the order the lens packs them.
+STATE_LAYOUT = (
+    ("strategy", 20),
+    ("comet", 20),
+    ("comet_balance", 16),
+    ("idle", 16),
+    ("pending_rewards", 12),
+    ("last_report", 5),
+    ("is_shutdown", 1),
+    ("apr", 8),
+)
+STATE_SIZE = sum(size for _, size in STATE_LAYOUT)
+_ADDRESSES = ("strategy", "comet")
+
+
+class StrategyState(NamedTuple):
+    strategy: str
+    comet: str
+    comet_balance: int
+    idle: int
+    pending_rewards: int
+    last_report: int
+    is_shutdown: bool
+    apr: int
+
+    @property
+    def total_assets(self) -> int:
+        return self.comet_balance + self.idle
+
+
+def _to_checksum(raw: bytes) -> str:
+    # eth-utils comes with ape but decoding works without it.
+    try:
+        from eth_utils import to_checksum_address
+    except ImportError:
+        return "0x" + raw.hex()
+
+    return to_checksum_address(raw)
+
+
+def decode_states(data: bytes) -> List[StrategyState]:
+    """Split the lens output into one `StrategyState` per strategy."""
+    data = bytes(data)
+    if len(data) % STATE_SIZE:
+        raise ValueError(f"length {len(data)} not a multiple of {STATE_SIZE}")
+
+    states = []
+    view = memoryview(data)
+    for start in range(0, len(data), STATE_SIZE):
+        values = {}
+        offset = start
+        for name, size in STATE_LAYOUT:
+            raw = view[offset : offset + size]
+            if name in _ADDRESSES:
+                values[name] = _to_checksum(bytes(raw))
+            else:
+                values[name] = int.from_bytes(raw, "big")
+            offset += size
+
+        values["is_shutdown"] = bool(values["is_shutdown"])
+        states.append(StrategyState(**values))
+
+    return states
+
+
+def fetch_states(
+    lens, strategies: Optional[Iterable[str]] = None, page_size: int = 100
+) -> List[StrategyState]:
+    """
+    Read every state through `lens`, either for the given strategies or
+    for all the ones stored in the lens, `page_size` strategies per call.
+    """
+    states = []
+
+    if strategies is None:
+        total = lens.numStrategies()
+        for offset in range(0, total, page_size):
+            states += decode_states(lens.getStates(offset, page_size))
+        return states
+
+    strategies = list(strategies)
+    for offset in range(0, len(strategies), page_size):
+        page = strategies[offset : offset + page_size]
+        states += decode_states(lens.getStates(page))
+
+    return states
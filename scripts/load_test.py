@@ -0,0 +1,206 @@
+"""
+Load test a strategy with many accounts depositing, withdrawing and
+redeeming between reports.
+
+Each round a random subset of users each send one operation, spread
+over a thread pool, then the keeper reports. Gas and latency are
+recorded per operation along with the rounding drift between
+`totalAssets` and what every share holder could redeem. The run is
+seeded so the same options against the same fork block replay the same
+operations.
+
+    ape run load_test --network ethereum:mainnet-fork:hardhat \
+        --users 1000 --rounds 20 --output load.json
+"""
+import json
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import click
+import numpy as np
+from ape import Contract, accounts, chain
+from ape.cli import NetworkBoundCommand, network_option
+
+from scripts.benchmark_batch import make_users
+from scripts.benchmark_gas import DAY, MARKETS, deploy_strategy
+
+OPERATIONS = ("deposit", "withdraw", "redeem")
+PERCENTILES = (50, 95, 99)
+
+
+def plan_round(rng: random.Random, users: List, active: float) -> List[tuple]:
+    """(user, operation, fraction) for the users acting this round."""
+    plan = []
+    for user in users:
+        if rng.random() < active:
+            plan.append((user, rng.choice(OPERATIONS), rng.uniform(0.05, 1.0)))
+    return plan
+
+
+def execute(strategy, asset, user, operation, fraction) -> Optional[Dict]:
+    """Send one operation, depositing instead if there is nothing to exit."""
+    if operation != "deposit" and strategy.balanceOf(user) == 0:
+        operation = "deposit"
+
+    if operation == "deposit":
+        amount = int(asset.balanceOf(user) * fraction)
+    elif operation == "withdraw":
+        amount = int(strategy.maxWithdraw(user) * fraction)
+    else:
+        # Full exits some of the time to exercise redeeming everything.
+        shares = strategy.balanceOf(user)
+        amount = shares if fraction > 0.9 else int(shares * fraction)
+
+    if amount == 0:
+        return None
+
+    start = time.perf_counter()
+    if operation == "deposit":
+        tx = strategy.deposit(amount, user, sender=user)
+    elif operation == "withdraw":
+        tx = strategy.withdraw(amount, user, user, sender=user)
+    else:
+        tx = strategy.redeem(amount, user, user, sender=user)
+
+    return {
+        "operation": operation,
+        "gas": tx.gas_used,
+        "latency": time.perf_counter() - start,
+    }
+
+
+def rounding_drift(strategy, holders) -> int:
+    """`totalAssets` less the assets every share holder could redeem."""
+    redeemable = sum(strategy.convertToAssets(strategy.balanceOf(h)) for h in holders)
+    return strategy.totalAssets() - redeemable
+
+
+def summarize(records: List[Dict], elapsed: float) -> Dict:
+    by_operation = defaultdict(list)
+    for record in records:
+        by_operation[record["operation"]].append(record)
+
+    summary = {
+        "operations": len(records),
+        "seconds": elapsed,
+        "throughput": len(records) / elapsed if elapsed else 0.0,
+        "gas": {},
+        "latency_ms": {},
+    }
+    for operation, rows in sorted(by_operation.items()):
+        gas = np.array([r["gas"] for r in rows])
+        latency = 1000 * np.array([r["latency"] for r in rows])
+        summary["gas"][operation] = {
+            "count": len(rows),
+            "mean": float(gas.mean()),
+            **{f"p{p}": float(np.percentile(gas, p)) for p in PERCENTILES},
+        }
+        summary["latency_ms"][operation] = {
+            f"p{p}": float(np.percentile(latency, p)) for p in PERCENTILES
+        }
+    return summary
+
+
+def run_load_test(
+    market: str,
+    user_count: int,
+    rounds: int,
+    active: float,
+    workers: int,
+    seed: int,
+) -> Dict:
+    asset, comet, amount, comp_fee, asset_fee = MARKETS[market]
+    management = accounts.test_accounts[0]
+    asset = Contract(asset)
+    rng = random.Random(seed)
+    fork_block = chain.blocks.head.number
+
+    strategy, _ = deploy_strategy(management, asset, comet, comp_fee, asset_fee)
+    users = make_users(user_count, asset, amount // user_count)
+    for user in users:
+        asset.approve(strategy, 2**256 - 1, sender=user)
+    holders = users + [strategy]
+
+    records, drift = [], []
+    elapsed = 0.0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for _ in range(rounds):
+            plan = plan_round(rng, users, active)
+            start = time.perf_counter()
+            # Every user appears at most once a round so each account's
+            # transactions stay in nonce order.
+            results = pool.map(
+                lambda p: execute(strategy, asset, *p),
+                plan,
+            )
+            records.extend(r for r in results if r is not None)
+            elapsed += time.perf_counter() - start
+
+            chain.mine(timestamp=chain.pending_timestamp + DAY)
+            strategy.report(sender=management)
+            drift.append(rounding_drift(strategy, holders))
+
+    # Everyone leaves, whatever is left is dust from rounding.
+    for user in users:
+        shares = strategy.balanceOf(user)
+        if shares:
+            strategy.redeem(shares, user, user, sender=user)
+
+    return {
+        "config": {
+            "market": market,
+            "users": user_count,
+            "rounds": rounds,
+            "active": active,
+            "workers": workers,
+            "seed": seed,
+            "fork_block": fork_block,
+        },
+        **summarize(records, elapsed),
+        "drift": {
+            "per_round": drift,
+            "max": max(drift, key=abs) if drift else 0,
+            "dust_after_exit": strategy.totalAssets(),
+        },
+    }
+
+
+@click.command(cls=NetworkBoundCommand)
+@network_option()
+@click.option("--market", default="usdc", type=click.Choice(list(MARKETS)))
+@click.option("--users", "user_count", default=1000, show_default=True)
+@click.option("--rounds", default=20, show_default=True)
+@click.option(
+    "--active",
+    default=0.5,
+    show_default=True,
+    help="Fraction of users sending an operation each round",
+)
+@click.option("--workers", default=16, show_default=True)
+@click.option("--seed", default=0, show_default=True)
+@click.option("--output", type=click.Path(), default=None)
+def cli(network, market, user_count, rounds, active, workers, seed, output):
+    with chain.isolate():
+        report = run_load_test(market, user_count, rounds, active, workers, seed)
+
+    if output is not None:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    click.echo(
+        f"{report['operations']} operations in {report['seconds']:.1f}s "
+        f"({report['throughput']:.1f}/s)"
+    )
+    header = "".join(f"{'p' + str(p):>10}" for p in PERCENTILES)
+    click.echo(f"{'operation':<12}{'count':>8}{header}")
+    for operation, gas in report["gas"].items():
+        line = f"{operation:<12}{gas['count']:>8}"
+        line += "".join(f"{gas[f'p{p}']:>10.0f}" for p in PERCENTILES)
+        click.echo(line)
+    click.echo(
+        f"max rounding drift {report['drift']['max']}, "
+        f"dust after exit {report['drift']['dust_after_exit']}"
+    )
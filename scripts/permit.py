@@ -0,0 +1,38 @@
+"""EIP-2612 permit signing for test accounts."""
+from eth_abi import encode
+from eth_keys import keys
+from eth_utils import keccak, to_bytes
+
+PERMIT_TYPEHASH = keccak(
+    text="Permit(address owner,address spender,uint256 value,uint256 nonce,uint256 deadline)"
+)
+
+
+def sign_permit(token, owner, spender, value, deadline):
+    """
+    Sign an EIP-2612 permit with a test account, returning (v, r, s).
+    The domain separator is read from `token` so it holds on forks with a
+    different chain id.
+    """
+    struct_hash = keccak(
+        encode(
+            ["bytes32", "address", "address", "uint256", "uint256", "uint256"],
+            [
+                PERMIT_TYPEHASH,
+                owner.address,
+                spender.address,
+                value,
+                token.nonces(owner),
+                deadline,
+            ],
+        )
+    )
+    digest = keccak(b"\x19\x01" + bytes(token.DOMAIN_SEPARATOR()) + struct_hash)
+    signature = keys.PrivateKey(to_bytes(hexstr=owner.private_key)).sign_msg_hash(
+        digest
+    )
+    return (
+        signature.v + 27,
+        signature.r.to_bytes(32, "big"),
+        signature.s.to_bytes(32, "big"),
+    )
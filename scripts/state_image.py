@@ -0,0 +1,307 @@
+"""
+On-disk image of the test session's chain state.
+
+Hardhat can't dump and load its state, so the image is rebuilt from the
+transactions that set the session up: each one is traced to find every
+storage slot it wrote, and the final code, storage, balance and nonce
+of every account touched are saved. Loading writes them back with the
+`hardhat_set*` methods, a few hundred requests instead of redeploying
+and funding everything.
+
+An image is only valid for the fork block it was built on and the
+contract code it was built with, `stale_reason` says why one isn't.
+
+    ape run state_image --network ethereum:mainnet-fork:hardhat \
+        --output .cache/chain_state.json
+"""
+import itertools
+import json
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, Optional, Set
+
+import click
+from ape import Contract, accounts, chain, project
+from ape.cli import NetworkBoundCommand, network_option
+from eth_utils import keccak, to_checksum_address
+
+VERSION = 1
+DEFAULT_PATH = Path(".cache/chain_state.json")
+
+# Contracts the session deploys, an image built with different code is stale.
+PROJECT_CONTRACTS = (
+    "CompoundV3Lender",
+    "CompoundV3LenderLens",
+    "BatchDepositor",
+    "DepositRouter",
+    "KeeperBatcher",
+)
+
+# Mirrors the session fixtures in tests/conftest.py.
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+USDC_COMET = "0xc3d688B66703497DAA19211EEdff47f25384cdc3"
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+WHALE = "0xBA12222222228d8Ba445958a75a0704d566BF2C8"
+BATCH_WINDOW = 60 * 60
+
+# Slots per account read back after loading to check they were written.
+STORAGE_SAMPLE = 8
+
+CALLS = {"CALL", "STATICCALL"}
+# Run in the caller's storage.
+DELEGATE_CALLS = {"DELEGATECALL", "CALLCODE"}
+CREATES = {"CREATE", "CREATE2"}
+
+
+def _rpc(method, *params):
+    return chain.provider._make_request(method, list(params))
+
+
+def _word(value) -> int:
+    # Hardhat leaves the 0x off stack entries, geth doesn't.
+    return int(value, 16)
+
+
+def _hex32(value: int) -> str:
+    return "0x" + value.to_bytes(32, "big").hex()
+
+
+def _address(word: int) -> str:
+    return to_checksum_address(word.to_bytes(32, "big")[12:])
+
+
+def code_hashes() -> Dict[str, str]:
+    """Hash of each session contract's compiled deployment bytecode."""
+    hashes = {}
+    for name in PROJECT_CONTRACTS:
+        bytecode = getattr(project, name).contract_type.deployment_bytecode.bytecode
+        hashes[name] = "0x" + keccak(hexstr=bytecode).hex()
+    return hashes
+
+
+def storage_written(tx_hash: str) -> Dict[str, Set[int]]:
+    """Every storage slot written by a transaction, by account."""
+    receipt = chain.provider.get_receipt(tx_hash)
+    root = receipt.contract_address or receipt.receiver
+    trace = _rpc(
+        "debug_traceTransaction",
+        tx_hash,
+        {"disableMemory": True, "disableStorage": True},
+    )
+
+    written = defaultdict(set)
+    # Storage context of each call frame, None for creates until the
+    # parent sees the new address on its stack. Delegate calls inherit
+    # their caller's, None included.
+    frames = [root]
+    # If each frame is a create, rather than running in one's storage.
+    creates = [False]
+    pending = defaultdict(set)
+    entering = None
+    entering_create = False
+
+    for step in trace["structLogs"]:
+        depth = step["depth"]
+        stack = step.get("stack") or []
+
+        if depth > len(frames):
+            frames.append(entering)
+            creates.append(entering_create)
+        while depth < len(frames):
+            frames.pop()
+            created = creates.pop()
+            slots = pending.pop(len(frames), set())
+            if not slots:
+                continue
+            if not created:
+                # A delegate call in a create, its slots are the create's.
+                pending[len(frames) - 1] |= slots
+                continue
+            # The parent's next step has the created address on top, or 0
+            # if the create failed.
+            address = _word(stack[-1])
+            if address:
+                written[_address(address)] |= slots
+
+        op = step["op"]
+        if op == "SSTORE":
+            slot = _word(stack[-1])
+            if frames[-1] is None:
+                pending[len(frames) - 1].add(slot)
+            else:
+                written[frames[-1]].add(slot)
+        elif op in CALLS:
+            entering = _address(_word(stack[-2]))
+            entering_create = False
+        elif op in DELEGATE_CALLS:
+            entering = frames[-1]
+            entering_create = False
+        elif op in CREATES:
+            entering = None
+            entering_create = True
+
+    return written
+
+
+def capture(tx_hashes, accounts_touched=()) -> Dict:
+    """Final state of every account written to by `tx_hashes`."""
+    storage = defaultdict(set)
+    addresses = set(accounts_touched)
+    for tx_hash in tx_hashes:
+        receipt = chain.provider.get_receipt(tx_hash)
+        addresses |= {receipt.sender, receipt.contract_address or receipt.receiver}
+        for address, slots in storage_written(tx_hash).items():
+            storage[address] |= slots
+    addresses |= set(storage)
+    addresses.discard(None)
+
+    state = {}
+    for address in sorted(addresses):
+        code = _rpc("eth_getCode", address, "latest")
+        state[address] = {
+            "code": code,
+            "balance": _rpc("eth_getBalance", address, "latest"),
+            "nonce": _rpc("eth_getTransactionCount", address, "latest"),
+            "storage": {
+                hex(slot): _rpc("eth_getStorageAt", address, hex(slot), "latest")
+                for slot in sorted(storage.get(address, ()))
+            },
+        }
+    return state
+
+
+def build(deploy: Callable[[], Dict[str, str]]) -> Dict:
+    """Run `deploy` and image everything it changed."""
+    start = time.perf_counter()
+    fork_block = chain.blocks.head
+    session = deploy()
+
+    tx_hashes = [
+        tx.txn_hash.hex() if isinstance(tx.txn_hash, bytes) else tx.txn_hash
+        for block in chain.blocks.range(fork_block.number + 1, chain.blocks.height + 1)
+        for tx in block.transactions
+    ]
+    head = chain.blocks.head
+
+    return {
+        "version": VERSION,
+        "chain_id": chain.chain_id,
+        "fork_block": fork_block.number,
+        "fork_block_hash": fork_block.hash.hex(),
+        "timestamp": head.timestamp,
+        "code_hashes": code_hashes(),
+        "session": session,
+        "accounts": capture(tx_hashes),
+        "build_seconds": time.perf_counter() - start,
+    }
+
+
+def stale_reason(image: Dict) -> Optional[str]:
+    """Why `image` can't be loaded on the current chain, None if it can."""
+    if image.get("version") != VERSION:
+        return "image format changed"
+    if image["chain_id"] != chain.chain_id:
+        return "different chain"
+    head = chain.blocks.head
+    if (
+        head.number != image["fork_block"]
+        or head.hash.hex() != image["fork_block_hash"]
+    ):
+        return f"forked at {head.number}, image is of {image['fork_block']}"
+    if image["code_hashes"] != code_hashes():
+        return "contracts changed since the image was built"
+    return None
+
+
+def load(image: Dict):
+    """Write the image's accounts into the node."""
+    for address, account in image["accounts"].items():
+        if account["code"] not in ("0x", "0x0"):
+            _rpc("hardhat_setCode", address, account["code"])
+        _rpc("hardhat_setBalance", address, hex(int(account["balance"], 16)))
+        _rpc("hardhat_setNonce", address, hex(int(account["nonce"], 16)))
+        for slot, value in account["storage"].items():
+            _rpc("hardhat_setStorageAt", address, slot, _hex32(int(value, 16)))
+
+    # Timestamps saved during the build can't be in the future.
+    if chain.pending_timestamp <= image["timestamp"]:
+        chain.mine(timestamp=image["timestamp"] + 1)
+
+    for address, account in image["accounts"].items():
+        if _rpc("eth_getCode", address, "latest") != account["code"]:
+            raise ValueError(f"code of {address} doesn't match the image")
+        # Only code writes storage, slots on an account without any were
+        # traced to the wrong address.
+        if account["storage"] and account["code"] in ("0x", "0x0"):
+            raise ValueError(f"storage of {address} has no code to write it")
+        for slot, value in itertools.islice(account["storage"].items(), STORAGE_SAMPLE):
+            stored = _rpc("eth_getStorageAt", address, slot, "latest")
+            if int(stored, 16) != int(value, 16):
+                raise ValueError(f"storage of {address} doesn't match the image")
+
+
+def read(path) -> Optional[Dict]:
+    path = Path(path)
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def write(image: Dict, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(image, f)
+
+
+def deploy_session(test_accounts=None) -> Dict[str, str]:
+    """
+    Deploy and fund what the session fixtures in tests/conftest.py would,
+    with the same accounts, returning the addresses by fixture name.
+    """
+    test_accounts = test_accounts or accounts.test_accounts
+    user, rewards, management, keeper = test_accounts[:4]
+    whale = test_accounts[WHALE]
+
+    strategy = management.deploy(
+        project.CompoundV3Lender, USDC, "YCompound V3", USDC_COMET
+    )
+    strategy = project.IStrategyInterface.at(strategy.address)
+    strategy.setPerformanceFeeRecipient(rewards, sender=management)
+    strategy.setKeeper(keeper, sender=management)
+    strategy.setPerformanceFee(0, sender=management)
+
+    lens = management.deploy(project.CompoundV3LenderLens)
+    batch_depositor = management.deploy(project.BatchDepositor, strategy, BATCH_WINDOW)
+    deposit_router = management.deploy(project.DepositRouter)
+    keeper_batcher = management.deploy(project.KeeperBatcher)
+
+    asset = Contract(USDC)
+    asset.transfer(user, 100 * 10 ** asset.decimals(), sender=whale)
+    user.transfer(WETH, 10 ** Contract(WETH).decimals())
+
+    return {
+        "strategy": strategy.address,
+        "lens": lens.address,
+        "batch_depositor": batch_depositor.address,
+        "deposit_router": deposit_router.address,
+        "keeper_batcher": keeper_batcher.address,
+    }
+
+
+@click.command(cls=NetworkBoundCommand)
+@network_option()
+@click.option("--output", type=click.Path(), default=str(DEFAULT_PATH))
+def cli(network, output):
+    with chain.isolate():
+        image = build(deploy_session)
+    write(image, output)
+
+    slots = sum(len(a["storage"]) for a in image["accounts"].values())
+    click.echo(
+        f"Imaged {len(image['accounts'])} accounts and {slots} storage slots "
+        f"at block {image['fork_block']} in {image['build_seconds']:.1f}s "
+        f"to {output}"
+    )
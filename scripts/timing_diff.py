@@ -0,0 +1,54 @@
+"""
+Compare two timing reports written by `ape test --timing-report`.
+
+    python -m scripts.timing_diff before.json after.json --sort rpc
+"""
+import json
+
+import click
+
+from tests.utils.timing import SORT_KEYS, summarize
+
+
+def load_rows(path):
+    with open(path) as f:
+        return {r["test"]: r for r in summarize(json.load(f)["tests"])}
+
+
+@click.command(short_help="Diff two test timing reports")
+@click.argument("before", type=click.Path(exists=True))
+@click.argument("after", type=click.Path(exists=True))
+@click.option("--sort", "key", default="duration", type=click.Choice(SORT_KEYS))
+@click.option("--top", default=25, show_default=True)
+def cli(before, after, key, top):
+    old = load_rows(before)
+    new = load_rows(after)
+
+    diffs = []
+    for test in old.keys() & new.keys():
+        diff = {c: new[test][c] - old[test][c] for c in SORT_KEYS}
+        diff["test"] = test
+        diffs.append(diff)
+    diffs.sort(key=lambda d: abs(d[key]), reverse=True)
+
+    click.echo(f"{'test':<60}" + "".join(f"{c[:11]:>12}" for c in SORT_KEYS))
+    for d in diffs[:top]:
+        click.echo(
+            f"{d['test'][-60:]:<60}" + "".join(f"{d[c]:>+12.3f}" for c in SORT_KEYS)
+        )
+
+    for c in SORT_KEYS:
+        total_old = sum(r[c] for r in old.values())
+        total_new = sum(r[c] for r in new.values())
+        click.echo(f"total {c:<12}{total_old:>10.2f} -> {total_new:>10.2f}")
+
+    for name, missing in (
+        ("removed", old.keys() - new.keys()),
+        ("added", new.keys() - old.keys()),
+    ):
+        for test in sorted(missing):
+            click.echo(f"{name}: {test}")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,356 @@
+"""
+Offline Uniswap V3 quoter for sizing COMP sales.
+
+Ports the pool's exact input swap math (TickMath, SqrtPriceMath,
+SwapMath and the tick bitmap walk) to Python integers, so quotes match
+the on-chain quoter to the wei for the state they were taken from. Pool
+state is snapshot once with `snapshot_pool` and every amount and route
+after that is quoted without touching the RPC.
+
+    ape run uniswap_quoter --network ethereum:mainnet-fork:hardhat \
+        --asset 0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48 --fees 3000 500 \
+        --amount 10 --amount 100 --amount 1000
+"""
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import click
+from ape import Contract
+from ape.cli import NetworkBoundCommand, network_option
+from ape_ethereum import multicall
+
+MIN_TICK = -887272
+MAX_TICK = 887272
+MIN_SQRT_RATIO = 4295128739
+MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342
+
+Q96 = 1 << 96
+MAX_UINT256 = (1 << 256) - 1
+# Uniswap V3 fees are in hundredths of a bip.
+FEE_SCALE = 1_000_000
+
+# sqrt(1.0001^-2^i) as Q128.128 for each bit i of the absolute tick.
+_TICK_RATIOS = (
+    0xFFFCB933BD6FAD37AA2D162D1A594001,
+    0xFFF97272373D413259A46990580E213A,
+    0xFFF2E50F5F656932EF12357CF3C7FDCC,
+    0xFFE5CACA7E10E4E61C3624EAA0941CD0,
+    0xFFCB9843D60F6159C9DB58835C926644,
+    0xFF973B41FA98C081472E6896DFB254C0,
+    0xFF2EA16466C96A3843EC78B326B52861,
+    0xFE5DEE046A99A2A811C461F1969C3053,
+    0xFCBE86C7900A88AEDCFFC83B479AA3A4,
+    0xF987A7253AC413176F2B074CF7815E54,
+    0xF3392B0822B70005940C7A398E4B70F3,
+    0xE7159475A2C29B7443B29C7FA6E889D9,
+    0xD097F3BDFD2022B8845AD8F792AA5825,
+    0xA9F746462D870FDF8A65DC1F90E061E5,
+    0x70D869A156D2A1B890BB3DF62BAF32F7,
+    0x31BE135F97D08FD981231505542FCFA6,
+    0x9AA508B5B7A84E1C677DE54F3E99BC9,
+    0x5D6AF8DEDB81196699C329225EE604,
+    0x2216E584F5FA1EA926041BEDFE98,
+    0x48A170391F7DC42444E8FA2,
+)
+
+FACTORY = "0x1F98431c8aD98523631AE4a59f267346ea31F984"
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+COMP = "0xc00e94Cb662C3520282E6f5717214004A7f26888"
+
+
+def _div_rounding_up(a: int, b: int) -> int:
+    return -(-a // b)
+
+
+def _mul_div_rounding_up(a: int, b: int, d: int) -> int:
+    return -(-a * b // d)
+
+
+def get_sqrt_ratio_at_tick(tick: int) -> int:
+    """TickMath.getSqrtRatioAtTick, sqrt(1.0001^tick) as a Q64.96."""
+    abs_tick = abs(tick)
+    if abs_tick > MAX_TICK:
+        raise ValueError(f"tick {tick} out of range")
+
+    ratio = _TICK_RATIOS[0] if abs_tick & 1 else 1 << 128
+    for bit, multiplier in enumerate(_TICK_RATIOS[1:], start=1):
+        if abs_tick & (1 << bit):
+            ratio = (ratio * multiplier) >> 128
+
+    if tick > 0:
+        ratio = MAX_UINT256 // ratio
+    return (ratio >> 32) + (1 if ratio % (1 << 32) else 0)
+
+
+def get_tick_at_sqrt_ratio(sqrt_price_x96: int) -> int:
+    """TickMath.getTickAtSqrtRatio, the greatest tick at or below the price."""
+    if not MIN_SQRT_RATIO <= sqrt_price_x96 < MAX_SQRT_RATIO:
+        raise ValueError("sqrt price out of range")
+
+    # The float estimate is within a tick, correct it with the exact ratios.
+    tick = math.floor(2 * math.log(sqrt_price_x96 / Q96) / math.log(1.0001))
+    tick = max(MIN_TICK, min(tick, MAX_TICK - 1))
+    while tick > MIN_TICK and get_sqrt_ratio_at_tick(tick) > sqrt_price_x96:
+        tick -= 1
+    while tick < MAX_TICK and get_sqrt_ratio_at_tick(tick + 1) <= sqrt_price_x96:
+        tick += 1
+    return tick
+
+
+def get_amount0_delta(sqrt_a: int, sqrt_b: int, liquidity: int, round_up: bool) -> int:
+    if sqrt_a > sqrt_b:
+        sqrt_a, sqrt_b = sqrt_b, sqrt_a
+    numerator1 = liquidity << 96
+    numerator2 = sqrt_b - sqrt_a
+    if round_up:
+        return _div_rounding_up(
+            _mul_div_rounding_up(numerator1, numerator2, sqrt_b), sqrt_a
+        )
+    return numerator1 * numerator2 // sqrt_b // sqrt_a
+
+
+def get_amount1_delta(sqrt_a: int, sqrt_b: int, liquidity: int, round_up: bool) -> int:
+    if sqrt_a > sqrt_b:
+        sqrt_a, sqrt_b = sqrt_b, sqrt_a
+    if round_up:
+        return _mul_div_rounding_up(liquidity, sqrt_b - sqrt_a, Q96)
+    return liquidity * (sqrt_b - sqrt_a) // Q96
+
+
+def get_next_sqrt_price_from_input(
+    sqrt_price_x96: int, liquidity: int, amount_in: int, zero_for_one: bool
+) -> int:
+    """SqrtPriceMath.getNextSqrtPriceFromInput."""
+    if amount_in == 0:
+        return sqrt_price_x96
+
+    if not zero_for_one:
+        return sqrt_price_x96 + (amount_in << 96) // liquidity
+
+    numerator1 = liquidity << 96
+    # Mirror the pool's overflow checks on the 256 bit product.
+    product = (amount_in * sqrt_price_x96) & MAX_UINT256
+    if product // amount_in == sqrt_price_x96:
+        denominator = (numerator1 + product) & MAX_UINT256
+        if denominator >= numerator1:
+            return _mul_div_rounding_up(numerator1, sqrt_price_x96, denominator)
+    return _div_rounding_up(numerator1, numerator1 // sqrt_price_x96 + amount_in)
+
+
+def compute_swap_step(
+    sqrt_current: int,
+    sqrt_target: int,
+    liquidity: int,
+    amount_remaining: int,
+    fee: int,
+) -> Tuple[int, int, int, int]:
+    """
+    SwapMath.computeSwapStep for an exact input.
+
+    Returns the next sqrt price, the amount in, the amount out and the fee.
+    """
+    zero_for_one = sqrt_current >= sqrt_target
+    remaining_less_fee = amount_remaining * (FEE_SCALE - fee) // FEE_SCALE
+
+    if zero_for_one:
+        amount_in = get_amount0_delta(sqrt_target, sqrt_current, liquidity, True)
+    else:
+        amount_in = get_amount1_delta(sqrt_current, sqrt_target, liquidity, True)
+
+    if remaining_less_fee >= amount_in:
+        sqrt_next = sqrt_target
+    else:
+        sqrt_next = get_next_sqrt_price_from_input(
+            sqrt_current, liquidity, remaining_less_fee, zero_for_one
+        )
+
+    reached_target = sqrt_next == sqrt_target
+    if zero_for_one:
+        if not reached_target:
+            amount_in = get_amount0_delta(sqrt_next, sqrt_current, liquidity, True)
+        amount_out = get_amount1_delta(sqrt_next, sqrt_current, liquidity, False)
+    else:
+        if not reached_target:
+            amount_in = get_amount1_delta(sqrt_current, sqrt_next, liquidity, True)
+        amount_out = get_amount0_delta(sqrt_current, sqrt_next, liquidity, False)
+
+    if reached_target:
+        fee_amount = _mul_div_rounding_up(amount_in, fee, FEE_SCALE - fee)
+    else:
+        # Whatever didn't go into the swap is taken as fee.
+        fee_amount = amount_remaining - amount_in
+
+    return sqrt_next, amount_in, amount_out, fee_amount
+
+
+@dataclass(frozen=True)
+class PoolState:
+    """
+    Snapshot of a pool's price, liquidity and the initialized ticks in
+    bitmap words `min_word` to `max_word`. `ticks` maps each initialized
+    tick to its `liquidityNet`.
+    """
+
+    token0: str
+    token1: str
+    fee: int
+    tick_spacing: int
+    sqrt_price_x96: int
+    tick: int
+    liquidity: int
+    bitmap: Dict[int, int]
+    ticks: Dict[int, int]
+    min_word: int
+    max_word: int
+
+    def _word(self, word_pos: int) -> int:
+        if not self.min_word <= word_pos <= self.max_word:
+            raise ValueError("swap moves past the snapshot, take a wider one")
+        return self.bitmap.get(word_pos, 0)
+
+    def next_initialized_tick(self, tick: int, lte: bool) -> Tuple[int, bool]:
+        """TickBitmap.nextInitializedTickWithinOneWord."""
+        compressed = tick // self.tick_spacing
+
+        if lte:
+            word_pos, bit_pos = compressed >> 8, compressed % 256
+            masked = self._word(word_pos) & ((1 << (bit_pos + 1)) - 1)
+            if masked:
+                msb = masked.bit_length() - 1
+                return (compressed - (bit_pos - msb)) * self.tick_spacing, True
+            return (compressed - bit_pos) * self.tick_spacing, False
+
+        compressed += 1
+        word_pos, bit_pos = compressed >> 8, compressed % 256
+        masked = self._word(word_pos) & ~((1 << bit_pos) - 1) & MAX_UINT256
+        if masked:
+            lsb = (masked & -masked).bit_length() - 1
+            return (compressed + (lsb - bit_pos)) * self.tick_spacing, True
+        return (compressed + (255 - bit_pos)) * self.tick_spacing, False
+
+    def quote(self, amount_in: int, zero_for_one: bool) -> int:
+        """Amount out of swapping `amount_in` through the pool."""
+        sqrt_limit = MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+        sqrt_price, tick, liquidity = self.sqrt_price_x96, self.tick, self.liquidity
+        remaining, amount_out = amount_in, 0
+
+        while remaining != 0 and sqrt_price != sqrt_limit:
+            sqrt_start = sqrt_price
+            tick_next, initialized = self.next_initialized_tick(tick, zero_for_one)
+            tick_next = max(MIN_TICK, min(tick_next, MAX_TICK))
+            sqrt_next = get_sqrt_ratio_at_tick(tick_next)
+
+            if (zero_for_one and sqrt_next < sqrt_limit) or (
+                not zero_for_one and sqrt_next > sqrt_limit
+            ):
+                sqrt_target = sqrt_limit
+            else:
+                sqrt_target = sqrt_next
+
+            sqrt_price, step_in, step_out, fee_amount = compute_swap_step(
+                sqrt_price, sqrt_target, liquidity, remaining, self.fee
+            )
+            remaining -= step_in + fee_amount
+            amount_out += step_out
+
+            if sqrt_price == sqrt_next:
+                if initialized:
+                    net = self.ticks[tick_next]
+                    liquidity += -net if zero_for_one else net
+                tick = tick_next - 1 if zero_for_one else tick_next
+            elif sqrt_price != sqrt_start:
+                tick = get_tick_at_sqrt_ratio(sqrt_price)
+
+        if remaining:
+            raise ValueError("not enough liquidity for the swap")
+        return amount_out
+
+
+def quote_path(pools: Sequence[PoolState], token_in: str, amount_in: int) -> int:
+    """Amount out of swapping `amount_in` of `token_in` along `pools`."""
+    amount = amount_in
+    for pool in pools:
+        zero_for_one = token_in.lower() == pool.token0.lower()
+        if not zero_for_one and token_in.lower() != pool.token1.lower():
+            raise ValueError(f"{token_in} is not in the pool")
+        amount = pool.quote(amount, zero_for_one)
+        token_in = pool.token1 if zero_for_one else pool.token0
+    return amount
+
+
+def quote_amounts(
+    pools: Sequence[PoolState], token_in: str, amounts: Iterable[int]
+) -> List[int]:
+    return [quote_path(pools, token_in, amount) for amount in amounts]
+
+
+def snapshot_pool(address: str, words: int = 2) -> PoolState:
+    """
+    Read a pool's state with the bitmap words within `words` of the
+    current tick's, enough for swaps that move the price up to about
+    `256 * words * tick_spacing` ticks.
+    """
+    pool = Contract(address)
+    slot0 = pool.slot0()
+    tick_spacing = pool.tickSpacing()
+    center = (slot0.tick // tick_spacing) >> 8
+    word_positions = range(center - words, center + words + 1)
+
+    call = multicall.Call()
+    for word_pos in word_positions:
+        call.add(pool.tickBitmap, word_pos)
+    bitmap = {w: b for w, b in zip(word_positions, call()) if b}
+
+    initialized = [
+        (word_pos * 256 + bit) * tick_spacing
+        for word_pos, word in bitmap.items()
+        for bit in range(256)
+        if word >> bit & 1
+    ]
+    ticks = {}
+    if initialized:
+        call = multicall.Call()
+        for tick in initialized:
+            call.add(pool.ticks, tick)
+        ticks = {t: info.liquidityNet for t, info in zip(initialized, call())}
+
+    return PoolState(
+        token0=pool.token0(),
+        token1=pool.token1(),
+        fee=pool.fee(),
+        tick_spacing=tick_spacing,
+        sqrt_price_x96=slot0.sqrtPriceX96,
+        tick=slot0.tick,
+        liquidity=pool.liquidity(),
+        bitmap=bitmap,
+        ticks=ticks,
+        min_word=word_positions[0],
+        max_word=word_positions[-1],
+    )
+
+
+def snapshot_route(asset: str, fees: Sequence[int], words: int = 2):
+    """The pools the strategy swaps COMP to `asset` through."""
+    factory = Contract(FACTORY)
+    tokens = [COMP, WETH] if asset.lower() == WETH.lower() else [COMP, WETH, asset]
+    return [
+        snapshot_pool(factory.getPool(token_in, token_out, fee), words)
+        for token_in, token_out, fee in zip(tokens, tokens[1:], fees)
+    ]
+
+
+@click.command(cls=NetworkBoundCommand)
+@network_option()
+@click.option("--asset", default=WETH, show_default=True)
+@click.option("--fees", nargs=2, type=int, default=(3000, 500), show_default=True)
+@click.option("--amount", "amounts", multiple=True, type=float, help="COMP to sell")
+@click.option("--words", default=2, show_default=True)
+def cli(network, asset, fees, amounts, words):
+    pools = snapshot_route(asset, fees, words)
+
+    amounts = amounts or (1, 10, 100, 1_000)
+    quotes = quote_amounts(pools, COMP, [int(a * 1e18) for a in amounts])
+    click.echo(f"{'comp':>12}{'asset out':>32}")
+    for amount, out in zip(amounts, quotes):
+        click.echo(f"{amount:>12}{out:>32}")
@@ -1,5 +1,16 @@
 import pytest
-from ape import Contract, project
+from ape import Contract, chain, project
+from utils.markets import UTILIZATION
+
+pytest_plugins = ["utils.timing", "utils.state_image"]
+
+
+@pytest.fixture(scope="session", autouse=True)
+def session_image(pytestconfig):
+    # Addresses of the session contracts when starting from a state
+    # image. Autouse so the image is loaded before anything else is sent.
+    plugin = pytestconfig.pluginmanager.get_plugin("state_image")
+    yield None if plugin is None else plugin.session()
 
 
 @pytest.fixture(scope="session")
@@ -75,10 +86,11 @@ def whale(accounts):
 
 
 @pytest.fixture(scope="session")
-def amount(asset, user, whale):
+def amount(asset, user, whale, session_image):
     amount = 100 * 10 ** asset.decimals()
 
-    asset.transfer(user, amount, sender=whale)
+    if session_image is None:
+        asset.transfer(user, amount, sender=whale)
     yield amount
 
 
@@ -88,9 +100,10 @@ def weth(tokens):
 
 
 @pytest.fixture(scope="session")
-def weth_amount(user, weth):
+def weth_amount(user, weth, session_image):
     weth_amount = 10 ** weth.decimals()
-    user.transfer(weth, weth_amount)
+    if session_image is None:
+        user.transfer(weth, weth_amount)
     yield weth_amount
 
 
@@ -112,27 +125,93 @@ def create_strategy(management, keeper, rewards, asset, comet):
 
 
 @pytest.fixture(scope="session")
-def strategy(asset, create_strategy):
+def strategy(asset, create_strategy, session_image):
+    if session_image is not None:
+        yield project.IStrategyInterface.at(session_image["strategy"])
+        return
+
     strategy = create_strategy(asset)
 
     yield strategy
 
 
 @pytest.fixture(scope="session")
-def create_oracle(comet, management, weth):
+def create_oracle(comet, management):
     def create_oracle(c=comet, m=management):
-        oracle = m.deploy(project.CompoundV3AprOracle, "YCompV3 oracle", c)
+        return m.deploy(project.CompoundV3AprOracle, "YCompV3 oracle", c)
 
-        if c.baseToken() == weth:
-            oracle.setPriceFeeds(
-                "0x5f4eC3Df9cbd43714FE2740f5E3616155c5b8419",
-                oracle.rewardTokenPriceFeed(),
-                sender=m,
-            )
+    yield create_oracle
 
-        return oracle
 
-    yield create_oracle
+@pytest.fixture(scope="session")
+def lens(management, session_image):
+    if session_image is not None:
+        yield project.CompoundV3LenderLens.at(session_image["lens"])
+        return
+
+    yield management.deploy(project.CompoundV3LenderLens)
+
+
+@pytest.fixture(scope="session")
+def batch_depositor(strategy, management, session_image):
+    if session_image is not None:
+        yield project.BatchDepositor.at(session_image["batch_depositor"])
+        return
+
+    yield management.deploy(project.BatchDepositor, strategy, 60 * 60)
+
+
+@pytest.fixture(scope="session")
+def deposit_router(management, session_image):
+    if session_image is not None:
+        yield project.DepositRouter.at(session_image["deposit_router"])
+        return
+
+    yield management.deploy(project.DepositRouter)
+
+
+@pytest.fixture(scope="session")
+def keeper_batcher(management, session_image):
+    if session_image is not None:
+        yield project.KeeperBatcher.at(session_image["keeper_batcher"])
+        return
+
+    yield management.deploy(project.KeeperBatcher)
+
+
+@pytest.fixture(scope="session")
+def create_market(accounts, management, comet_rewards, comp):
+    # Deploys a synthetic market from a `utils.markets.MarketSpec`.
+    def create_market(spec):
+        asset = management.deploy(
+            project.MockERC20,
+            f"Synthetic {spec.decimals}",
+            f"SYN{spec.decimals}",
+            spec.decimals,
+        )
+        feed = management.deploy(project.MockPriceFeed, spec.base_price)
+        market = management.deploy(
+            project.MockComet,
+            (asset, feed, *spec.curve.config(), spec.reward_speed, spec.scale),
+        )
+
+        # Lend out part of the market to set its utilization
+        lender, borrower = accounts[4], accounts[5]
+        liquidity = 1_000_000 * spec.scale
+        asset.mint(lender, liquidity, sender=lender)
+        asset.approve(market, liquidity, sender=lender)
+        market.supply(asset, liquidity, sender=lender)
+        market.borrow(liquidity * UTILIZATION // 10**18, sender=borrower)
+
+        if spec.reward_speed:
+            rewards = Contract(comet_rewards.address)
+            governor = accounts[rewards.governor()]
+            chain.provider.set_balance(governor.address, 10**18)
+            rewards.setRewardConfig(market, comp, sender=governor)
+
+        return market, asset
+
+    yield create_market
 
 
 ############ HELPER FUNCTIONS ############
@@ -118,6 +118,32 @@ def test__set_min_amount_to_sell__reverts(
     assert strategy.minAmountToSell() == 1e12
 
 
+def test__set_price_feeds(
+    strategy,
+    management,
+    user,
+    comet,
+):
+    assert strategy.baseTokenPriceFeed() == comet.baseTokenPriceFeed()
+    assert (
+        strategy.rewardTokenPriceFeed() == "0xdbd020CAeF83eFd542f4De03e3cF0C28A4428bd5"
+    )
+
+    eth_feed = "0x5f4eC3Df9cbd43714FE2740f5E3616155c5b8419"
+
+    with reverts("!Authorized"):
+        strategy.setPriceFeeds(eth_feed, eth_feed, sender=user)
+
+    # Must be a valid feed
+    with reverts():
+        strategy.setPriceFeeds(user, eth_feed, sender=management)
+
+    strategy.setPriceFeeds(eth_feed, eth_feed, sender=management)
+
+    assert strategy.baseTokenPriceFeed() == eth_feed
+    assert strategy.rewardTokenPriceFeed() == eth_feed
+
+
 def test__emergency_withdraw__reverts(strategy, user, deposit, amount):
     with reverts("!Authorized"):
         strategy.emergencyWithdraw(100, sender=user)
@@ -134,3 +160,54 @@ def test__emergency_withdraw__reverts(strategy, user, deposit, amount):
 
     with reverts("!Authorized"):
         strategy.emergencyWithdraw(100, sender=user)
+
+
+def test__set_harvest_thresholds(strategy, management, user):
+    assert strategy.minRewardsToClaim() == 0
+    assert strategy.minAmountToSupply() == 0
+
+    with reverts("!Authorized"):
+        strategy.setMinRewardsToClaim(100, sender=user)
+    with reverts("!Authorized"):
+        strategy.setMinAmountToSupply(100, sender=user)
+
+    strategy.setMinRewardsToClaim(100, sender=management)
+    strategy.setMinAmountToSupply(200, sender=management)
+
+    assert strategy.minRewardsToClaim() == 100
+    assert strategy.minAmountToSupply() == 200
+
+
+def test__set_tend_params(strategy, asset, management, user):
+    # A whole token of idle asset by default
+    assert strategy.minIdleToTend() == 10 ** asset.decimals()
+    assert strategy.minCompValueToTend() == 0
+    assert strategy.maxTendBaseFee() == 0
+
+    with reverts("!Authorized"):
+        strategy.setTendParams(100, 200, 300, sender=user)
+
+    strategy.setTendParams(100, 200, 300, sender=management)
+
+    assert strategy.minIdleToTend() == 100
+    assert strategy.minCompValueToTend() == 200
+    assert strategy.maxTendBaseFee() == 300
+
+
+def test__set_liquidation_params(strategy, management, user):
+    assert strategy.maxAmountToSell() == 2**128 - 1
+    assert strategy.maxSlippage() == 10_000
+
+    with reverts("!Authorized"):
+        strategy.setLiquidationParams(100, 50, sender=user)
+
+    with reverts("!max"):
+        strategy.setLiquidationParams(0, 50, sender=management)
+
+    with reverts("!slippage"):
+        strategy.setLiquidationParams(100, 10_001, sender=management)
+
+    strategy.setLiquidationParams(100, 50, sender=management)
+
+    assert strategy.maxAmountToSell() == 100
+    assert strategy.maxSlippage() == 50
@@ -0,0 +1,81 @@
+import asyncio
+from ape import chain
+from scripts.apr_sweep import AprCache, share, sweep, web3_call
+import pytest
+
+
+def test__sweep(create_oracle, comet, asset, tmp_path):
+    oracle = create_oracle()
+    block = chain.blocks.head.number
+    supply = comet.totalSupply()
+
+    calls = []
+    call = web3_call(chain.provider.web3)
+
+    def counted(to, data, block):
+        calls.append(to)
+        return call(to, data, block)
+
+    cache = AprCache(tmp_path / "cache.sqlite")
+    rows = asyncio.run(
+        sweep(
+            counted,
+            [oracle.address],
+            block,
+            deltas=[0, -int(1e18)],
+            bps=[1_000],
+            cache=cache,
+        )
+    )
+
+    assert [row["delta"] for row in rows] == [0, -int(1e18), supply // 10]
+    for row in rows:
+        assert row["comet"] == comet.address
+        assert row["asset"] == asset.address
+        assert row["apr"] == oracle.aprAfterDebtChange(asset, row["delta"])
+
+    # Same block again is served entirely from the cache
+    first = len(calls)
+    again = asyncio.run(
+        sweep(
+            counted,
+            [oracle.address],
+            block,
+            deltas=[0, -int(1e18)],
+            bps=[1_000],
+            cache=cache,
+        )
+    )
+
+    assert again == rows
+    assert len(calls) == first
+    assert cache.hits == 3
+
+
+def test__cache_eviction():
+    cache = AprCache(":memory:", max_entries=2)
+
+    for delta in range(3):
+        cache.put(("0xa", "0xb", delta, 1), delta)
+    # Touch the oldest so the second is least recently used
+    assert cache.get(("0xa", "0xb", 0, 1)) == 0
+    cache.commit()
+
+    assert len(cache) == 2
+    assert cache.get(("0xa", "0xb", 1, 1)) is None
+    assert cache.get(("0xa", "0xb", 0, 1)) == 0
+    assert cache.get(("0xa", "0xb", 2, 1)) == 2
+    # Negative deltas bigger than a sqlite integer
+    cache.put(("0xa", "0xb", -(2**200), 1), 5)
+    assert cache.get(("0xA", "0xB", -(2**200), 1)) == 5
+
+
+def test__share():
+    # 18 decimal supplies are past float precision
+    supply = 123_456_789_123_456_789_123_456_789
+    assert share(supply, 1_000) == 12_345_678_912_345_678_912_345_678
+    assert share(supply, -1_000) == -12_345_678_912_345_678_912_345_678
+    assert share(supply, 10_000) == supply
+    assert share(supply, 0) == 0
+    assert share(9, 1) == 0
+    assert share(9, -1) == 0
@@ -0,0 +1,97 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from scripts.backtest import (
+    MARKET_COLUMNS,
+    MarketSeries,
+    StrategyParams,
+    load_market_series,
+    run_backtest,
+)
+
+SAMPLE = Path(__file__).parents[1] / "data" / "comet_weth_sample.csv"
+
+
+@pytest.fixture(scope="module")
+def market():
+    yield load_market_series(SAMPLE)
+
+
+def test__backtest__sweep(market):
+    params = StrategyParams.grid(
+        report_interval=(3600, 86400, 7 * 86400),
+        comp_to_eth_fee=(500, 3000, 10000),
+        eth_to_asset_fee=(0,),
+        performance_fee=(0, 1000),
+    )
+    result = run_backtest(market, params)
+
+    assert len(params) == 18
+    assert result.price_per_share.shape == (18, len(market))
+    assert np.all(result.apy > 0)
+    assert np.all(result.apy < 1)
+    assert np.all(result.comp_sold > 0)
+
+    # Fees only ever lower the yield
+    cheap = params.comp_to_eth_fee == 500
+    expensive = params.comp_to_eth_fee == 10000
+    assert np.all(result.apy[cheap] > result.apy[expensive])
+    assert np.all(
+        result.apy[params.performance_fee == 0]
+        > result.apy[params.performance_fee == 1000]
+    )
+
+    # Every report sells everything that was claimed
+    assert np.allclose(result.comp_sold, result.comp_claimed)
+
+
+def test__backtest__report_interval(market):
+    params = StrategyParams.grid(
+        report_interval=(86400, 7 * 86400), eth_to_asset_fee=(0,)
+    )
+    result = run_backtest(market, params)
+
+    assert list(result.reports) == [30, 4]
+    # Less frequent reports leave more profit locked at the end
+    assert result.apy[0] > result.apy[1]
+    assert result.unsold_comp[0] < result.unsold_comp[1]
+
+
+def test__backtest__min_amount_high__doesnt_sell(market):
+    params = StrategyParams.grid(
+        min_amount_to_sell=(0, 10_000e18), eth_to_asset_fee=(0,)
+    )
+    result = run_backtest(market, params)
+
+    assert result.comp_sold[0] > 0
+    assert result.comp_sold[1] == 0
+    assert result.asset_from_rewards[1] == 0
+    # Selling compounds so the unsold lane accrues slightly less
+    assert result.unsold_comp[1] < result.comp_claimed[0] + result.unsold_comp[0]
+    assert result.unsold_comp[1] == pytest.approx(
+        result.comp_claimed[0] + result.unsold_comp[0], rel=1e-2
+    )
+    assert result.apy[0] > result.apy[1] > 0
+
+
+def test__backtest__no_unlock_time(market):
+    params = StrategyParams.grid(
+        profit_max_unlock_time=(0, 10 * 86400), eth_to_asset_fee=(0,)
+    )
+    result = run_backtest(market, params)
+
+    # Profit is available immediately when it is not locked
+    assert result.apy[0] > result.apy[1]
+    assert np.all(np.diff(result.price_per_share[1]) >= 0)
+
+
+def test__market_series__columns(market):
+    # The sample's utilization column isn't part of the model
+    assert "utilization" not in MARKET_COLUMNS
+    columns = {c: getattr(market, c) for c in MARKET_COLUMNS}
+    assert len(MarketSeries.from_columns(columns)) == len(market)
+
+    with pytest.raises(ValueError, match="missing columns"):
+        del columns["supply_index"]
+        MarketSeries.from_columns(columns)
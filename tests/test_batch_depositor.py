@@ -0,0 +1,103 @@
+import ape
+from ape import reverts
+from utils.checks import check_strategy_totals
+import pytest
+
+
+def test__batch_deposit(
+    chain,
+    asset,
+    strategy,
+    batch_depositor,
+    accounts,
+    user,
+    whale,
+    amount,
+    management,
+):
+    users = [user] + [accounts[i] for i in range(4, 7)]
+    amounts = [amount * (i + 1) for i in range(len(users))]
+    for account, assets in zip(users, amounts):
+        if account != user:
+            asset.transfer(account, assets, sender=whale)
+        asset.approve(batch_depositor, assets, sender=account)
+        batch_depositor.deposit(assets, sender=account)
+        assert batch_depositor.pending(account) == assets
+
+    # Nothing reaches the strategy until the batch is executed
+    assert strategy.totalAssets() == 0
+    assert asset.balanceOf(batch_depositor) == sum(amounts)
+
+    with reverts("window"):
+        batch_depositor.execute(sender=user)
+
+    chain.mine(timestamp=chain.pending_timestamp + 60 * 60)
+    tx = batch_depositor.execute(sender=user)
+    shares = tx.return_value
+
+    check_strategy_totals(
+        strategy,
+        total_assets=sum(amounts),
+        total_debt=sum(amounts),
+        total_idle=0,
+        total_supply=sum(amounts),
+    )
+    assert batch_depositor.currentBatch() == 1
+    assert strategy.balanceOf(batch_depositor) == shares
+
+    for account, assets in zip(users, amounts):
+        expected = assets * shares // sum(amounts)
+        assert batch_depositor.pending(account) == 0
+        assert batch_depositor.claimable(account) == expected
+        batch_depositor.claim(sender=account)
+        assert strategy.balanceOf(account) == expected
+        assert batch_depositor.claimable(account) == 0
+
+        with reverts("nothing to claim"):
+            batch_depositor.claim(sender=account)
+
+    assert strategy.balanceOf(batch_depositor) < len(users)
+
+
+def test__batch_deposit__claims_on_next_deposit(
+    chain, asset, strategy, batch_depositor, user, amount, management
+):
+    asset.approve(batch_depositor, amount, sender=user)
+    batch_depositor.deposit(amount // 2, sender=user)
+    shares = batch_depositor.execute(sender=management).return_value
+
+    # Depositing into the next batch sends the shares of the last one
+    tx = batch_depositor.deposit(amount // 2, sender=user)
+
+    assert strategy.balanceOf(user) == shares
+    assert batch_depositor.pending(user) == amount // 2
+    assert batch_depositor.claimable(user) == 0
+    assert len(list(tx.decode_logs(batch_depositor.Claimed))) == 1
+
+
+def test__batch_deposit__cancel(
+    chain, asset, strategy, batch_depositor, user, amount, management
+):
+    balance = asset.balanceOf(user)
+    asset.approve(batch_depositor, amount, sender=user)
+    batch_depositor.deposit(amount, sender=user)
+
+    batch_depositor.cancel(sender=user)
+
+    assert asset.balanceOf(user) == balance
+    assert batch_depositor.pending(user) == 0
+
+    with reverts("nothing pending"):
+        batch_depositor.cancel(sender=user)
+
+    with reverts("empty batch"):
+        batch_depositor.execute(sender=management)
+
+
+def test__batch_deposit__set_window(batch_depositor, management, user):
+    with reverts("Ownable: caller is not the owner"):
+        batch_depositor.setWindow(0, sender=user)
+
+    batch_depositor.setWindow(0, sender=management)
+
+    assert batch_depositor.window() == 0
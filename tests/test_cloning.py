@@ -403,6 +403,10 @@ def test__clone__access(
 
     asset.transfer(user, amount, sender=whale)
 
+    # Shared by every clone without being written to its storage
+    assert strategy.base() == weth
+    assert strategy.router() == "0xE592427A0AEce92De3Edee1F18E0157C05861564"
+
     # Everything should start as 0
     assert strategy.uniFees(comp, weth) == 0
     assert strategy.uniFees(weth, comp) == 0
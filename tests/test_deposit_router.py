@@ -0,0 +1,81 @@
+import ape
+from ape import reverts
+from utils.checks import check_strategy_totals
+from scripts.permit import sign_permit
+import pytest
+
+
+def test__deposit_with_permit(chain, asset, strategy, deposit_router, user, amount):
+    deadline = chain.pending_timestamp + 60
+    v, r, s = sign_permit(asset, user, deposit_router, amount, deadline)
+
+    # No approval needed beforehand
+    assert asset.allowance(user, deposit_router) == 0
+    tx = deposit_router.depositWithPermit(
+        strategy, amount, user, deadline, v, r, s, sender=user
+    )
+
+    assert tx.return_value == amount
+    assert strategy.balanceOf(user) == amount
+    check_strategy_totals(
+        strategy,
+        total_assets=amount,
+        total_debt=amount,
+        total_idle=0,
+        total_supply=amount,
+    )
+    assert asset.balanceOf(deposit_router) == 0
+
+
+def test__deposit_with_permit__front_run(
+    chain, asset, strategy, deposit_router, user, management, amount
+):
+    deadline = chain.pending_timestamp + 60
+    v, r, s = sign_permit(asset, user, deposit_router, amount, deadline)
+
+    # Someone else submits the permit first
+    asset.permit(user, deposit_router, amount, deadline, v, r, s, sender=management)
+
+    deposit_router.depositWithPermit(
+        strategy, amount, user, deadline, v, r, s, sender=user
+    )
+
+    assert strategy.balanceOf(user) == amount
+
+
+def test__deposit_with_permit__bad_signature(
+    chain, asset, strategy, deposit_router, user, management, amount
+):
+    deadline = chain.pending_timestamp + 60
+    # Signed for a smaller amount
+    v, r, s = sign_permit(asset, user, deposit_router, amount // 2, deadline)
+
+    with reverts("permit"):
+        deposit_router.depositWithPermit(
+            strategy, amount, user, deadline, v, r, s, sender=user
+        )
+
+
+def test__deposit_eth(
+    create_strategy, comets, weth, deposit_router, strategy, user, management
+):
+    weth_strategy = create_strategy(weth, comets["weth"])
+    amount = int(1e18)
+
+    tx = deposit_router.depositEth(weth_strategy, user, value=amount, sender=user)
+
+    assert tx.return_value == amount
+    assert weth_strategy.balanceOf(user) == amount
+    assert weth_strategy.totalAssets() == amount
+
+    with reverts("not weth"):
+        deposit_router.depositEth(strategy, user, value=amount, sender=user)
+
+
+def test__deposit_approved(asset, strategy, deposit_router, user, amount):
+    asset.approve(deposit_router, amount, sender=user)
+
+    deposit_router.deposit(strategy, amount // 2, user, sender=user)
+    deposit_router.deposit(strategy, amount // 2, user, sender=user)
+
+    assert strategy.balanceOf(user) == amount
@@ -0,0 +1,138 @@
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+from scripts.exporter import Exporter, Histogram, Metrics, make_server
+from utils.utils import days_to_secs
+
+LABELS = (("strategy", "0xabc"), ("comet", "0xdef"))
+
+
+def parse(text):
+    """{(name, labels string): value} from the text format."""
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith("#"):
+            continue
+        series, value = line.rsplit(" ", 1)
+        name, _, labels = series.partition("{")
+        samples[(name, labels.rstrip("}"))] = float(value)
+    return samples
+
+
+def test__histogram__cumulative_buckets():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    assert histogram.lines("latency", ()) == [
+        'latency_bucket{le="0.1"} 2',
+        'latency_bucket{le="1.0"} 3',
+        'latency_bucket{le="+Inf"} 4',
+        "latency_sum 2.65",
+        "latency_count 4",
+    ]
+
+
+def test__metrics__render():
+    metrics = Metrics((1.0,))
+    metrics.set_gauges({"idle": {LABELS: 1.5}, "apr": {}})
+    metrics.observe("rpc_latency_seconds", 0.5, (("call", "lens"),))
+    metrics.observe("rpc_latency_seconds", 2.0, (("call", "lens"),))
+    metrics.inc("scrape_errors_total")
+
+    text = metrics.render()
+    assert "# TYPE compound_lender_idle gauge" in text
+    assert "# TYPE compound_lender_rpc_latency_seconds histogram" in text
+    assert "# TYPE compound_lender_scrape_errors_total counter" in text
+    # Gauges without any series are left out
+    assert "compound_lender_apr" not in text
+
+    samples = parse(text)
+    assert samples[("compound_lender_idle", 'strategy="0xabc",comet="0xdef"')] == 1.5
+    assert (
+        samples[("compound_lender_rpc_latency_seconds_bucket", 'call="lens",le="1.0"')]
+        == 1
+    )
+    assert samples[("compound_lender_rpc_latency_seconds_count", 'call="lens"')] == 2
+    assert samples[("compound_lender_scrape_errors_total", "")] == 1
+
+    with pytest.raises(ValueError):
+        metrics.set_gauges({"unknown": {}})
+
+
+def test__metrics__escapes_labels():
+    metrics = Metrics()
+    metrics.set_gauges({"idle": {(("strategy", 'a"b\\c\n'),): 1}})
+
+    assert 'compound_lender_idle{strategy="a\\"b\\\\c\\n"} 1.0' in metrics.render()
+
+
+def test__server():
+    metrics = Metrics()
+    metrics.set_gauges({"idle": {LABELS: 3}})
+    server = make_server(metrics, 0, "127.0.0.1")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        with urllib.request.urlopen(f"{url}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            assert response.read().decode() == metrics.render()
+
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{url}/other")
+    finally:
+        server.shutdown()
+
+
+def test__exporter__scrape(
+    chain,
+    lens,
+    asset,
+    comet,
+    strategy,
+    deposit,
+    amount,
+    management,
+    create_oracle,
+):
+    deposit()
+    chain.mine(days_to_secs(1))
+    strategy.report(sender=management)
+    chain.mine(days_to_secs(1))
+
+    oracle = create_oracle()
+    lens.setOracle(comet, oracle, sender=management)
+
+    exporter = Exporter(lens, [strategy.address])
+    exporter.scrape()
+    samples = parse(exporter.metrics.render())
+
+    labels = f'strategy="{strategy.address}",comet="{comet.address}"'
+    scale = 10 ** asset.decimals()
+
+    def gauge(name):
+        return samples[(f"compound_lender_{name}", labels)]
+
+    assert gauge("total_assets") == strategy.totalAssets() / scale
+    assert gauge("idle") == asset.balanceOf(strategy) / scale
+    assert gauge("comet_balance") == pytest.approx(
+        comet.balanceOf(strategy) / scale, rel=1e-9
+    )
+    assert gauge("pending_comp") > 0
+    assert gauge("is_shutdown") == 0
+    assert gauge("apr") == oracle.aprAfterDebtChange(asset, 0) / 1e18
+    assert gauge("seconds_since_report") == pytest.approx(days_to_secs(1), abs=60)
+    assert samples[
+        ("compound_lender_comet_utilization", f'comet="{comet.address}"')
+    ] == pytest.approx(comet.getUtilization() / 1e18)
+
+    # One lens read, one for the block and one multicall
+    assert samples[("compound_lender_scrape_duration_seconds_count", "")] == 1
+    for call in ("lens", "block", "multicall"):
+        assert (
+            samples[("compound_lender_rpc_latency_seconds_count", f'call="{call}"')]
+            == 1
+        )
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from scripts.harvest_interval import (
+    MIN_INTERVAL,
+    Fleet,
+    closed_form_interval,
+    keeper_schedule,
+    net_apy,
+    optimal_interval,
+)
+from utils.constants import DAY
+
+
+def fleet_row(**overrides):
+    row = {
+        "deposit": 10_000,
+        "supply_apr": 0.02,
+        "reward_speed": 1.15e12,
+        "comet_total_supply": 80_000,
+        "comp_price": 0.028,
+        "gas_cost": 0.001,
+        "profit_max_unlock_time": 100 * DAY,
+    }
+    row.update(overrides)
+    return row
+
+
+def make_fleet(**overrides):
+    return Fleet.from_rows([fleet_row(**overrides)])
+
+
+def test__optimal_interval__matches_grid_search():
+    fleet = Fleet.from_rows(
+        [
+            fleet_row(deposit=deposit, gas_cost=gas)
+            for deposit in (1_000, 10_000, 50_000)
+            for gas in (0.001, 0.01)
+        ]
+    )
+    interval = optimal_interval(fleet)
+
+    grid = np.linspace(MIN_INTERVAL, 100 * DAY, 20_000)[:, None]
+    expected = grid[np.argmax(net_apy(fleet, grid), axis=0), 0]
+
+    assert np.allclose(interval, expected, atol=2 * (grid[1, 0] - grid[0, 0]))
+    # closed form is a close approximation
+    assert np.allclose(closed_form_interval(fleet), interval, rtol=0.02)
+
+
+def test__optimal_interval__scales_with_gas_and_deposit():
+    cheap = optimal_interval(make_fleet(gas_cost=0.001))
+    expensive = optimal_interval(make_fleet(gas_cost=0.01))
+    big = optimal_interval(make_fleet(deposit=50_000))
+
+    assert cheap < expensive
+    assert big < cheap
+
+
+def test__optimal_interval__bounds():
+    # No rewards means reporting only costs gas
+    fleet = make_fleet(reward_speed=0, profit_max_unlock_time=10 * DAY)
+    assert optimal_interval(fleet) == 10 * DAY
+    assert closed_form_interval(fleet) == 10 * DAY
+
+    # Never report before min amount to sell worth of COMP has accrued
+    fleet = make_fleet(gas_cost=0, min_amount_to_sell=1e18)
+    lower, _ = fleet.bounds()
+    assert lower == pytest.approx(1 / fleet.comp_per_second[0])
+    assert optimal_interval(fleet) == pytest.approx(lower)
+
+
+def test__keeper_schedule():
+    fleet = Fleet.from_rows(
+        [
+            fleet_row(gas_cost=0.01),
+            fleet_row(gas_cost=0.001),
+        ]
+    )
+    schedule = keeper_schedule(["0xA", "0xB"], fleet, [1_000, 2_000])
+
+    assert [s["strategy"] for s in schedule] == ["0xB", "0xA"]
+    for s in schedule:
+        assert s["next_report"] - s["interval"] in (1_000, 2_000)
+        assert 0 < s["net_apy"] < 1
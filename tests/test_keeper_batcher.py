@@ -0,0 +1,96 @@
+from ape import chain, reverts
+from utils.utils import days_to_secs
+
+
+def setup_strategies(create_strategy, asset, whale, user, amount, count=3):
+    strategies = []
+    for _ in range(count):
+        strategy = create_strategy(asset)
+        asset.transfer(user, amount, sender=whale)
+        asset.approve(strategy, amount, sender=user)
+        strategy.deposit(amount, user, sender=user)
+        strategies.append(strategy)
+    return strategies
+
+
+def test__report_all(
+    create_strategy,
+    asset,
+    whale,
+    user,
+    amount,
+    management,
+    keeper,
+    keeper_batcher,
+):
+    strategies = setup_strategies(create_strategy, asset, whale, user, amount)
+    # The last one keeps its own keeper so its report reverts
+    for strategy in strategies[:-1]:
+        strategy.setKeeper(keeper_batcher, sender=management)
+    last_report = strategies[-1].lastReport()
+
+    chain.mine(days_to_secs(1))
+
+    with reverts("!keeper"):
+        keeper_batcher.reportAll(strategies, sender=keeper)
+
+    with reverts("Ownable: caller is not the owner"):
+        keeper_batcher.setKeeper(keeper, True, sender=keeper)
+    keeper_batcher.setKeeper(keeper, True, sender=management)
+    assert keeper_batcher.keepers(keeper)
+
+    # Nor does an entry that isn't a strategy, here one without code
+    tx = keeper_batcher.reportAll(strategies + [user], sender=keeper)
+    reports = tx.return_value
+
+    timestamp = chain.blocks[tx.block_number].timestamp
+    for strategy, report in zip(strategies[:-1], reports):
+        success, profit, loss = report
+        assert success
+        assert profit > 0
+        assert loss == 0
+        assert strategy.lastReport() == timestamp
+
+    assert tuple(reports[-2]) == (False, 0, 0)
+    assert tuple(reports[-1]) == (False, 0, 0)
+    assert strategies[-1].lastReport() == last_report
+
+    events = list(tx.decode_logs(keeper_batcher.Failed))
+    assert [event.strategy for event in events] == [strategies[-1], user]
+
+    keeper_batcher.setKeeper(keeper, False, sender=management)
+    with reverts("!keeper"):
+        keeper_batcher.reportAll(strategies, sender=keeper)
+
+
+def test__tend_all(
+    create_strategy,
+    asset,
+    comet,
+    whale,
+    user,
+    amount,
+    management,
+    keeper_batcher,
+):
+    strategies = setup_strategies(create_strategy, asset, whale, user, amount)
+    for strategy in strategies[1:]:
+        strategy.setKeeper(keeper_batcher, sender=management)
+
+    # Idle funds for the tends to supply
+    idle = amount // 10
+    for strategy in strategies:
+        asset.transfer(strategy, idle, sender=whale)
+        assert strategy.tendTrigger()
+
+    tx = keeper_batcher.tendAll(strategies + [user], sender=management)
+
+    assert list(tx.return_value) == [False, True, True, False]
+    events = list(tx.decode_logs(keeper_batcher.Failed))
+    assert [event.strategy for event in events] == [strategies[0], user]
+
+    assert asset.balanceOf(strategies[0]) == idle
+    for strategy in strategies[1:]:
+        assert asset.balanceOf(strategy) == 0
+        assert comet.balanceOf(strategy) >= amount + idle - 1
+        assert strategy.tendTrigger() == False
@@ -0,0 +1,109 @@
+import ape
+from ape import Contract, reverts, project
+from scripts.lens import STATE_SIZE, decode_states, fetch_states
+from utils.utils import days_to_secs
+import pytest
+
+
+def check_state(state, strategy, comet, asset, oracle=None):
+    assert state.strategy == strategy.address
+    assert state.comet == comet.address
+    assert state.comet_balance == comet.balanceOf(strategy)
+    assert state.idle == asset.balanceOf(strategy)
+    assert state.pending_rewards == strategy.getPendingRewards()
+    assert state.last_report == strategy.lastReport()
+    assert state.is_shutdown == strategy.isShutdown()
+    if oracle is None:
+        assert state.apr == 0
+    else:
+        assert state.apr == oracle.aprAfterDebtChange(asset, 0)
+
+
+def test__lens__get_states(
+    chain,
+    lens,
+    asset,
+    comet,
+    strategy,
+    deposit,
+    amount,
+    management,
+    create_oracle,
+):
+    assert STATE_SIZE == lens.STATE_SIZE()
+
+    data = lens.getStates([strategy])
+    assert len(data) == STATE_SIZE
+
+    (state,) = decode_states(data)
+    check_state(state, strategy, comet, asset)
+    assert state.comet_balance == 0
+    assert state.is_shutdown == False
+
+    deposit()
+    chain.mine(days_to_secs(1))
+
+    oracle = create_oracle()
+    lens.setOracle(comet, oracle, sender=management)
+
+    (state,) = decode_states(lens.getStates([strategy]))
+    check_state(state, strategy, comet, asset, oracle)
+    assert state.comet_balance >= amount
+    assert state.apr > 0
+
+    strategy.shutdownStrategy(sender=management)
+
+    (state,) = decode_states(lens.getStates([strategy]))
+    assert state.is_shutdown == True
+
+
+def test__lens__pagination(
+    lens,
+    asset,
+    comet,
+    comets,
+    tokens,
+    strategy,
+    management,
+    rewards,
+    keeper,
+    user,
+):
+    clones = [strategy]
+    for i in range(4):
+        tx = strategy.cloneCompoundV3Lender(
+            asset,
+            f"yTest Clone {i}",
+            management,
+            rewards,
+            keeper,
+            comet,
+            sender=management,
+        )
+        clones.append(project.IStrategyInterface.at(tx.return_value))
+
+    with reverts("Ownable: caller is not the owner"):
+        lens.addStrategies(clones, sender=user)
+
+    lens.addStrategies(clones, sender=management)
+    assert lens.numStrategies() == 5
+    assert lens.getStrategies() == [c.address for c in clones]
+
+    assert len(lens.getStates(0, 2)) == 2 * STATE_SIZE
+    assert len(lens.getStates(4, 2)) == STATE_SIZE
+    assert len(lens.getStates(5, 2)) == 0
+    assert len(lens.getStates(0, 2**256 - 1)) == 5 * STATE_SIZE
+
+    states = fetch_states(lens, page_size=2)
+    assert [s.strategy for s in states] == [c.address for c in clones]
+    for state, clone in zip(states, clones):
+        check_state(state, clone, comet, asset)
+
+    # Same result reading the list directly
+    assert fetch_states(lens, [c.address for c in clones], page_size=3) == states
+
+    with reverts("Ownable: caller is not the owner"):
+        lens.removeStrategy(0, sender=user)
+
+    lens.removeStrategy(0, sender=management)
+    assert lens.getStrategies() == [c.address for c in clones[4:] + clones[1:4]]
@@ -0,0 +1,42 @@
+import random
+
+import pytest
+from scripts.load_test import plan_round, run_load_test, summarize
+
+
+def test__plan_round__reproducible():
+    users = list(range(100))
+
+    first = plan_round(random.Random(1), users, 0.5)
+    second = plan_round(random.Random(1), users, 0.5)
+
+    assert first == second
+    # Nobody acts twice in a round
+    assert len({user for user, _, _ in first}) == len(first)
+    assert 0 < len(first) < len(users)
+
+
+def test__summarize():
+    records = [
+        {"operation": "deposit", "gas": gas, "latency": 0.01} for gas in range(1, 101)
+    ] + [{"operation": "redeem", "gas": 50, "latency": 0.02}]
+
+    summary = summarize(records, 2.0)
+
+    assert summary["operations"] == 101
+    assert summary["throughput"] == 50.5
+    assert summary["gas"]["deposit"]["count"] == 100
+    assert summary["gas"]["deposit"]["p50"] == pytest.approx(50.5)
+    assert summary["gas"]["deposit"]["p99"] == pytest.approx(99.01)
+    assert summary["gas"]["redeem"]["p95"] == 50
+
+
+def test__load_test(chain):
+    with chain.isolate():
+        report = run_load_test("usdc", 8, 3, 1.0, 4, 0)
+
+    assert report["operations"] > 0
+    assert set(report["gas"]) <= {"deposit", "withdraw", "redeem"}
+    # Rounding only ever favours the strategy and by a few wei
+    assert all(0 <= drift < 100 for drift in report["drift"]["per_round"])
+    assert 0 <= report["drift"]["dust_after_exit"] < 100
@@ -1,5 +1,5 @@
 import ape
-from ape import Contract
+from ape import Contract, reverts
 from utils.checks import check_strategy_totals
 from utils.utils import days_to_secs
 import pytest
@@ -200,6 +200,56 @@ def test__profitable_report__with_fee(
     assert asset.balanceOf(rewards) >= rewards_balance_before + expected_performance_fee
 
 
+def test__price_per_share_checkpoints(
+    chain,
+    strategy,
+    deposit,
+    keeper,
+):
+    assert strategy.numCheckpoints() == 0
+    assert strategy.getTrailingApr(days_to_secs(7)) == 0
+
+    deposit()
+
+    reports = []
+    for _ in range(4):
+        chain.mine(timestamp=chain.pending_timestamp + days_to_secs(2))
+        strategy.report(sender=keeper)
+        reports.append((chain.blocks.head.timestamp, strategy.pricePerShare()))
+
+    assert strategy.numCheckpoints() == len(reports)
+    for i, (timestamp, pps) in enumerate(reports):
+        checkpoint_timestamp, checkpoint_pps = strategy.getCheckpoint(i)
+        assert checkpoint_timestamp == timestamp
+        # Recorded before the report locks new profit, so the same up to
+        # rounding
+        assert abs(checkpoint_pps - pps) <= 1
+
+    with reverts("!index"):
+        strategy.getCheckpoint(len(reports))
+
+    # Unlock profits so the price per share moves
+    chain.mine(timestamp=chain.pending_timestamp + strategy.profitMaxUnlockTime())
+    now = chain.blocks.head.timestamp
+    pps = strategy.pricePerShare()
+
+    # Uses the last checkpoint at or before the start of each window
+    for window, index in (
+        (now - reports[1][0] - 60, 1),
+        (now - reports[1][0] + 60, 0),
+        (days_to_secs(365), 0),
+    ):
+        start, start_pps = strategy.getCheckpoint(index)
+        expected = (
+            (pps - start_pps)
+            * int(1e18)
+            * days_to_secs(365)
+            // (start_pps * (now - start))
+        )
+        assert expected > 0
+        assert pytest.approx(strategy.getTrailingApr(window), rel=1e-3) == expected
+
+
 def test__tend_trigger(
     chain,
     strategy,
@@ -241,3 +291,73 @@ def test__tend_trigger(
 
     # Check Trigger
     assert strategy.tendTrigger() == False
+
+
+def test__tend_trigger__idle(
+    chain,
+    strategy,
+    asset,
+    comet,
+    amount,
+    deposit,
+    keeper,
+    management,
+    whale,
+):
+    deposit()
+    assert strategy.tendTrigger() == False
+
+    # Dust isn't worth a tend by default
+    asset.transfer(strategy, strategy.minIdleToTend() - 1, sender=whale)
+    assert strategy.tendTrigger() == False
+
+    # Funds that reach the strategy outside of a deposit sit idle
+    idle = amount // 10
+    asset.transfer(strategy, idle, sender=whale)
+    idle = asset.balanceOf(strategy)
+    assert strategy.tendTrigger() == True
+
+    # Nor supplying
+    strategy.setMinAmountToSupply(idle, sender=management)
+    assert strategy.tendTrigger() == False
+    strategy.setMinAmountToSupply(0, sender=management)
+
+    # Without a max base fee the threshold is fixed
+    strategy.setTendParams(idle + 1, 0, 0, sender=management)
+    assert strategy.tendTrigger() == False
+
+    # Far below the max base fee it scales down to nothing
+    strategy.setTendParams(idle + 1, 0, 2**64 - 1, sender=management)
+    assert strategy.tendTrigger() == True
+
+    # And far above it out of reach
+    base_fee = chain.blocks.head.base_fee
+    strategy.setTendParams(idle, 0, 1, sender=management)
+    assert base_fee > 1
+    assert strategy.tendTrigger() == False
+    strategy.setTendParams(idle, 0, 2**64 - 1, sender=management)
+
+    comet_balance = comet.balanceOf(strategy)
+    tx = strategy.tend(sender=keeper)
+
+    (event,) = list(tx.decode_logs(strategy.Harvested))
+    assert event.sold == 0
+    assert event.resupplied == idle
+    assert asset.balanceOf(strategy) == 0
+    assert comet.balanceOf(strategy) >= comet_balance + idle - 1
+    assert strategy.tendTrigger() == False
+
+    # What management pulls out isn't tended back in before a report
+    strategy.emergencyWithdraw(idle, sender=management)
+    assert strategy.tendsPaused()
+    assert strategy.tendTrigger() == False
+    strategy.tend(sender=keeper)
+    assert asset.balanceOf(strategy) == idle
+
+    strategy.report(sender=keeper)
+    assert not strategy.tendsPaused()
+
+    # Nothing to tend once shut down
+    asset.transfer(strategy, idle, sender=whale)
+    strategy.shutdownStrategy(sender=management)
+    assert strategy.tendTrigger() == False
@@ -64,3 +64,125 @@ def test__usdc_oracle(create_oracle, tokens, comets, user, management):
     check_oracle(
         oracle, comet, asset, user, management, comet.baseTokenPriceFeed(), False
     )
+
+
+def test__realized_apr(chain, create_oracle, comet, user, management):
+    oracle = create_oracle()
+    hour = 60 * 60
+
+    assert oracle.observationCardinality() == 1
+    with reverts("Ownable: caller is not the owner"):
+        oracle.setObservationInterval(hour, sender=user)
+    with reverts("!increase"):
+        oracle.increaseObservationCardinality(1, sender=user)
+
+    oracle.increaseObservationCardinality(4, sender=user)
+    # The new slots are paid for up front
+    for i in range(1, 4):
+        assert oracle.observations(i).timestamp == 1
+    # Only grows once the next observation is written
+    assert oracle.observationCardinality() == 1
+
+    # Too soon after the first observation
+    assert not oracle.recordObservation.call()
+
+    # Six writes into four slots wraps the buffer
+    timestamps = []
+    for _ in range(6):
+        chain.mine(timestamp=chain.pending_timestamp + hour)
+        oracle.recordObservation(sender=user)
+        timestamps.append(chain.blocks.head.timestamp)
+
+    assert oracle.observationCardinality() == 4
+    assert oracle.observationIndex() == 2
+
+    # The oldest two writes were overwritten
+    oldest = timestamps[2]
+    assert oracle.observations(3).timestamp == oldest
+    now = chain.blocks.head.timestamp
+    for i, timestamp in enumerate(timestamps[2:]):
+        observation = oracle.observations((3 + i) % 4)
+        assert observation.timestamp == timestamp
+        assert oracle.supplyIndexAt(now - timestamp) == observation.supplyIndex
+
+    # Between observations is interpolated
+    middle = oracle.supplyIndexAt(now - oldest - hour // 2)
+    assert oracle.observations(3).supplyIndex < middle
+    assert middle < oracle.observations(0).supplyIndex
+
+    with reverts("OLD"):
+        oracle.supplyIndexAt(now - oldest + 1)
+
+    # Nothing else touched comet so the realized rate is the current rate
+    realized = oracle.getRealizedApr(now - oldest)
+    assert realized > 0
+    assert pytest.approx(realized, rel=1e-3) == oracle.getSupplyApr(
+        comet.getUtilization()
+    )
+
+
+def test__multi_oracle(create_oracle, tokens, comets, user, management):
+    oracle = management.deploy(project.CompoundV3MultiAprOracle, "YCompV3 oracle")
+
+    with reverts("Ownable: caller is not the owner"):
+        oracle.addMarket(comets["usdc"], sender=user)
+
+    for name in ("usdc", "weth"):
+        oracle.addMarket(comets[name], sender=management)
+
+    with reverts("already added"):
+        oracle.addMarket(comets["usdc"], sender=management)
+
+    assert oracle.numMarkets() == 2
+    assert list(oracle.getAssets()) == [tokens["usdc"], tokens["weth"]]
+
+    # Weth is priced in USD like comp by default
+    weth_market = oracle.markets(tokens["weth"])
+    assert (
+        weth_market.baseTokenPriceFeed == "0x5f4eC3Df9cbd43714FE2740f5E3616155c5b8419"
+    )
+    with reverts("Ownable: caller is not the owner"):
+        oracle.setPriceFeeds(
+            tokens["weth"],
+            "0x5f4eC3Df9cbd43714FE2740f5E3616155c5b8419",
+            weth_market.rewardTokenPriceFeed,
+            sender=user,
+        )
+    oracle.setPriceFeeds(
+        tokens["weth"],
+        "0x5f4eC3Df9cbd43714FE2740f5E3616155c5b8419",
+        weth_market.rewardTokenPriceFeed,
+        sender=management,
+    )
+
+    # Same answers as an oracle per comet with its default feeds
+    assets, aprs = oracle.getAprs()
+    for name, asset, apr in zip(("usdc", "weth"), assets, aprs):
+        comet = Contract(comets[name])
+        single = create_oracle(comet)
+        assert asset == tokens[name]
+        assert single.baseTokenPriceFeed() == oracle.markets(asset).baseTokenPriceFeed
+        assert apr == single.aprAfterDebtChange(asset, 0)
+        assert apr > 0
+
+        supply = comet.totalSupply()
+        assert oracle.aprAfterDebtChange(
+            asset, supply // 10
+        ) == single.aprAfterDebtChange(asset, supply // 10)
+        assert oracle.getRewardAprForSupplyBase(
+            asset, supply
+        ) == single.getRewardAprForSupplyBase(supply)
+        utilization = comet.getUtilization()
+        assert oracle.getSupplyApr(asset, utilization) == single.getSupplyApr(
+            utilization
+        )
+
+    with reverts("wrong asset"):
+        oracle.aprAfterDebtChange(tokens["dai"], 0)
+
+    oracle.removeMarket(tokens["usdc"], sender=management)
+    assert list(oracle.getAssets()) == [tokens["weth"]]
+    with reverts("wrong asset"):
+        oracle.aprAfterDebtChange(tokens["usdc"], 0)
+    with reverts("wrong asset"):
+        oracle.removeMarket(tokens["usdc"], sender=management)
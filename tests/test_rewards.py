@@ -1,6 +1,9 @@
+from dataclasses import replace
+
 import ape
 from ape import Contract, reverts
 from utils.checks import check_strategy_totals
+from utils.markets import BASE_PRICES, CURVES, REWARD_SPEEDS, MarketSpec
 from utils.utils import days_to_secs
 import pytest
 
@@ -419,3 +422,431 @@ def test__dont_set_uni_fees__reverts(
     )
 
     assert asset.balanceOf(user) > user_balance_before
+
+
+def test__pending_rewards__view(
+    chain,
+    weth,
+    weth_amount,
+    create_strategy,
+    user,
+    management,
+    whale,
+    comet_rewards,
+    comp,
+    comets,
+):
+    asset = weth
+    amount = weth_amount
+    comet = Contract(comets["weth"])
+
+    strategy = create_strategy(asset, comet)
+
+    # Price weth in USD like comp
+    strategy.setPriceFeeds(
+        "0x5f4eC3Df9cbd43714FE2740f5E3616155c5b8419",
+        strategy.rewardTokenPriceFeed(),
+        sender=management,
+    )
+
+    assert strategy.getPendingRewards() == 0
+    assert strategy.estimatedTotalAssets() == 0
+
+    asset.transfer(user, amount, sender=whale)
+    asset.approve(strategy, amount, sender=user)
+    strategy.deposit(amount, user, sender=user)
+
+    # Earn some rewards
+    chain.mine(days_to_secs(5))
+
+    pending = strategy.getPendingRewards()
+    assert pending > 0
+
+    tx = comet_rewards.getRewardOwed(comet, strategy.address, sender=user)
+    rewards_owed = tx.return_value.owed
+
+    # The view is computed a block earlier than the accrual
+    assert pytest.approx(pending, rel=1e-4) == rewards_owed
+    assert strategy.getPendingRewards() >= rewards_owed
+
+    invested = comet.balanceOf(strategy)
+    estimated = strategy.estimatedTotalAssets()
+    assert estimated > invested
+
+    # Unsold comp is counted as well
+    comp.transfer(strategy, int(1e18), sender=whale)
+    assert strategy.estimatedTotalAssets() > estimated
+
+    # Nothing left pending after claiming
+    comet_rewards.claim(comet, strategy, True, sender=user)
+    assert strategy.getPendingRewards() < pending // 1000
+    assert comp.balanceOf(strategy) >= rewards_owed
+
+
+def test__estimated_total_assets__weth(
+    weth, create_strategy, management, whale, comp, comets
+):
+    comet = Contract(comets["weth"])
+    strategy = create_strategy(weth, comet)
+    strategy.setUniFees(3000, 0, sender=management)
+
+    # Weth is priced in USD like comp without setting the feeds
+    eth_feed = "0x5f4eC3Df9cbd43714FE2740f5E3616155c5b8419"
+    assert strategy.baseTokenPriceFeed() == eth_feed
+
+    amount = int(10e18)
+    comp.transfer(strategy, amount, sender=whale)
+
+    comp_price = comet.getPrice(strategy.rewardTokenPriceFeed())
+    expected = amount * comp_price // comet.getPrice(eth_feed)
+    assert strategy.estimatedTotalAssets() == expected
+
+    # Close to what the comp would actually sell for
+    quoter = Contract("0xb27308f9F90D607463bb33eA1BeBb41C27CE5AB6")
+    path = bytes.fromhex(comp.address[2:] + "000bb8" + weth.address[2:])
+    assert pytest.approx(expected, rel=0.1) == quoter.quoteExactInput.call(path, amount)
+
+
+def test__pending_rewards__unincentivized(
+    chain,
+    asset,
+    strategy,
+    deposit,
+    comp,
+    comet,
+):
+    if comet.baseTrackingSupplySpeed() > 0:
+        pytest.skip("comet is incentivized")
+
+    deposit()
+
+    chain.mine(days_to_secs(5))
+
+    assert strategy.getPendingRewards() == 0
+    assert pytest.approx(strategy.estimatedTotalAssets(), abs=1) == comet.balanceOf(
+        strategy
+    )
+
+
+def test__harvest_event(
+    chain,
+    weth,
+    weth_amount,
+    create_strategy,
+    user,
+    management,
+    whale,
+    keeper,
+    comet_rewards,
+    comp,
+    comets,
+):
+    asset = weth
+    amount = weth_amount
+    comet = comets["weth"]
+
+    strategy = create_strategy(asset, comet)
+
+    strategy.setUniFees(3000, 0, sender=management)
+    strategy.setMinAmountToSell(0, sender=management)
+
+    asset.transfer(user, amount, sender=whale)
+    asset.approve(strategy, amount, sender=user)
+    strategy.deposit(amount, user, sender=user)
+
+    chain.mine(days_to_secs(5))
+
+    # Leave some loose asset to be resupplied
+    loose = amount // 10
+    asset.transfer(strategy, loose, sender=whale)
+
+    pending = strategy.getPendingRewards()
+    assert pending > 0
+
+    tx = strategy.report(sender=keeper)
+
+    (event,) = list(tx.decode_logs(strategy.Harvested))
+    assert event.claimed >= pending
+    assert event.sold == event.claimed
+    assert event.received > 0
+    assert event.resupplied == event.received + loose
+    assert comp.balanceOf(strategy) == 0
+
+    # Nothing sold when under the min
+    strategy.setMinAmountToSell(int(10_000e18), sender=management)
+    chain.mine(days_to_secs(1))
+
+    tx = strategy.report(sender=keeper)
+
+    (event,) = list(tx.decode_logs(strategy.Harvested))
+    assert event.claimed > 0
+    assert event.sold == 0
+    assert event.received == 0
+    assert event.resupplied == 0
+    assert comp.balanceOf(strategy) == event.claimed
+
+    # No harvest once shutdown
+    strategy.shutdownStrategy(sender=management)
+    chain.mine(days_to_secs(1))
+
+    tx = strategy.report(sender=keeper)
+
+    assert list(tx.decode_logs(strategy.Harvested)) == []
+
+
+def test__staged_harvest(
+    chain,
+    weth,
+    weth_amount,
+    create_strategy,
+    user,
+    management,
+    whale,
+    keeper,
+    comp,
+    comets,
+):
+    asset = weth
+    amount = weth_amount
+    comet = Contract(comets["weth"])
+
+    strategy = create_strategy(asset, comet)
+
+    strategy.setUniFees(3000, 0, sender=management)
+    strategy.setMinAmountToSell(0, sender=management)
+
+    with reverts("!Authorized"):
+        strategy.setStagedHarvest(True, sender=user)
+
+    strategy.setStagedHarvest(True, sender=management)
+    assert strategy.stagedHarvest()
+    # Tend for any amount of comp at any base fee
+    min_idle = strategy.minIdleToTend()
+    strategy.setTendParams(min_idle, 0, 2**64 - 1, sender=management)
+
+    asset.transfer(user, amount, sender=whale)
+    asset.approve(strategy, amount, sender=user)
+    strategy.deposit(amount, user, sender=user)
+
+    assert strategy.tendTrigger() == False
+
+    chain.mine(days_to_secs(5))
+
+    # Report only claims
+    tx = strategy.report(sender=keeper)
+
+    (event,) = list(tx.decode_logs(strategy.Harvested))
+    assert event.claimed > 0
+    assert event.sold == 0
+    assert comp.balanceOf(strategy) == event.claimed
+
+    assert strategy.tendTrigger() == True
+
+    # Too little value for a threshold that doesn't scale with the base fee
+    strategy.setTendParams(min_idle, 2**96 - 1, 0, sender=management)
+    assert strategy.tendTrigger() == False
+    strategy.setTendParams(min_idle, 0, 2**64 - 1, sender=management)
+
+    comet_balance = comet.balanceOf(strategy)
+    tx = strategy.tend(sender=keeper)
+
+    (event,) = list(tx.decode_logs(strategy.Harvested))
+    assert event.claimed == 0
+    assert event.sold > 0
+    assert event.received > 0
+    assert event.resupplied == event.received
+    assert comp.balanceOf(strategy) == 0
+    assert comet.balanceOf(strategy) >= comet_balance + event.received - 1
+    assert strategy.tendTrigger() == False
+
+    # The proceeds are realized by the next report
+    tx = strategy.report(sender=keeper)
+    profit, loss = tx.return_value
+    assert profit >= event.received
+
+    strategy.shutdownStrategy(sender=management)
+    assert strategy.tendTrigger() == False
+
+
+def test__min_rewards_to_claim(
+    chain,
+    weth,
+    weth_amount,
+    create_strategy,
+    user,
+    management,
+    whale,
+    keeper,
+    comp,
+    comets,
+):
+    asset = weth
+    amount = weth_amount
+    comet = comets["weth"]
+
+    strategy = create_strategy(asset, comet)
+
+    strategy.setUniFees(3000, 0, sender=management)
+    strategy.setMinAmountToSell(0, sender=management)
+    strategy.setMinRewardsToClaim(int(1_000e18), sender=management)
+
+    asset.transfer(user, amount, sender=whale)
+    asset.approve(strategy, amount, sender=user)
+    strategy.deposit(amount, user, sender=user)
+
+    chain.mine(days_to_secs(5))
+
+    pending = strategy.getPendingRewards()
+    assert 0 < pending < int(1_000e18)
+
+    tx = strategy.report(sender=keeper)
+    profit, loss = tx.return_value
+
+    # Interest is still reported without claiming
+    assert profit > 0
+    (event,) = list(tx.decode_logs(strategy.Harvested))
+    assert event.claimed == 0
+    assert comp.balanceOf(strategy) == 0
+    assert strategy.getPendingRewards() >= pending
+
+    strategy.setMinRewardsToClaim(0, sender=management)
+    tx = strategy.report(sender=keeper)
+
+    (event,) = list(tx.decode_logs(strategy.Harvested))
+    assert event.claimed >= pending
+    assert strategy.getPendingRewards() < pending
+
+
+def test__report__unincentivized(chain, strategy, deposit, comp, comet, keeper):
+    if comet.baseTrackingSupplySpeed() > 0:
+        pytest.skip("comet is incentivized")
+
+    deposit()
+    chain.mine(days_to_secs(5))
+
+    tx = strategy.report(sender=keeper)
+    profit, loss = tx.return_value
+
+    # Interest is reported without trying to claim
+    assert profit > 0
+    (event,) = list(tx.decode_logs(strategy.Harvested))
+    assert event.claimed == 0
+    assert comp.balanceOf(strategy) == 0
+
+
+def test__report__gas_rewarded_vs_unrewarded(
+    chain, create_market, create_strategy, user, management, keeper
+):
+    # Two synthetic markets alike but for the reward speed
+    rewarded = MarketSpec(6, CURVES[0], REWARD_SPEEDS[1], BASE_PRICES[0])
+    unrewarded = replace(rewarded, reward_speed=0)
+
+    gas = {}
+    for spec in (rewarded, unrewarded):
+        market, asset = create_market(spec)
+        strategy = create_strategy(asset, market)
+        # No pools to sell synthetic rewards into, only the claim is measured
+        strategy.setMinAmountToSell(2**256 - 1, sender=management)
+
+        amount = 1_000 * spec.scale
+        asset.mint(user, amount, sender=user)
+        asset.approve(strategy, amount, sender=user)
+        strategy.deposit(amount, user, sender=user)
+
+        chain.mine(days_to_secs(1))
+        tx = strategy.report(sender=keeper)
+        (event,) = list(tx.decode_logs(strategy.Harvested))
+        assert (event.claimed > 0) == bool(spec.reward_speed)
+        gas[spec.id] = tx.gas_used
+
+    print(f"report gas: {gas}")
+    # The unrewarded report skips the rewards contract entirely
+    assert gas[unrewarded.id] + 20_000 < gas[rewarded.id]
+
+
+def test__min_amount_to_supply(
+    chain,
+    asset,
+    strategy,
+    deposit,
+    amount,
+    management,
+    whale,
+    keeper,
+):
+    deposit()
+
+    dust = 10 ** (asset.decimals() // 2)
+    strategy.setMinAmountToSupply(dust, sender=management)
+    asset.transfer(strategy, dust, sender=whale)
+
+    chain.mine(days_to_secs(1))
+    tx = strategy.report(sender=keeper)
+
+    # Left idle but still counted
+    (event,) = list(tx.decode_logs(strategy.Harvested))
+    assert event.resupplied == 0
+    assert asset.balanceOf(strategy) == dust
+    profit, loss = tx.return_value
+    assert profit >= dust
+
+    asset.transfer(strategy, dust, sender=whale)
+    tx = strategy.report(sender=keeper)
+
+    (event,) = list(tx.decode_logs(strategy.Harvested))
+    assert event.resupplied == 2 * dust
+    assert asset.balanceOf(strategy) == 0
+
+
+def test__liquidation_chunks(
+    chain,
+    weth,
+    weth_amount,
+    create_strategy,
+    user,
+    management,
+    whale,
+    keeper,
+    comp,
+    comets,
+):
+    asset = weth
+    amount = weth_amount
+    comet = comets["weth"]
+
+    strategy = create_strategy(asset, comet)
+
+    strategy.setUniFees(3000, 0, sender=management)
+    strategy.setMinAmountToSell(0, sender=management)
+    # Value comp and weth in the same unit for the min out
+    strategy.setPriceFeeds(
+        "0x5f4eC3Df9cbd43714FE2740f5E3616155c5b8419",
+        "0xdbd020CAeF83eFd542f4De03e3cF0C28A4428bd5",
+        sender=management,
+    )
+    # Only sell what is sent so the chunks are exact
+    strategy.setMinRewardsToClaim(int(1_000e18), sender=management)
+
+    asset.transfer(user, amount, sender=whale)
+    asset.approve(strategy, amount, sender=user)
+    strategy.deposit(amount, user, sender=user)
+
+    comp_amount = int(10e18)
+    chunk = int(4e18)
+    comp.transfer(strategy, comp_amount, sender=whale)
+
+    # Selling at the price feeds less nothing can't cover the pool fee
+    strategy.setLiquidationParams(chunk, 0, sender=management)
+    with reverts("Too little received"):
+        strategy.report(sender=keeper)
+
+    strategy.setLiquidationParams(chunk, 1_000, sender=management)
+
+    for sold, remaining in ((chunk, 6e18), (chunk, 2e18), (2e18, 0)):
+        chain.mine(days_to_secs(1))
+        tx = strategy.report(sender=keeper)
+
+        (event,) = list(tx.decode_logs(strategy.Harvested))
+        assert event.sold == sold
+        assert event.received > 0
+        assert comp.balanceOf(strategy) == remaining
@@ -35,7 +35,12 @@ def test__emergency_withdraw(
 
     # Need to shutdown the strategy, withdraw and then report the updated balances
     strategy.shutdownStrategy(sender=management)
-    strategy.emergencyWithdraw(amount, sender=management)
+    tx = strategy.emergencyWithdraw(amount, sender=management)
+
+    (event,) = list(tx.decode_logs(strategy.EmergencyWithdrawn))
+    assert event.requested == amount
+    assert event.withdrawn == amount
+
     strategy.report(sender=management)
 
     assert asset.balanceOf(strategy) >= amount
@@ -117,3 +122,21 @@ def test__shutdown__report_doesnt_reinvest(
     )
 
     assert asset.balanceOf(user) > user_balance_before
+
+
+def test__emergency_withdraw__max(
+    chain, asset, comet, strategy, deposit, amount, management
+):
+    deposit()
+
+    chain.mine(days_to_secs(1))
+
+    strategy.shutdownStrategy(sender=management)
+    tx = strategy.emergencyWithdraw(2**256 - 1, sender=management)
+
+    (event,) = list(tx.decode_logs(strategy.EmergencyWithdrawn))
+    assert event.requested == 2**256 - 1
+    # Withdraws the interest accrued since the deposit as well
+    assert event.withdrawn > amount
+    assert comet.balanceOf(strategy) == 0
+    assert asset.balanceOf(strategy) == event.withdrawn
@@ -0,0 +1,113 @@
+from types import SimpleNamespace
+
+from ape import chain, project
+from scripts import state_image
+
+
+def test__state_image__build_and_load(
+    asset, comet, user, whale, management, keeper, create_strategy, tmp_path
+):
+    snapshot = chain.snapshot()
+
+    def deploy():
+        strategy = create_strategy(asset)
+        asset.transfer(user, 10 ** asset.decimals(), sender=whale)
+        return {"strategy": strategy.address}
+
+    image = state_image.build(deploy)
+    strategy = project.IStrategyInterface.at(image["session"]["strategy"])
+
+    expected = {
+        "keeper": strategy.keeper(),
+        "comet": strategy.comet(),
+        "min_amount_to_sell": strategy.minAmountToSell(),
+        "allowance": asset.allowance(strategy, comet),
+        "user_balance": asset.balanceOf(user),
+        "nonce": management.nonce,
+    }
+    assert expected["keeper"] == keeper
+    assert image["accounts"][strategy.address]["storage"]
+
+    path = tmp_path / "image.json"
+    state_image.write(image, path)
+    image = state_image.read(path)
+
+    chain.restore(snapshot)
+    assert chain.provider.get_code(strategy.address) in (b"", "0x")
+    assert asset.allowance(strategy, comet) == 0
+
+    state_image.load(image)
+
+    assert chain.pending_timestamp > image["timestamp"]
+    assert {
+        "keeper": strategy.keeper(),
+        "comet": strategy.comet(),
+        "min_amount_to_sell": strategy.minAmountToSell(),
+        "allowance": asset.allowance(strategy, comet),
+        "user_balance": asset.balanceOf(user),
+        "nonce": management.nonce,
+    } == expected
+
+    # Works like a freshly deployed one
+    asset.approve(strategy, 10**6, sender=user)
+    strategy.deposit(10**6, user, sender=user)
+    assert strategy.totalAssets() == 10**6
+
+
+def test__state_image__stale_reason(asset, create_strategy):
+    image = state_image.build(lambda: {"strategy": create_strategy(asset).address})
+
+    # Built on this block rather than the fork's
+    assert "forked at" in state_image.stale_reason(image)
+
+    assert state_image.stale_reason({**image, "version": 0}) == "image format changed"
+    assert state_image.stale_reason({**image, "chain_id": 0}) == "different chain"
+
+    head = chain.blocks.head
+    current = {
+        **image,
+        "fork_block": head.number,
+        "fork_block_hash": head.hash.hex(),
+    }
+    assert state_image.stale_reason(current) is None
+
+    code_hashes = {**image["code_hashes"], "CompoundV3Lender": "0x00"}
+    assert (
+        state_image.stale_reason({**current, "code_hashes": code_hashes})
+        == "contracts changed since the image was built"
+    )
+
+
+def test__storage_written__delegate_call_in_create(monkeypatch):
+    root, created, library = (
+        state_image._address(int(byte * 20, 16)) for byte in ("aa", "bb", "cc")
+    )
+
+    def step(depth, op, *stack):
+        return {"depth": depth, "op": op, "stack": [hex(v) for v in stack]}
+
+    # A factory creates a clone whose constructor delegates its
+    # initializer to a library, the way clone initializers write storage.
+    trace = [
+        step(1, "SSTORE", 0, 1),
+        step(1, "CREATE", 0, 0, 0),
+        step(2, "DELEGATECALL", 0, 0, 0, 0, int(library, 16), 0),
+        step(3, "SSTORE", 1, 2),
+        step(3, "RETURN", 0, 0),
+        # The delegate call's success flag is on top, not an address
+        step(2, "SSTORE", 1, 3),
+        step(2, "RETURN", 0, 0),
+        step(1, "POP", int(created, 16)),
+        step(1, "STOP"),
+    ]
+    receipt = SimpleNamespace(contract_address=None, receiver=root)
+    monkeypatch.setattr(
+        state_image,
+        "chain",
+        SimpleNamespace(provider=SimpleNamespace(get_receipt=lambda _: receipt)),
+    )
+    monkeypatch.setattr(state_image, "_rpc", lambda *_: {"structLogs": trace})
+
+    written = state_image.storage_written("0x00")
+
+    assert dict(written) == {root: {1}, created: {2, 3}}
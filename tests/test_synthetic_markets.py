@@ -0,0 +1,76 @@
+from ape import chain
+from utils.markets import MARKETS, SECONDS_PER_YEAR
+import pytest
+
+markets = pytest.mark.parametrize("spec", MARKETS, ids=[m.id for m in MARKETS])
+
+
+@markets
+def test__synthetic__report(
+    spec, create_market, create_strategy, user, management, keeper, comp
+):
+    market, asset = create_market(spec)
+    strategy = create_strategy(asset, market)
+    # There are no pools to sell rewards for a synthetic asset
+    strategy.setMinAmountToSell(2**256 - 1, sender=management)
+
+    amount = 1_000 * spec.scale
+    asset.mint(user, amount, sender=user)
+    asset.approve(strategy, amount, sender=user)
+    deposit = strategy.deposit(amount, user, sender=user)
+
+    # Comet rounds principals down
+    assert amount - 1 <= market.balanceOf(strategy) <= amount
+    rate = spec.curve.supply_rate(market.getUtilization())
+
+    chain.mine(timestamp=chain.pending_timestamp + 24 * 60 * 60)
+    pending = strategy.getPendingRewards()
+
+    tx = strategy.report(sender=keeper)
+    profit, loss = tx.return_value
+    elapsed = (
+        chain.blocks[tx.block_number].timestamp
+        - chain.blocks[deposit.block_number].timestamp
+    )
+
+    assert loss == 0
+    assert profit == pytest.approx(amount * rate * elapsed // 10**18, rel=1e-4)
+    assert profit > 0
+
+    (event,) = list(tx.decode_logs(strategy.Harvested))
+    if spec.reward_speed:
+        assert 0 < pending <= event.claimed
+        assert event.claimed == pytest.approx(pending, rel=1e-4)
+        assert comp.balanceOf(strategy) == event.claimed
+    else:
+        assert pending == 0
+        assert event.claimed == 0
+
+    # Full exit of what was deposited, the profit is still locked
+    strategy.redeem(strategy.balanceOf(user), user, user, sender=user)
+    assert asset.balanceOf(user) >= amount - 1
+
+
+@markets
+def test__synthetic__oracle(spec, create_market, create_oracle, management):
+    market, asset = create_market(spec)
+    oracle = create_oracle(market)
+
+    utilization = market.getUtilization()
+    supply_apr = spec.curve.supply_rate(utilization) * SECONDS_PER_YEAR
+    assert oracle.getSupplyApr(utilization) == supply_apr
+    assert supply_apr > 0
+
+    comp_price = market.getPrice(oracle.rewardTokenPriceFeed())
+    supply = market.totalSupply()
+    reward_apr = spec.reward_apr(comp_price, supply)
+    assert oracle.getRewardAprForSupplyBase(supply) == reward_apr
+    assert (reward_apr > 0) == bool(spec.reward_speed)
+
+    # Totals accrued in the view can move the utilization by a few wei
+    assert oracle.aprAfterDebtChange(asset, 0) == pytest.approx(
+        supply_apr + reward_apr, rel=1e-6
+    )
+
+    # More supply lowers the utilization and spreads the rewards thinner
+    assert oracle.aprAfterDebtChange(asset, supply // 10) < supply_apr + reward_apr
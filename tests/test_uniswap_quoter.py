@@ -0,0 +1,159 @@
+import pytest
+from ape import Contract
+from scripts.uniswap_quoter import (
+    COMP,
+    MAX_SQRT_RATIO,
+    MAX_TICK,
+    MIN_SQRT_RATIO,
+    MIN_TICK,
+    Q96,
+    WETH,
+    PoolState,
+    get_sqrt_ratio_at_tick,
+    get_tick_at_sqrt_ratio,
+    quote_amounts,
+    quote_path,
+    snapshot_route,
+)
+
+QUOTER = "0xb27308f9F90D607463bb33eA1BeBb41C27CE5AB6"
+SPACING = 60
+LIQUIDITY = 10**24
+
+
+def make_pool(positions, fee=3000, tick=0):
+    """Pool at `tick` with `(lower, upper, liquidity)` positions."""
+    ticks = {}
+    for lower, upper, liquidity in positions:
+        ticks[lower] = ticks.get(lower, 0) + liquidity
+        ticks[upper] = ticks.get(upper, 0) - liquidity
+
+    bitmap = {}
+    for t in ticks:
+        compressed = t // SPACING
+        bitmap[compressed >> 8] = bitmap.get(compressed >> 8, 0) | (
+            1 << compressed % 256
+        )
+
+    return PoolState(
+        token0="0x0",
+        token1="0x1",
+        fee=fee,
+        tick_spacing=SPACING,
+        sqrt_price_x96=get_sqrt_ratio_at_tick(tick),
+        tick=tick,
+        liquidity=sum(l for lower, upper, l in positions if lower <= tick < upper),
+        bitmap=bitmap,
+        ticks=ticks,
+        min_word=-2,
+        max_word=1,
+    )
+
+
+def sqrt_price(tick):
+    return 1.0001 ** (tick / 2)
+
+
+def test__sqrt_ratio_at_tick():
+    assert get_sqrt_ratio_at_tick(0) == Q96
+    assert get_sqrt_ratio_at_tick(MIN_TICK) == MIN_SQRT_RATIO
+    assert get_sqrt_ratio_at_tick(MAX_TICK) == MAX_SQRT_RATIO
+
+    for tick in (-100_000, -60, -1, 1, 60, 100_000):
+        assert get_sqrt_ratio_at_tick(tick) / Q96 == pytest.approx(
+            sqrt_price(tick), rel=1e-12
+        )
+
+    with pytest.raises(ValueError):
+        get_sqrt_ratio_at_tick(MAX_TICK + 1)
+
+
+def test__tick_at_sqrt_ratio():
+    for tick in (MIN_TICK, -100_001, -61, -1, 0, 1, 59, 100_000, MAX_TICK - 1):
+        ratio = get_sqrt_ratio_at_tick(tick)
+        assert get_tick_at_sqrt_ratio(ratio) == tick
+        assert get_tick_at_sqrt_ratio(ratio + 1) == tick
+        if tick > MIN_TICK:
+            assert get_tick_at_sqrt_ratio(ratio - 1) == tick - 1
+
+
+def test__quote__within_range():
+    pool = make_pool([(-600, 600, LIQUIDITY)])
+    amount = int(1e18)
+    in_less_fee = amount * (1 - 0.003)
+
+    # x * y = L^2 inside a single range
+    price_after = LIQUIDITY / (LIQUIDITY / 1 + in_less_fee)
+    expected = LIQUIDITY * (1 - price_after)
+    assert pool.quote(amount, True) == pytest.approx(expected, rel=1e-9)
+
+    price_after = (LIQUIDITY + in_less_fee) / LIQUIDITY
+    expected = LIQUIDITY * (1 - 1 / price_after)
+    assert pool.quote(amount, False) == pytest.approx(expected, rel=1e-9)
+
+
+def test__quote__crosses_ticks():
+    pool = make_pool([(-1200, 1200, LIQUIDITY), (-600, 600, LIQUIDITY)])
+
+    # Enough token0 to move through the inner range and then half way
+    # to the outer range's lower tick on its own.
+    inner = 2 * LIQUIDITY * (1 / sqrt_price(-600) - 1)
+    target = sqrt_price(-900)
+    outer = LIQUIDITY * (1 / target - 1 / sqrt_price(-600))
+    amount = int((inner + outer) / (1 - 0.003))
+
+    expected = 2 * LIQUIDITY * (1 - sqrt_price(-600)) + LIQUIDITY * (
+        sqrt_price(-600) - target
+    )
+    assert pool.quote(amount, True) == pytest.approx(expected, rel=1e-9)
+
+
+def test__quote__leaves_snapshot():
+    pool = make_pool([(-600, 600, LIQUIDITY)])
+
+    # Past the lower tick there is no liquidity until outside the snapshot
+    with pytest.raises(ValueError, match="snapshot"):
+        pool.quote(int(1e30), True)
+
+
+def test__quote_path():
+    first = make_pool([(-600, 600, LIQUIDITY)])
+    second = PoolState(**{**first.__dict__, "token0": "0x1", "token1": "0x2"})
+
+    amount = int(1e18)
+    assert quote_path([first, second], "0x0", amount) == second.quote(
+        first.quote(amount, True), True
+    )
+    # Reverse through the same pools
+    assert quote_path([second, first], "0x2", amount) == first.quote(
+        second.quote(amount, False), False
+    )
+    assert quote_amounts([first], "0x1", [1, amount]) == [
+        first.quote(1, False),
+        first.quote(amount, False),
+    ]
+
+    with pytest.raises(ValueError):
+        quote_path([first], "0x2", amount)
+
+
+@pytest.mark.parametrize(
+    "asset,fees",
+    [
+        (WETH, (3000,)),
+        ("0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48", (3000, 500)),
+    ],
+)
+def test__quote__matches_quoter(asset, fees):
+    pools = snapshot_route(asset, fees)
+    quoter = Contract(QUOTER)
+
+    tokens = [COMP, WETH] if asset == WETH else [COMP, WETH, asset]
+    path = bytes.fromhex(tokens[0][2:])
+    for fee, token in zip(fees, tokens[1:]):
+        path += fee.to_bytes(3, "big") + bytes.fromhex(token[2:])
+
+    for amount in (int(1e15), int(1e18), int(100e18), int(1_000e18)):
+        assert quote_path(pools, COMP, amount) == quoter.quoteExactInput.call(
+            path, amount
+        )
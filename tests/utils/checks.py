@@ -1,4 +1,10 @@
 import pytest
+from ape_ethereum import multicall
+
+TOTALS = ("totalAssets", "totalDebt", "totalIdle", "totalSupply", "decimals")
+
+# Asset amounts can be off by a couple of wei of rounding.
+ASSET_TOLERANCE = 2
 
 
 def assert_strategy_reported(log, strategy, gain, loss, performance_fee, protocol_fee):
@@ -9,33 +15,55 @@ def assert_strategy_reported(log, strategy, gain, loss, performance_fee, protoco
     assert log.protocol_fee == protocol_fee
 
 
-def check_strategy_totals(strategy, total_assets, total_debt, total_idle):
-    assert pytest.approx(strategy.totalAssets(), abs=2) == total_assets
-    assert pytest.approx(strategy.totalDebt(), abs=2) == total_debt
-    assert pytest.approx(strategy.totalIdle(), abs=2) == total_idle
+def get_strategy_totals(strategy):
+    """Read all of the strategy's totals in a single multicall."""
+    call = multicall.Call()
+    for name in TOTALS:
+        call.add(getattr(strategy, name))
+    return dict(zip(TOTALS, call()))
 
 
-def check_strategy_totals(strategy, total_assets, total_debt, total_idle, total_supply):
-    assert pytest.approx(strategy.totalAssets(), abs=2) == total_assets
-    assert pytest.approx(strategy.totalDebt(), abs=2) == total_debt
-    assert pytest.approx(strategy.totalIdle(), abs=2) == total_idle
-    # will adjust the accuracy based on token decimals
-    assert (
-        pytest.approx(strategy.totalSupply(), rel=10 ** -(strategy.decimals() * 2 // 3))
-        == total_supply
-    )
+def _tolerance(name, decimals):
+    if name == "totalSupply":
+        # will adjust the accuracy based on token decimals
+        return {"rel": 10 ** -(decimals * 2 // 3)}
+    return {"abs": ASSET_TOLERANCE}
 
 
-def check_strategy_mins(strategy, min_total_assets, min_total_debt, min_total_idle):
-    assert strategy.totalAssets() >= min_total_assets
-    assert strategy.totalDebt() >= min_total_debt
-    assert strategy.totalIdle() >= min_total_idle
+def check_strategy_totals(
+    strategy, total_assets, total_debt, total_idle, total_supply=None
+):
+    totals = get_strategy_totals(strategy)
+    expected = {
+        "totalAssets": total_assets,
+        "totalDebt": total_debt,
+        "totalIdle": total_idle,
+        "totalSupply": total_supply,
+    }
+
+    mismatched = {
+        name: (totals[name], value)
+        for name, value in expected.items()
+        if value is not None
+        and totals[name] != pytest.approx(value, **_tolerance(name, totals["decimals"]))
+    }
+    assert not mismatched, f"(actual, expected): {mismatched}"
 
 
 def check_strategy_mins(
-    strategy, min_total_assets, min_total_debt, min_total_idle, min_total_supply
+    strategy, min_total_assets, min_total_debt, min_total_idle, min_total_supply=None
 ):
-    assert strategy.totalAssets() >= min_total_assets
-    assert strategy.totalDebt() >= min_total_debt
-    assert strategy.totalIdle() >= min_total_idle
-    assert strategy.totalSupply() >= min_total_supply
+    totals = get_strategy_totals(strategy)
+    minimums = {
+        "totalAssets": min_total_assets,
+        "totalDebt": min_total_debt,
+        "totalIdle": min_total_idle,
+        "totalSupply": min_total_supply,
+    }
+
+    below = {
+        name: (totals[name], value)
+        for name, value in minimums.items()
+        if value is not None and totals[name] < value
+    }
+    assert not below, f"(actual, minimum): {below}"
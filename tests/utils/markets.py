@@ -0,0 +1,112 @@
+"""
+Synthetic Comet markets for running the strategy and oracle tests across
+base token decimals, rate curves, reward speeds and base prices.
+
+`MARKETS` is the full matrix, each entry deployed fresh as a `MockComet`
+by the `create_market` fixture so tests stay isolated and can be spread
+over workers.
+"""
+import itertools
+from dataclasses import dataclass
+
+FACTOR_SCALE = 10**18
+BASE_INDEX_SCALE = 10**15
+SECONDS_PER_DAY = 24 * 60 * 60
+SECONDS_PER_YEAR = 365 * SECONDS_PER_DAY
+
+DECIMALS = (6, 8, 18)
+# COMP per second scaled by 1e15, around what the mainnet comets pay.
+REWARD_SPEEDS = (0, 2_000_000_000_000)
+# Base token prices with the 8 decimals of every Comet price feed.
+BASE_PRICES = (1 * 10**8, 2_000 * 10**8)
+# Share of the market lent out when it is created.
+UTILIZATION = 6 * 10**17
+
+
+def per_second(apr: float) -> int:
+    return int(apr * FACTOR_SCALE) // SECONDS_PER_YEAR
+
+
+@dataclass(frozen=True)
+class RateCurve:
+    """A kinked per second supply rate curve, borrowing pays a third more."""
+
+    name: str
+    kink: int
+    base: int
+    slope_low: int
+    slope_high: int
+
+    def supply_rate(self, utilization: int) -> int:
+        """Mirrors Comet's `getSupplyRate`."""
+        if utilization <= self.kink:
+            return self.base + self.slope_low * utilization // FACTOR_SCALE
+        return (
+            self.base
+            + self.slope_low * self.kink // FACTOR_SCALE
+            + self.slope_high * (utilization - self.kink) // FACTOR_SCALE
+        )
+
+    def config(self):
+        """The supply and borrow rate fields of a `MockComet` configuration."""
+        borrow = [v * 4 // 3 for v in (self.slope_low, self.slope_high, self.base)]
+        return (
+            self.kink,
+            self.slope_low,
+            self.slope_high,
+            self.base,
+            self.kink,
+            *borrow,
+        )
+
+
+CURVES = (
+    # The lent out share is below the kink, on the low slope.
+    RateCurve("gentle", 9 * 10**17, 0, per_second(0.03), per_second(0.4)),
+    # Above the kink with a base rate.
+    RateCurve(
+        "steep", 5 * 10**17, per_second(0.005), per_second(0.05), per_second(1.5)
+    ),
+    # Exactly at the kink.
+    RateCurve("kinked", UTILIZATION, 0, per_second(0.0325), per_second(0.4)),
+)
+
+
+@dataclass(frozen=True)
+class MarketSpec:
+    decimals: int
+    curve: RateCurve
+    reward_speed: int
+    base_price: int
+
+    @property
+    def id(self) -> str:
+        rewards = "rewards" if self.reward_speed else "no-rewards"
+        return (
+            f"{self.decimals}dec-{self.curve.name}-{rewards}"
+            f"-${self.base_price // 10**8}"
+        )
+
+    @property
+    def scale(self) -> int:
+        return 10**self.decimals
+
+    @property
+    def scaler(self) -> int:
+        """The oracle's `SCALER` for this market."""
+        return self.scale * 10**18 // BASE_INDEX_SCALE
+
+    def reward_apr(self, comp_price: int, supply: int) -> int:
+        """Mirrors the oracle's `getRewardAprForSupplyBase`."""
+        per_day = self.reward_speed * SECONDS_PER_DAY * self.scaler
+        if per_day == 0:
+            return 0
+        return comp_price * per_day // (supply * self.base_price) * 365
+
+
+MARKETS = tuple(
+    MarketSpec(decimals, curve, speed, price)
+    for decimals, curve, speed, price in itertools.product(
+        DECIMALS, CURVES, REWARD_SPEEDS, BASE_PRICES
+    )
+)
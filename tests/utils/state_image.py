@@ -0,0 +1,71 @@
+"""
+Pytest plugin starting the session from a chain state image.
+
+Enabled with `ape test --state-image .cache/chain_state.json`. The
+session fixtures in conftest.py then come from the image instead of
+being deployed and funded one by one. A missing or stale image is
+rebuilt by deploying as usual and saved for the next session. How long
+the session took to start either way is printed at the end.
+"""
+import time
+
+import pytest
+
+from scripts import state_image
+
+
+class StateImagePlugin:
+    def __init__(self, path, rebuild):
+        self.path = path
+        self.rebuild = rebuild
+        self.outcome = None
+        self.seconds = 0.0
+
+    def session(self):
+        """Load the image, or build and save one, returning its addresses."""
+        start = time.perf_counter()
+        image = None if self.rebuild else state_image.read(self.path)
+        reason = "--state-image-rebuild" if self.rebuild else "no image"
+        if image is not None:
+            reason = state_image.stale_reason(image)
+
+        if image is not None and reason is None:
+            state_image.load(image)
+            self.outcome = "loaded"
+        else:
+            image = state_image.build(state_image.deploy_session)
+            state_image.write(image, self.path)
+            self.outcome = f"rebuilt ({reason})"
+
+        self.seconds = time.perf_counter() - start
+        return image["session"]
+
+    def pytest_terminal_summary(self, terminalreporter, config):
+        if self.outcome is None:
+            return
+        terminalreporter.write_line(
+            f"state image {self.path} {self.outcome}, "
+            f"session started in {self.seconds:.2f}s"
+        )
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("state image")
+    group.addoption(
+        "--state-image",
+        default=None,
+        help="Start the session from this chain state image, building it if needed",
+    )
+    group.addoption(
+        "--state-image-rebuild",
+        action="store_true",
+        default=False,
+        help="Rebuild the state image even if it is up to date",
+    )
+
+
+def pytest_configure(config):
+    path = config.getoption("state_image")
+    if path:
+        plugin = StateImagePlugin(path, config.getoption("state_image_rebuild"))
+        config.pluginmanager.register(plugin, "state_image")
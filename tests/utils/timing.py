@@ -0,0 +1,288 @@
+"""
+Pytest plugin recording where test time goes.
+
+Enabled with `ape test --timing-report timing.json`. Every JSON-RPC
+request to the node is timed and categorized, fixture setups and test
+bodies are timed, and the results are printed sorted at the end of the
+session and written to a JSON file that can be diffed between runs with
+`python -m scripts.timing_diff old.json new.json`.
+"""
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import pytest
+
+MINING_METHODS = {
+    "evm_mine",
+    "hardhat_mine",
+    "evm_increaseTime",
+    "evm_setNextBlockTimestamp",
+}
+TRANSACTION_METHODS = {
+    "eth_sendTransaction",
+    "eth_sendRawTransaction",
+    "eth_getTransactionReceipt",
+    "eth_estimateGas",
+    "debug_traceTransaction",
+}
+CATEGORIES = (
+    "call",
+    "transaction",
+    "deployment",
+    "mining",
+    "contract",
+    "other",
+)
+SORT_KEYS = ("duration", "python", "rpc") + CATEGORIES
+
+
+def _new_stats():
+    return {
+        "rpc": {c: {"count": 0, "time": 0.0} for c in CATEGORIES},
+        "fixtures": defaultdict(float),
+        "blocks_mined": 0,
+        "transactions": 0,
+        "deployments": 0,
+        "setup": 0.0,
+        "call": 0.0,
+        "teardown": 0.0,
+        # RPC time spent while the test body was running
+        "call_rpc": 0.0,
+    }
+
+
+def _categorize(method):
+    if method == "eth_call":
+        return "call"
+    if method in MINING_METHODS:
+        return "mining"
+    if method in TRANSACTION_METHODS:
+        return "transaction"
+    return "other"
+
+
+def _is_deployment(method, response):
+    # Test accounts sign locally so the sent transaction can't be
+    # inspected cheaply, but its receipt says if it created a contract.
+    if method != "eth_getTransactionReceipt" or not isinstance(response, dict):
+        return False
+    receipt = response.get("result") or {}
+    return bool(receipt.get("contractAddress"))
+
+
+def _blocks_mined(method, params, response):
+    # The node automines, so every transaction it accepts is a block.
+    if method in ("eth_sendTransaction", "eth_sendRawTransaction"):
+        return int(isinstance(response, dict) and "error" not in response)
+    if method == "evm_mine":
+        return 1
+    if method == "hardhat_mine":
+        return int(params[0], 16) if params else 1
+    return 0
+
+
+class TimingPlugin:
+    def __init__(self, path):
+        self.path = path
+        self.tests = {}
+        self.fixtures = defaultdict(lambda: {"count": 0, "time": 0.0})
+        self._current = None
+        self._in_call = False
+        self._resolving = 0
+        self._last_send = 0.0
+        self._patched = False
+
+    # RPC instrumentation
+
+    def _patch_provider(self):
+        # The node only exists once ape has connected, which is after
+        # the session starts, so patch on the first test.
+        if self._patched:
+            return
+
+        from ape import chain
+
+        provider = chain.provider.web3.provider
+        make_request = provider.make_request
+
+        def timed_request(method, params):
+            start = time.perf_counter()
+            response = None
+            try:
+                response = make_request(method, params)
+                return response
+            finally:
+                elapsed = time.perf_counter() - start
+                self._record_rpc(method, params, response, elapsed)
+
+        provider.make_request = timed_request
+        # web3 caches the middleware chain with the original bound method
+        provider._request_func_cache = (None, None)
+
+        # Resolving `Contract(...)` may hit an explorer as well as the node
+        contracts = chain.contracts
+        instance_at = contracts.instance_at
+
+        def timed_instance_at(*args, **kwargs):
+            with self._resolution():
+                return instance_at(*args, **kwargs)
+
+        contracts.instance_at = timed_instance_at
+        self._patched = True
+
+    @contextmanager
+    def _resolution(self):
+        start = time.perf_counter()
+        self._resolving += 1
+        try:
+            yield
+        finally:
+            self._resolving -= 1
+            if not self._resolving:
+                self._add("contract", time.perf_counter() - start)
+
+    def _add(self, category, elapsed, count=1):
+        if self._current is None:
+            return
+        stats = self.tests[self._current]
+        stats["rpc"][category]["count"] += count
+        stats["rpc"][category]["time"] += elapsed
+        if self._in_call:
+            stats["call_rpc"] += elapsed
+
+    def _record_rpc(self, method, params, response, elapsed):
+        if self._current is None:
+            return
+        stats = self.tests[self._current]
+        category = _categorize(method)
+
+        stats["blocks_mined"] += _blocks_mined(method, params, response)
+        if method in ("eth_sendTransaction", "eth_sendRawTransaction"):
+            stats["transactions"] += 1
+            self._last_send = elapsed
+
+        if _is_deployment(method, response):
+            stats["deployments"] += 1
+            if not self._resolving:
+                # Move the send over from the transactions
+                self._add("transaction", -self._last_send, count=-1)
+                self._add("deployment", self._last_send + elapsed, count=2)
+            return
+
+        # Counted as part of the resolution that caused it.
+        if not self._resolving:
+            self._add(category, elapsed)
+
+    # Pytest hooks
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        self._current = item.nodeid
+        self.tests[item.nodeid] = _new_stats()
+        yield
+        self._current = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_setup(self, item):
+        self._patch_provider()
+        start = time.perf_counter()
+        yield
+        self.tests[item.nodeid]["setup"] = time.perf_counter() - start
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        self._in_call = True
+        start = time.perf_counter()
+        yield
+        self.tests[item.nodeid]["call"] = time.perf_counter() - start
+        self._in_call = False
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self, item, nextitem):
+        start = time.perf_counter()
+        yield
+        self.tests[item.nodeid]["teardown"] = time.perf_counter() - start
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+
+        name = fixturedef.argname
+        self.fixtures[name]["count"] += 1
+        self.fixtures[name]["time"] += elapsed
+        if self._current is not None:
+            self.tests[self._current]["fixtures"][name] += elapsed
+
+    def pytest_sessionfinish(self, session):
+        with open(self.path, "w") as f:
+            json.dump(self.report(), f, indent=2, sort_keys=True)
+
+    def pytest_terminal_summary(self, terminalreporter, config):
+        key = config.getoption("timing_sort")
+        rows = summarize(self.report()["tests"])
+        rows.sort(key=lambda r: r[key], reverse=True)
+
+        tr = terminalreporter
+        tr.section(f"timing (sorted by {key})")
+        header = f"{'test':<60}" + "".join(f"{c[:11]:>12}" for c in SORT_KEYS)
+        tr.write_line(header + f"{'blocks':>10}{'txs':>6}")
+        for row in rows[: config.getoption("timing_top")]:
+            line = f"{row['test'][-60:]:<60}"
+            line += "".join(f"{row[c]:>12.3f}" for c in SORT_KEYS)
+            tr.write_line(line + f"{row['blocks_mined']:>10}{row['transactions']:>6}")
+        tr.write_line(f"timing report written to {self.path}")
+
+    def report(self):
+        return {
+            "tests": self.tests,
+            "fixtures": dict(self.fixtures),
+        }
+
+
+def summarize(tests):
+    """Flatten per test stats into rows keyed by `SORT_KEYS`."""
+    rows = []
+    for nodeid, stats in tests.items():
+        row = {
+            "test": nodeid,
+            "duration": stats["setup"] + stats["call"] + stats["teardown"],
+            # Time in the test body outside of the node: assertions etc.
+            "python": stats["call"] - stats["call_rpc"],
+            "rpc": sum(c["time"] for c in stats["rpc"].values()),
+            "blocks_mined": stats["blocks_mined"],
+            "transactions": stats["transactions"],
+        }
+        row.update({c: stats["rpc"][c]["time"] for c in CATEGORIES})
+        rows.append(row)
+    return rows
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("timing")
+    group.addoption(
+        "--timing-report",
+        default=None,
+        help="Write per test timing split by RPC category to this JSON file",
+    )
+    group.addoption(
+        "--timing-sort",
+        default="duration",
+        choices=SORT_KEYS,
+        help="Column to sort the timing summary by",
+    )
+    group.addoption(
+        "--timing-top",
+        default=25,
+        type=int,
+        help="Number of tests to show in the timing summary",
+    )
+
+
+def pytest_configure(config):
+    path = config.getoption("timing_report")
+    if path:
+        config.pluginmanager.register(TimingPlugin(path), "timing")